@@ -0,0 +1,207 @@
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+EVENT_JOURNAL_ENABLED = os.getenv("EVENT_JOURNAL_ENABLED", "1") == "1"
+EVENT_JOURNAL_PATH = os.getenv("EVENT_JOURNAL_PATH", "data/event_journal.db")
+JOURNAL_BATCH_SIZE = int(os.getenv("JOURNAL_BATCH_SIZE", "256"))
+JOURNAL_FLUSH_INTERVAL_MS = int(os.getenv("JOURNAL_FLUSH_INTERVAL_MS", "50"))
+JOURNAL_RETENTION_DAYS = int(os.getenv("JOURNAL_RETENTION_DAYS", "7"))
+# Upper bound on the wait between retries of a failed flush (doubling from the flush interval)
+JOURNAL_MAX_BACKOFF_MS = int(os.getenv("JOURNAL_MAX_BACKOFF_MS", "5000"))
+
+CONSUMER_NAME = "orchestrator"
+
+
+class EventJournal:
+    """
+    Append-only event log in a WAL-mode SQLite file.
+
+    Appends only buffer in memory; a background task writes the buffer with one
+    executemany + commit per batch (group commit), so request paths never wait
+    on an fsync. The consumer offset is stored in the same transaction, and is
+    the highest seq below which every event has been processed, so a restart
+    replays exactly the unprocessed tail. A failed write puts its rows back
+    at the front of the buffer and is retried with exponential backoff.
+    Events still in the buffer when the process dies are lost.
+    """
+
+    def __init__(self, path: str = EVENT_JOURNAL_PATH, batch_size: int = JOURNAL_BATCH_SIZE, flush_interval_ms: int = JOURNAL_FLUSH_INTERVAL_MS,
+                 max_backoff_ms: int = JOURNAL_MAX_BACKOFF_MS):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_backoff = max_backoff_ms / 1000
+        self._conn: Optional[sqlite3.Connection] = None
+        self._lock = threading.Lock()
+        self._buffer: List[tuple] = []
+        self._in_flight: set = set()
+        self._next_seq = 1
+        self._acked_offset = 0
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self.flushes = 0
+        self.flushed_events = 0
+        self.failed_flushes = 0
+
+    @property
+    def is_open(self) -> bool:
+        return self._conn is not None
+
+    def open(self):
+        """Create the journal file if needed and load the last seq and consumer offset."""
+        if self.is_open:
+            return
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        conn = sqlite3.connect(self.path, check_same_thread=False)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS events (
+                seq INTEGER PRIMARY KEY,
+                type TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                timestamp TEXT NOT NULL
+            )
+        """)
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_events_timestamp ON events(timestamp)")
+        conn.execute("CREATE TABLE IF NOT EXISTS consumer_offsets (consumer TEXT PRIMARY KEY, offset INTEGER NOT NULL)")
+        conn.commit()
+        self._conn = conn
+        self._acked_offset = self.stored_offset()
+        # Pruning can empty the table, so never hand out a seq at or below the stored offset
+        last_seq = conn.execute("SELECT COALESCE(MAX(seq), 0) FROM events").fetchone()[0]
+        self._next_seq = max(last_seq, self._acked_offset) + 1
+        logger.info(f"Event journal opened at {self.path} (next seq {self._next_seq}, offset {self._acked_offset})")
+
+    def stored_offset(self) -> int:
+        row = self._conn.execute("SELECT offset FROM consumer_offsets WHERE consumer = ?", (CONSUMER_NAME,)).fetchone()
+        return row[0] if row else 0
+
+    def append(self, event: Dict) -> Optional[int]:
+        """Assign a seq to the event and buffer it for the next group commit."""
+        if not self.is_open:
+            return None
+        seq = self._next_seq
+        self._next_seq += 1
+        event["seq"] = seq
+        self._buffer.append((seq, event["type"], json.dumps(event["payload"], default=str), event["timestamp"]))
+        self._in_flight.add(seq)
+        if len(self._buffer) >= self.batch_size and self._wake is not None:
+            self._wake.set()
+        return seq
+
+    def ack(self, event: Dict):
+        """Mark an event as processed (or deliberately dropped) by the consumer."""
+        self._in_flight.discard(event.get("seq"))
+
+    def committed_offset(self) -> int:
+        if self._in_flight:
+            return min(self._in_flight) - 1
+        return self._next_seq - 1
+
+    async def flush(self):
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            # Snapshot the offset before taking the buffer so it never covers unwritten rows
+            offset = self.committed_offset()
+            rows, self._buffer = self._buffer, []
+            if not self.is_open or (not rows and offset == self._acked_offset):
+                return
+            try:
+                await asyncio.to_thread(self._write, rows, offset)
+            except Exception:
+                # Back in front of anything appended meanwhile, so seq order is kept
+                self._buffer[:0] = rows
+                self.failed_flushes += 1
+                raise
+            self._acked_offset = offset
+            self.flushes += 1
+            self.flushed_events += len(rows)
+
+    def _write(self, rows: List[tuple], offset: int):
+        with self._lock, self._conn:
+            if rows:
+                self._conn.executemany("INSERT INTO events (seq, type, payload, timestamp) VALUES (?, ?, ?, ?)", rows)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO consumer_offsets (consumer, offset) VALUES (?, ?)",
+                (CONSUMER_NAME, offset)
+            )
+
+    async def _run(self):
+        failures = 0
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            try:
+                # Shielded so stop() cannot cancel a batch that is already out of the buffer
+                await asyncio.shield(self.flush())
+                failures = 0
+            except Exception as e:
+                failures += 1
+                backoff = min(self.flush_interval * 2 ** failures, self.max_backoff)
+                logger.error(f"Event journal flush failed ({len(self._buffer)} events buffered), retrying in {backoff:.2f}s: {str(e)}")
+                await asyncio.sleep(backoff)
+
+    def start(self):
+        self.open()
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Flush whatever is buffered and close the journal."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        if self.is_open:
+            await self.flush()
+            self._conn.close()
+            self._conn = None
+
+    def _read(self, query: str, params: tuple) -> List[Dict]:
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        return [{"seq": r[0], "type": r[1], "payload": json.loads(r[2]), "timestamp": r[3]} for r in rows]
+
+    def recover(self) -> List[Dict]:
+        """Journaled events the consumer has not processed yet, in seq order; they count as in flight again."""
+        events = self._read("SELECT seq, type, payload, timestamp FROM events WHERE seq > ? ORDER BY seq", (self.stored_offset(),))
+        self._in_flight.update(event["seq"] for event in events)
+        return events
+
+    def read_range(self, since: str, until: str) -> List[Dict]:
+        """Journaled events with since <= timestamp < until (ISO strings), in seq order."""
+        return self._read("SELECT seq, type, payload, timestamp FROM events WHERE timestamp >= ? AND timestamp < ? ORDER BY seq", (since, until))
+
+    def prune(self, before: str) -> int:
+        """Delete processed events older than the given ISO timestamp."""
+        with self._lock, self._conn:
+            return self._conn.execute(
+                "DELETE FROM events WHERE timestamp < ? AND seq <= ?", (before, self.stored_offset())
+            ).rowcount
+
+    def stats(self) -> Dict:
+        return {
+            "enabled": self.is_open,
+            "path": self.path,
+            "buffered": len(self._buffer),
+            "in_flight": len(self._in_flight),
+            "committed_offset": self._acked_offset if self.is_open else None,
+            "flushes": self.flushes,
+            "flushed_events": self.flushed_events,
+            "failed_flushes": self.failed_flushes,
+        }
@@ -0,0 +1,20 @@
+from typing import Dict, Iterable, Sequence
+
+
+def latency_summary(samples: Iterable[float], scale: float = 1.0, percentiles: Sequence[int] = (50, 99)) -> Dict:
+    """
+    Count, mean, percentiles and max of a window of latency samples, in ms.
+
+    `scale` converts the samples to milliseconds (1000 for samples taken in
+    seconds). Percentiles are nearest-rank over the sorted window, which is
+    exact for the few-thousand-sample deques the stats endpoints keep and
+    needs no interpolation. An empty window reports a count of 0 and None
+    for every figure.
+    """
+    ordered = sorted(samples)
+    n = len(ordered)
+    summary = {"count": n, "avg_ms": round(sum(ordered) / n * scale, 3) if n else None}
+    for p in percentiles:
+        summary[f"p{p}_ms"] = round(ordered[min(n - 1, n * p // 100)] * scale, 3) if n else None
+    summary["max_ms"] = round(ordered[-1] * scale, 3) if n else None
+    return summary
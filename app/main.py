@@ -1,7 +1,10 @@
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 import logging
-from app.routers import health, faq, vision, orders, reco, analytics ,tables
+from app.routers import health, faq, vision, orders, reco, analytics ,tables, orchestrator, menu
+from app.orchestrator import start_orchestrator, stop_orchestrator
+from app.services.vision_agent.pool import vision_pool
+from app.telemetry_writer import telemetry_writer
 from dotenv import load_dotenv
 import os
 
@@ -26,11 +29,18 @@ app.include_router(orders, prefix="/api", tags=["Orders"])
 app.include_router(reco, tags=["Recommendations"])
 app.include_router(analytics, prefix="/api", tags=["Analytics"])
 app.include_router(tables.router, prefix="/api/tables")
+app.include_router(orchestrator, prefix="/api", tags=["Orchestrator"])
+app.include_router(menu, prefix="/api", tags=["Menu"])
 
 @app.on_event("startup")
 async def startup_event():
     logger.info("Starting AI Restaurant Manager API...")
+    await start_orchestrator()
+    telemetry_writer.start()
 
 @app.on_event("shutdown")
 async def shutdown_event():
-    logger.info("Shutting down AI Restaurant Manager API...")
\ No newline at end of file
+    logger.info("Shutting down AI Restaurant Manager API...")
+    await stop_orchestrator()
+    vision_pool.shutdown()
+    await telemetry_writer.stop()
\ No newline at end of file
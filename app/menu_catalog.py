@@ -0,0 +1,88 @@
+import logging
+import threading
+from typing import Dict, FrozenSet, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from sqlalchemy.sql import text
+
+logger = logging.getLogger(__name__)
+
+MENU_QUERY = text("SELECT id, name, description, price, category, is_vegan, is_gluten_free FROM menu")
+
+
+class MenuSnapshot:
+    """Immutable, compact view of the menu table at one catalog version."""
+
+    def __init__(self, version: int, rows: list):
+        self.version = version
+        self.prices: Dict[int, float] = {row[0]: float(row[3]) for row in rows}
+        self.names: Dict[int, str] = {row[0]: row[1] for row in rows}
+        self.descriptions: Dict[int, Optional[str]] = {row[0]: row[2] for row in rows}
+        by_category: Dict[str, set] = {}
+        for row in rows:
+            by_category.setdefault((row[4] or "").lower(), set()).add(row[0])
+        self.by_category: Dict[str, FrozenSet[int]] = {k: frozenset(v) for k, v in by_category.items()}
+        self.vegan: FrozenSet[int] = frozenset(row[0] for row in rows if row[5])
+        self.gluten_free: FrozenSet[int] = frozenset(row[0] for row in rows if row[6])
+
+    def describe(self, menu_id: int) -> Dict:
+        return {"name": self.names[menu_id], "description": self.descriptions[menu_id], "price": self.prices[menu_id]}
+
+    def search(self, query: str) -> List[Dict]:
+        """Same matching as the FAQ agent's SQL: vegan flag, else name/category substring (case-insensitive)."""
+        needle = query.lower()
+        if "vegan" in needle:
+            ids = self.vegan
+        else:
+            ids = {menu_id for menu_id, name in self.names.items() if needle in name.lower()}
+            ids |= {menu_id for category, members in self.by_category.items() if needle in category for menu_id in members}
+        return [self.describe(menu_id) for menu_id in sorted(ids)]
+
+
+class MenuCatalog:
+    """
+    Process-wide menu cache.
+
+    `version` is bumped whenever the menu changes (see invalidate); readers get
+    the current snapshot and the catalog reloads lazily on the first read after
+    a bump. Snapshots are swapped whole, so a reader never sees a half-built one.
+    """
+
+    def __init__(self):
+        self.version = 1
+        self._snapshot: Optional[MenuSnapshot] = None
+        self._lock = threading.Lock()
+
+    def _is_current(self) -> bool:
+        return self._snapshot is not None and self._snapshot.version == self.version
+
+    def _install(self, version: int, rows: list) -> MenuSnapshot:
+        snapshot = MenuSnapshot(version, rows)
+        with self._lock:
+            if self._snapshot is None or self._snapshot.version <= version:
+                self._snapshot = snapshot
+        logger.info(f"Menu catalog v{version} loaded with {len(rows)} items")
+        return snapshot
+
+    async def get(self, db: AsyncSession) -> MenuSnapshot:
+        if self._is_current():
+            return self._snapshot
+        version = self.version
+        return self._install(version, (await db.execute(MENU_QUERY)).fetchall())
+
+    def get_sync(self, db: Session) -> MenuSnapshot:
+        """For sync callers such as the FAQ agent's LangChain tools."""
+        if self._is_current():
+            return self._snapshot
+        version = self.version
+        return self._install(version, db.execute(MENU_QUERY).fetchall())
+
+    def invalidate(self, version: Optional[int] = None) -> int:
+        """Bump to `version` (or the next version); idempotent when a change event is seen twice."""
+        with self._lock:
+            self.version = max(self.version + 1 if version is None else version, self.version)
+        logger.info(f"Menu catalog invalidated (now v{self.version})")
+        return self.version
+
+
+menu_catalog = MenuCatalog()
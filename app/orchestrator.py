@@ -1,36 +1,206 @@
 import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, Optional
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, List, Optional
 from sqlalchemy.sql import text
-from db.connection import get_db
+from db.connection import AsyncSessionLocal
+from app.table_index import table_index, claim_table, release_table
+from app.reservation_matcher import reservation_matcher
+from app.menu_catalog import menu_catalog
+from app.services.reco_agent.cooccurrence import cooccurrence_store
+from app.services.analytics_agent import rollup
+from app.services.analytics_agent.cache import kpi_cache
+from app.services.faq_agent.cache import faq_cache
+from app.services.faq_agent.similarity import faq_index
+from app.event_journal import EventJournal, EVENT_JOURNAL_ENABLED, JOURNAL_RETENTION_DAYS
 
 # Configure logging for production readiness
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# In-memory event queue for MVP
-event_queue = asyncio.Queue()
+# Consumer pool sizing and backpressure
+ORCH_WORKERS = int(os.getenv("ORCH_WORKERS", "4"))
+ORCH_QUEUE_SIZE = int(os.getenv("ORCH_QUEUE_SIZE", "1000"))  # per shard
+ORCH_OVERFLOW_POLICY = os.getenv("ORCH_OVERFLOW_POLICY", "block")  # block | drop_oldest | shed_low_priority
+OVERFLOW_POLICIES = ("block", "drop_oldest", "shed_low_priority")
+
+# Informational events that may be shed when a shard is full
+LOW_PRIORITY_EVENTS = {"faq_query_processed", "recommendation_generated", "analytics_generated"}
+
+# Payload fields used to pick a shard, in order of preference
+PARTITION_KEYS = ("table_id", "order_id")
+
+
+class EventShard:
+    """One bounded partition of the event bus, drained by a single worker so per-key order holds."""
+
+    def __init__(self, index: int, maxsize: int):
+        self.index = index
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=maxsize)
+        self.processed = 0
+        self.dropped = 0
+        self.max_lag = 0.0
+
+    def lag(self) -> float:
+        """Age in seconds of the oldest event still waiting in the queue (0 when empty)."""
+        # asyncio.Queue keeps its items in a deque; peek the head without dequeuing
+        waiting = self.queue._queue
+        return time.monotonic() - waiting[0][0] if waiting else 0.0
+
+    def stats(self) -> Dict:
+        return {
+            "shard": self.index,
+            "depth": self.queue.qsize(),
+            "capacity": self.queue.maxsize,
+            "processed": self.processed,
+            "dropped": self.dropped,
+            "lag_seconds": round(self.lag(), 6),
+            "max_lag_seconds": round(self.max_lag, 6),
+        }
+
+
+class EventBus:
+    """Sharded in-memory event bus with a pool of consumers (one per shard)."""
+
+    def __init__(self, workers: int = ORCH_WORKERS, queue_size: int = ORCH_QUEUE_SIZE, overflow_policy: str = ORCH_OVERFLOW_POLICY,
+                 on_complete: Optional[Callable[[Dict], None]] = None):
+        if overflow_policy not in OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow_policy}. Use {list(OVERFLOW_POLICIES)}")
+        self.overflow_policy = overflow_policy
+        # Called once per event when it is processed or dropped (used to advance the journal offset)
+        self.on_complete = on_complete
+        self.shards = [EventShard(i, queue_size) for i in range(max(1, workers))]
+        self._tasks: List[asyncio.Task] = []
+
+    @property
+    def running(self) -> bool:
+        return any(not task.done() for task in self._tasks)
+
+    def shard_for(self, event_type: str, payload: Dict) -> EventShard:
+        """Route by table_id (then order_id) so events for one table are handled in order."""
+        key = next((payload[k] for k in PARTITION_KEYS if payload.get(k) is not None), event_type)
+        return self.shards[hash(key) % len(self.shards)]
+
+    async def publish(self, event: Dict) -> bool:
+        """Enqueue an event, applying the overflow policy when its shard is full."""
+        shard = self.shard_for(event["type"], event["payload"])
+        item = (time.monotonic(), event)
+        if shard.queue.full() and self.overflow_policy == "drop_oldest":
+            _, dropped = shard.queue.get_nowait()
+            shard.queue.task_done()
+            shard.dropped += 1
+            self._complete(dropped)
+            logger.warning(f"Shard {shard.index} full; dropped oldest event {dropped['type']}")
+        elif shard.queue.full() and self.overflow_policy == "shed_low_priority" and event["type"] in LOW_PRIORITY_EVENTS:
+            shard.dropped += 1
+            self._complete(event)
+            logger.warning(f"Shard {shard.index} full; shed low-priority event {event['type']}")
+            return False
+        await shard.queue.put(item)
+        return True
+
+    def _complete(self, event: Dict):
+        if self.on_complete is not None:
+            self.on_complete(event)
+
+    async def _consume(self, shard: EventShard):
+        while True:
+            enqueued_at, event = await shard.queue.get()
+            shard.max_lag = max(shard.max_lag, time.monotonic() - enqueued_at)
+            try:
+                await dispatch_event(event)
+            except asyncio.CancelledError:
+                # Interrupted by stop(): not completed, so the journal replays it after a restart
+                shard.queue.task_done()
+                raise
+            except Exception as e:
+                logger.error(f"Shard {shard.index} failed on event {event.get('type')}: {str(e)}")
+            shard.processed += 1
+            self._complete(event)
+            shard.queue.task_done()
+
+    def start(self):
+        if self.running:
+            return
+        self._tasks = [asyncio.create_task(self._consume(shard)) for shard in self.shards]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    async def join(self):
+        """Wait until every queued event has been processed."""
+        for shard in self.shards:
+            await shard.queue.join()
+
+    def status(self) -> Dict:
+        shards = [shard.stats() for shard in self.shards]
+        return {
+            "status": "running" if self.running else "stopped",
+            "queue_size": sum(s["depth"] for s in shards),
+            "workers": len(self.shards),
+            "overflow_policy": self.overflow_policy,
+            "shards": shards,
+        }
+
+
+event_journal = EventJournal()
+event_bus = EventBus(on_complete=event_journal.ack)
 
 async def publish_event(event_type: str, payload: Dict):
-    """Publish an event to the queue."""
+    """Journal an event (group-committed in the background) and publish it to the bus."""
     event = {"type": event_type, "payload": payload, "timestamp": datetime.utcnow().isoformat()}
     logger.info(f"Publishing event: {event_type}")
-    await event_queue.put(event)
-
-async def consume_events():
-    """Process events from the queue."""
-    while True:
-        event = await event_queue.get()
-        logger.info(f"Processing event: {event['type']}")
-        try:
-            if event["type"] == "table_status_update":
-                await handle_table_status(event["payload"])
-            elif event["type"] == "faq_query_processed":
-                logger.info(f"FAQ query event: {event['payload']['query']} -> {event['payload']['response']}")
-        except Exception as e:
-            logger.error(f"Error processing event {event['type']}: {str(e)}")
-        event_queue.task_done()
+    event_journal.append(event)
+    await event_bus.publish(event)
+
+async def replay_events(since: datetime, until: Optional[datetime] = None) -> int:
+    """Re-dispatch journaled events in [since, until) through the bus; returns the number replayed."""
+    if not event_journal.is_open:
+        raise ValueError("Event journal is not enabled")
+    until = until or datetime.utcnow()
+    # Journal timestamps are naive UTC ISO strings, compared as text
+    since, until = [t.astimezone(timezone.utc).replace(tzinfo=None) if t.tzinfo else t for t in (since, until)]
+    events = await asyncio.to_thread(event_journal.read_range, since.isoformat(), until.isoformat())
+    for event in events:
+        # Replays are not tracked against the consumer offset
+        event.pop("seq")
+        event["replayed"] = True
+        await event_bus.publish(event)
+    logger.info(f"Replayed {len(events)} events from {since} to {until}")
+    return len(events)
+
+async def dispatch_event(event: Dict):
+    """Process a single event."""
+    logger.info(f"Processing event: {event['type']}")
+    try:
+        if event["type"] == "table_status_update":
+            await handle_table_status(event["payload"])
+        elif event["type"] == "order_created":
+            # Replays re-run side effects only; co-occurrence and rollup counts are rebuilt from the DB
+            if not event.get("replayed"):
+                await handle_order_created(event["payload"])
+                await rollup.apply_order_created(event["payload"])
+            invalidate_kpis(event["payload"])
+        elif event["type"] == "order_updated":
+            if not event.get("replayed"):
+                await rollup.apply_order_updated(event["payload"])
+            invalidate_kpis(event["payload"])
+        elif event["type"] == "menu_updated":
+            menu_catalog.invalidate(event["payload"]["version"])
+            # Revenue and item names are derived from menu prices
+            kpi_cache.clear()
+            # FAQ answers quote menu items and prices
+            faq_cache.clear("menu updated")
+            faq_index.clear()
+        elif event["type"] == "faq_query_processed":
+            logger.info(f"FAQ query event: {event['payload']['query']} -> {event['payload']['response']}")
+    except Exception as e:
+        logger.error(f"Error processing event {event['type']}: {str(e)}")
 
 async def handle_table_status(payload: Dict):
     """Handle table status updates from Vision Agent."""
@@ -39,60 +209,134 @@ async def handle_table_status(payload: Dict):
     if status == "detected_empty":
         await assign_table_to_reservation(table_id)
 
+async def handle_order_created(payload: Dict):
+    """Fold a new order into the reco co-occurrence counts."""
+    menu_ids = [item["menu_id"] for item in payload.get("items", [])]
+    if cooccurrence_store.add_order(payload["order_id"], menu_ids):
+        await cooccurrence_store.snapshot()
+
+def invalidate_kpis(payload: Dict):
+    """Drop cached KPI summaries covering the order's day."""
+    created_at = payload.get("created_at")
+    kpi_cache.invalidate_day(rollup.as_date(created_at) if created_at else rollup.utc_today())
+
 async def assign_table_to_reservation(table_id: int) -> Optional[Dict]:
-    """Assign a table to a pending reservation or create an open order."""
+    """Claim a table and assign it to a pending reservation or an open walk-in order."""
+    claimed = False
+    match = None
     try:
-        with next(get_db()) as db:
-            # Check if table is available and has sufficient capacity
-            table = db.execute(
-                text("SELECT * FROM tables WHERE id = :table_id AND status = 'available'"),
-                {"table_id": table_id}
-            ).fetchone()
-            if not table:
+        async with AsyncSessionLocal() as db:
+            # Atomic claim: index compare-and-set plus UPDATE ... WHERE status = 'available'
+            if not await claim_table(db, table_id):
                 logger.warning(f"Table {table_id} not available")
                 return None
+            claimed = True
+            now = datetime.utcnow()
 
-            # Find a pending reservation
-            reservation = db.execute(
-                text("SELECT * FROM reservations WHERE table_id IS NULL AND reservation_time <= :now ORDER BY reservation_time ASC"),
-                {"now": datetime.utcnow()}
-            ).fetchone()
-
-            if reservation:
-                # Assign table to reservation
-                db.execute(
-                    text("UPDATE reservations SET table_id = :table_id WHERE id = :reservation_id"),
-                    {"table_id": table_id, "reservation_id": reservation.id}
+            # Best-fitting pending reservation for this table's capacity
+            await reservation_matcher.ensure_loaded(db)
+            capacity = table_index.get(table_id)["capacity"]
+            while candidate := reservation_matcher.pop_best(capacity, now):
+                # Guard against a reservation seated by another process since the matcher loaded
+                seated = await db.execute(
+                    text("UPDATE reservations SET table_id = :table_id WHERE id = :reservation_id AND table_id IS NULL"),
+                    {"table_id": table_id, "reservation_id": candidate[0]}
                 )
-                # Create order
-                order_id = db.execute(
-                    text("INSERT INTO orders (table_id, reservation_id, status, created_at) VALUES (:table_id, :reservation_id, 'pending', :now)"),
-                    {"table_id": table_id, "reservation_id": reservation.id, "now": datetime.utcnow()}
-                ).lastrowid
-                db.commit()
-                logger.info(f"Assigned table {table_id} to reservation {reservation.id}, order {order_id}")
-                return {"table_id": table_id, "order_id": order_id, "reservation_id": reservation.id}
-            else:
-                # No reservation; create walk-in order
-                order_id = db.execute(
-                    text("INSERT INTO orders (table_id, status, created_at) VALUES (:table_id, 'pending', :now)"),
-                    {"table_id": table_id, "now": datetime.utcnow()}
-                ).lastrowid
-                db.execute(
-                    text("UPDATE tables SET status = 'occupied' WHERE id = :table_id"),
-                    {"table_id": table_id}
-                )
-                db.commit()
-                logger.info(f"Assigned table {table_id} to walk-in, order {order_id}")
-                return {"table_id": table_id, "order_id": order_id}
+                if seated.rowcount == 1:
+                    match = candidate
+                    break
+            reservation_id = match[0] if match else None
+
+            order_id = (await db.execute(
+                text("INSERT INTO orders (table_id, reservation_id, status, created_at) VALUES (:table_id, :reservation_id, 'pending', :now)"),
+                {"table_id": table_id, "reservation_id": reservation_id, "now": now}
+            )).lastrowid
+            await db.commit()
+            kpi_cache.invalidate_day(now.date())
     except Exception as e:
+        if claimed:
+            release_table(table_id)
+        if match:
+            reservation_matcher.add(*match)
         logger.error(f"Error assigning table {table_id}: {str(e)}")
         return None
 
+    # Every order id goes through order_created: the rollup counts it and the reco low-water mark passes it
+    await publish_event("order_created", {
+        "order_id": order_id,
+        "table_id": table_id,
+        "status": "pending",
+        "created_at": now.isoformat(),
+        "items": []
+    })
+    if reservation_id is not None:
+        logger.info(f"Assigned table {table_id} to reservation {reservation_id}, order {order_id}")
+        return {"table_id": table_id, "order_id": order_id, "reservation_id": reservation_id}
+    logger.info(f"Assigned table {table_id} to walk-in, order {order_id}")
+    return {"table_id": table_id, "order_id": order_id}
+
+async def publish_menu_change(reason: str = "manual") -> int:
+    """Call after any write to the menu table: bumps the catalog version and tells every consumer."""
+    version = menu_catalog.invalidate()
+    await publish_event("menu_updated", {"version": version, "reason": reason})
+    return version
+
+async def create_reservation(customer_name: str, reservation_time: datetime, party_size: int) -> Dict:
+    """Store a reservation and make it matchable immediately."""
+    if party_size <= 0:
+        raise ValueError(f"Invalid party size: {party_size}")
+    if reservation_time.tzinfo is not None:
+        # Reservation times are compared against naive UTC timestamps
+        reservation_time = reservation_time.astimezone(timezone.utc).replace(tzinfo=None)
+    async with AsyncSessionLocal() as db:
+        reservation_id = (await db.execute(
+            text("INSERT INTO reservations (customer_name, reservation_time, party_size) VALUES (:name, :time, :party_size)"),
+            {"name": customer_name, "time": reservation_time, "party_size": party_size}
+        )).lastrowid
+        await db.commit()
+    reservation_matcher.add(reservation_id, reservation_time, party_size)
+    logger.info(f"Created reservation {reservation_id} for {customer_name} ({party_size}) at {reservation_time}")
+    return {"reservation_id": reservation_id, "customer_name": customer_name, "reservation_time": reservation_time, "party_size": party_size}
+
 async def start_orchestrator():
-    """Start the orchestrator's event consumer."""
-    logger.info("Starting orchestrator event consumer")
-    asyncio.create_task(consume_events())
+    """Load the table index, open the journal, resume unprocessed events, start the consumer pool and catch up the analytics rollup."""
+    try:
+        async with AsyncSessionLocal() as db:
+            await table_index.load(db)
+    except Exception as e:
+        # GET /api/tables and claims retry the load lazily
+        logger.warning(f"Table index not loaded at startup: {str(e)}")
+    pending = []
+    if EVENT_JOURNAL_ENABLED:
+        event_journal.start()
+        cutoff = datetime.utcnow() - timedelta(days=JOURNAL_RETENTION_DAYS)
+        await asyncio.to_thread(event_journal.prune, cutoff.isoformat())
+        pending = await asyncio.to_thread(event_journal.recover)
+    logger.info(f"Starting orchestrator with {len(event_bus.shards)} consumers ({event_bus.overflow_policy} on overflow)")
+    event_bus.start()
+    if pending:
+        logger.info(f"Resuming {len(pending)} unprocessed events from the journal")
+        for event in pending:
+            await event_bus.publish(event)
+        # Recovered order events go into the rollup before closed days are finalized
+        await event_bus.join()
+    try:
+        async with AsyncSessionLocal() as db:
+            await rollup.catch_up(db)
+    except Exception as e:
+        # compute_kpis finalizes any day it reads on demand
+        logger.warning(f"Analytics rollup catch-up failed: {str(e)}")
+
+async def stop_orchestrator():
+    """Stop the consumer pool, then flush the journal and its consumer offset."""
+    logger.info("Stopping orchestrator consumers")
+    await event_bus.stop()
+    await event_journal.stop()
+    await cooccurrence_store.snapshot()
+
+def get_orchestrator_status() -> Dict:
+    """Queue depth, lag and throughput per shard, plus journal state."""
+    return {**event_bus.status(), "journal": event_journal.stats()}
 
 # Simulate Vision Agent event (for testing)
 async def simulate_vision_event(table_id: int, status: str):
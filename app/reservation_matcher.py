@@ -0,0 +1,102 @@
+import heapq
+import logging
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+logger = logging.getLogger(__name__)
+
+# Reservations due within this many minutes may be seated early if nobody due now fits
+RESERVATION_EARLY_SEAT_MINUTES = int(os.getenv("RESERVATION_EARLY_SEAT_MINUTES", "15"))
+# Re-read pending reservations at most this often to pick up out-of-process writes
+RESERVATION_MATCHER_REFRESH_SECONDS = float(os.getenv("RESERVATION_MATCHER_REFRESH_SECONDS", "300"))
+
+def as_datetime(value) -> datetime:
+    """SQLite hands timestamps back as strings through text() queries; Postgres as datetimes."""
+    return value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+
+
+class ReservationMatcher:
+    """
+    Pending (unseated) reservations bucketed by party size, each bucket a
+    min-heap on reservation time.
+
+    Matching a freed table of capacity C walks the buckets from C down to 1 and
+    peeks each heap, so it costs O(C log n) regardless of how many reservations
+    are pending. Removals are lazy: the id is dropped from `_pending` and its
+    heap entry is discarded when it reaches the top.
+    """
+
+    def __init__(self, early_seat_minutes: int = RESERVATION_EARLY_SEAT_MINUTES, refresh_seconds: float = RESERVATION_MATCHER_REFRESH_SECONDS):
+        self.early_seat = timedelta(minutes=early_seat_minutes)
+        self.refresh_seconds = refresh_seconds
+        self._buckets: Dict[int, List[Tuple[datetime, int]]] = {}
+        self._pending: Dict[int, Tuple[datetime, int]] = {}
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def load(self, db: AsyncSession):
+        rows = (await db.execute(
+            text("SELECT id, reservation_time, party_size FROM reservations WHERE table_id IS NULL")
+        )).fetchall()
+        with self._lock:
+            self._buckets, self._pending = {}, {}
+            for row in rows:
+                self._add(row[0], as_datetime(row[1]), row[2])
+            self._loaded_at = time.monotonic()
+        logger.info(f"Reservation matcher loaded {len(rows)} pending reservations")
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            await self.load(db)
+
+    def _add(self, reservation_id: int, reservation_time: datetime, party_size: int):
+        self._pending[reservation_id] = (reservation_time, party_size)
+        heapq.heappush(self._buckets.setdefault(party_size, []), (reservation_time, reservation_id))
+
+    def add(self, reservation_id: int, reservation_time: datetime, party_size: int):
+        with self._lock:
+            self._add(reservation_id, reservation_time, party_size)
+
+    def remove(self, reservation_id: int):
+        with self._lock:
+            self._pending.pop(reservation_id, None)
+
+    def _peek(self, party_size: int) -> Optional[Tuple[datetime, int]]:
+        heap = self._buckets.get(party_size)
+        while heap:
+            reservation_time, reservation_id = heap[0]
+            if self._pending.get(reservation_id) == (reservation_time, party_size):
+                return heap[0]
+            heapq.heappop(heap)  # seated, cancelled or superseded
+        return None
+
+    def pop_best(self, capacity: int, now: datetime) -> Optional[Tuple[int, datetime, int]]:
+        """
+        Take the best reservation for a table of `capacity` seats.
+
+        Reservations already due win over early ones; within each group the
+        largest party that fits wins (fewest empty seats), then the earliest.
+        Returns (reservation_id, reservation_time, party_size) or None; pass
+        it back to add() if the seating transaction fails.
+        """
+        with self._lock:
+            sizes = [size for size in sorted(self._buckets, reverse=True) if size <= capacity]
+            for cutoff in (now, now + self.early_seat):
+                for size in sizes:
+                    top = self._peek(size)
+                    if top and top[0] <= cutoff:
+                        heapq.heappop(self._buckets[size])
+                        del self._pending[top[1]]
+                        return top[1], top[0], size
+        return None
+
+
+reservation_matcher = ReservationMatcher()
@@ -6,5 +6,6 @@ from .analytics import router as analytics
 from .orchestrator import router as orchestrator
 from .vision import router as vision
 from .tables import router as table
+from .menu import router as menu
 
 
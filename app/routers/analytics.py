@@ -1,15 +1,18 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.schemas.analytics import AnalyticsResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from datetime import datetime
+from app.schemas.analytics import AnalyticsResponse, TimeseriesResponse
 from app.services.analytics_agent.service import compute_kpis
-from db.connection import get_db
+from app.services.analytics_agent.timeseries import compute_timeseries
+from app.services.analytics_agent.cache import kpi_cache
+from db.connection import get_async_db
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("/analytics/summary", response_model=AnalyticsResponse)
-async def get_analytics_summary(date: str, range_type: str = "daily", db: Session = Depends(get_db)):
+async def get_analytics_summary(date: str, range_type: str = "daily", db: AsyncSession = Depends(get_async_db)):
     try:
         kpis = await compute_kpis(db, date, range_type)
         logger.info(f"Fetched KPIs for date {date}, range {range_type}: {kpis}")
@@ -18,4 +21,18 @@ async def get_analytics_summary(date: str, range_type: str = "daily", db: Sessio
         raise HTTPException(status_code=400, detail=str(ve))
     except Exception as e:
         logger.error(f"Analytics fetch failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/analytics/timeseries", response_model=TimeseriesResponse, response_model_exclude_none=True)
+async def get_analytics_timeseries(start: datetime, end: datetime, bucket_minutes: int = 60, include_items: bool = True, db: AsyncSession = Depends(get_async_db)):
+    try:
+        return await compute_timeseries(db, start, end, bucket_minutes, include_items)
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Analytics timeseries failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+@router.get("/analytics/cache-stats")
+async def get_analytics_cache_stats():
+    return kpi_cache.stats()
@@ -1,8 +1,9 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 from app.services.faq_agent.service import answer_query
-from sqlalchemy.orm import Session
-from db.connection import get_db
+from app.services.faq_agent.cache import faq_cache
+from app.services.faq_agent.similarity import faq_index
+from app.services.faq_agent.policy import faq_policy
 import logging
 
 router = APIRouter()
@@ -15,11 +16,23 @@ class FAQResponse(BaseModel):
     response: str
 
 @router.post("/query", response_model=FAQResponse)
-async def faq_query(request: FAQRequest, db: Session = Depends(get_db)):
+async def faq_query(request: FAQRequest):
     try:
         response = await answer_query(request.query)
         logger.info(f"Processed FAQ query: {request.query}")
         return FAQResponse(response=response)
     except Exception as e:
         logger.error(f"FAQ query failed: {str(e)}")
-        raise HTTPException(status_code=500, detail=f"FAQ query failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"FAQ query failed: {str(e)}")
+
+@router.get("/stats")
+async def faq_stats():
+    """Answer cache hit rate, coalesced requests and LLM latency, plus paraphrase matches."""
+    return {**faq_cache.stats(), "similarity": faq_index.stats(), "policy": faq_policy.status()}
+
+@router.post("/policy/reload")
+async def reload_policy():
+    """Re-read the policy file now and drop the FAQ answers generated with the old one."""
+    version = faq_policy.reload()
+    logger.info(f"FAQ policy reload requested (v{version})")
+    return {"version": version}
@@ -1,11 +1,13 @@
 from fastapi import APIRouter, Depends
 from datetime import datetime
 import asyncio
-from app.orchestrator import event_queue
+from app.orchestrator import get_orchestrator_status
+from app.telemetry_writer import telemetry_writer
 import logging
 
 from app.schemas.health import HealthResponse
-from db.connection import engine  # Step 2 file; engine is SQLAlchemy engine
+from db.connection import engine, engine_profile  # Step 2 file; engine is SQLAlchemy engine
+from sqlalchemy.sql import text
 
 router = APIRouter()
 logger = logging.getLogger("ai_restaurant.health")
@@ -17,7 +19,7 @@ def _check_db_sync():
     """
     with engine.connect() as conn:
         # Quick, harmless query that works across DB backends
-        res = conn.execute("SELECT 1")
+        res = conn.execute(text("SELECT 1"))
         # consume / ensure query was executed
         _ = res.fetchone()
     return True
@@ -31,7 +33,8 @@ async def health_check():
       "status": "ok",
       "db_connected": true,
       "timestamp": "2025-08-16T12:34:56.789Z",
-      "message": "OK"
+      "message": "OK",
+      "db_profile": {"backend": "sqlite", "pragmas": {"journal_mode": "WAL", ...}}
     }
     """
     db_ok = False
@@ -48,9 +51,16 @@ async def health_check():
         status=status,
         db_connected=db_ok,
         timestamp=datetime.utcnow(),
-        message=msg
+        message=msg,
+        db_profile=engine_profile(str(engine.url))
     )
 
 @router.get("/orchestrator-status")
 async def orchestrator_status():
-    return {"queue_size": event_queue.qsize(), "status": "running"}
\ No newline at end of file
+    """Bus depth plus per-shard depth, lag and drop counts."""
+    return get_orchestrator_status()
+
+@router.get("/telemetry-status")
+async def telemetry_status():
+    """Group-commit writer buffer, batch sizes and flush latency."""
+    return telemetry_writer.stats()
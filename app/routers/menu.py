@@ -0,0 +1,13 @@
+from fastapi import APIRouter
+from app.orchestrator import publish_menu_change
+import logging
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+@router.post("/menu/reload")
+async def reload_menu():
+    """Signal that the menu table changed; every agent re-reads the catalog on next use."""
+    version = await publish_menu_change("admin_reload")
+    logger.info(f"Menu catalog reload requested (v{version})")
+    return {"version": version}
@@ -1,7 +1,7 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
-from app.orchestrator import assign_table_to_reservation
-from db.connection import get_db
+from app.orchestrator import assign_table_to_reservation, create_reservation, replay_events
+from app.schemas.orchestrator import ReplayRequest, ReplayResponse, ReservationCreateRequest, ReservationResponse
 
 router = APIRouter()
 
@@ -9,8 +9,23 @@ class TableAssignRequest(BaseModel):
     table_id: int
 
 @router.post("/table-assign")
-async def assign_table(request: TableAssignRequest, db=Depends(get_db)):
+async def assign_table(request: TableAssignRequest):
     result = await assign_table_to_reservation(request.table_id)
     if result:
         return result
-    return {"error": "Table assignment failed"}
\ No newline at end of file
+    return {"error": "Table assignment failed"}
+
+@router.post("/orchestrator/replay", response_model=ReplayResponse)
+async def replay(request: ReplayRequest):
+    """Re-dispatch journaled events from a time range (UTC)."""
+    try:
+        return ReplayResponse(replayed=await replay_events(request.since, request.until))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
+
+@router.post("/reservations", response_model=ReservationResponse)
+async def create_reservation_endpoint(request: ReservationCreateRequest):
+    try:
+        return ReservationResponse(**await create_reservation(request.customer_name, request.reservation_time, request.party_size))
+    except ValueError as ve:
+        raise HTTPException(status_code=400, detail=str(ve))
\ No newline at end of file
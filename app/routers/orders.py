@@ -1,17 +1,17 @@
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.schemas.orders import OrderCreateRequest, OrderUpdateRequest, OrderResponse
-from app.services.order_agent.service import create_order, update_order_status
-from db.connection import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from app.schemas.orders import OrderCreateRequest, OrderUpdateRequest, OrderResponse, BulkOrderCreateRequest, BulkOrderResponse
+from app.services.order_agent.service import create_order, create_orders_bulk, update_order_status
+from db.connection import get_async_db
 import logging
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.post("/orders/create", response_model=OrderResponse)
-async def create_order_endpoint(request: OrderCreateRequest, db: Session = Depends(get_db)):
+async def create_order_endpoint(request: OrderCreateRequest, db: AsyncSession = Depends(get_async_db)):
     try:
-        result = await create_order(db, request.table_id, request.items)
+        result = await create_order(db, request.table_id, [item.model_dump() for item in request.items])
         logger.info(f"Order created: {result}")
         return OrderResponse(**result)
     except ValueError as ve:
@@ -21,8 +21,22 @@ async def create_order_endpoint(request: OrderCreateRequest, db: Session = Depen
         logger.error(f"Order creation error: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@router.post("/orders/bulk", response_model=BulkOrderResponse)
+async def create_orders_bulk_endpoint(request: BulkOrderCreateRequest, db: AsyncSession = Depends(get_async_db)):
+    try:
+        results = await create_orders_bulk(db, [order.model_dump() for order in request.orders], request.batch_size)
+        created = sum(r["status"] == "created" for r in results)
+        logger.info(f"Bulk orders: {created} created, {len(results) - created} failed")
+        return BulkOrderResponse(created=created, failed=len(results) - created, results=results)
+    except ValueError as ve:
+        logger.error(f"Bulk order error: {str(ve)}")
+        raise HTTPException(status_code=400, detail=str(ve))
+    except Exception as e:
+        logger.error(f"Bulk order error: {str(e)}")
+        raise HTTPException(status_code=500, detail=str(e))
+
 @router.put("/orders/update", response_model=OrderResponse)
-async def update_order_endpoint(request: OrderUpdateRequest, db: Session = Depends(get_db)):
+async def update_order_endpoint(request: OrderUpdateRequest, db: AsyncSession = Depends(get_async_db)):
     try:
         result = await update_order_status(db, request.order_id, request.status)
         logger.info(f"Order updated: {result}")
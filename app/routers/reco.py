@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException
-from app.schemas.reco import RecoRequest, RecoResponse
-from app.services.reco_agent.service import get_recommendations
+from app.schemas.reco import RecoBatchRequest, RecoBatchResponse, RecoRequest, RecoResponse
+from app.services.reco_agent.service import get_recommendations, get_recommendations_batch
 import logging
 
 router = APIRouter(prefix="/api/reco", tags=["recommendations"])
@@ -15,4 +15,13 @@ async def suggest_endpoint(request: RecoRequest):
         return RecoResponse(suggestions=suggestions)
     except Exception as e:
         logger.error(f"Recommendation suggestion error: {str(e)}")
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.post("/suggest/batch", response_model=RecoBatchResponse)
+async def suggest_batch_endpoint(request: RecoBatchRequest):
+    try:
+        suggestions = await get_recommendations_batch(order_ids=request.order_ids, status=request.status)
+        return RecoBatchResponse(suggestions=suggestions)
+    except Exception as e:
+        logger.error(f"Batch recommendation error: {str(e)}")
+        raise HTTPException(status_code=400, detail=str(e))
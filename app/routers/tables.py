@@ -1,19 +1,18 @@
 from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from db.connection import get_db
+from sqlalchemy.ext.asyncio import AsyncSession
+from db.connection import get_async_db
 import logging
-from sqlalchemy.sql import text
+from app.table_index import table_index
 
-router = APIRouter(prefix="/api/tables")
+router = APIRouter()
 logger = logging.getLogger(__name__)
 
 @router.get("")
-async def get_tables(db: Session = Depends(get_db)):
+async def get_tables(db: AsyncSession = Depends(get_async_db)):
+    """Served from the in-memory table index; the DB is only re-read when the index is stale."""
     try:
-        tables = db.execute(
-            text("SELECT id, capacity, status FROM tables")
-        ).fetchall()
-        return [{"id": row[0], "capacity": row[1], "status": row[2]} for row in tables]
+        await table_index.ensure_loaded(db)
+        return table_index.snapshot()
     except Exception as e:
         logger.error(f"Failed to fetch tables: {str(e)}")
         raise
\ No newline at end of file
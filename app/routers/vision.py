@@ -1,27 +1,75 @@
-from fastapi import APIRouter, UploadFile, File, HTTPException
+import asyncio
+import logging
+import time
+from fastapi import APIRouter, UploadFile, File, Form, HTTPException, WebSocket, WebSocketDisconnect
+from typing import Optional
 from app.schemas.vision import VisionResponse
-from app.services.vision_agent.service import detect_table_status
-import aiofiles
-import os
+from app.services.vision_agent.service import detect_table_status_from_bytes
+from app.services.vision_agent.pool import VisionOverloaded, vision_pool
+from app.services.vision_agent.stream import camera_streams
+from app.services.vision_agent.tracker import table_tracker
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.post("/vision/ingest", response_model=VisionResponse)
-async def ingest_image(file: UploadFile = File(...)):
+async def ingest_image(file: UploadFile = File(...), camera_id: Optional[str] = Form(None)):
     """FastAPI endpoint for image upload and detection."""
+    if not file.filename.endswith(('.png', '.jpg')):
+        raise HTTPException(400, "Invalid format")
     try:
-        if not file.filename.endswith(('.png', '.jpg')):
-            raise HTTPException(400, "Invalid format")
-
-        path = f"data/sample_frames/{file.filename}"
-        async with aiofiles.open(path, 'wb') as f:
-            await f.write(await file.read())
-
-        result = await detect_table_status(path)  # Await async function
+        # Decoded in memory (no temp file); a saturated pool coalesces frames per camera (or filename)
+        result = await detect_table_status_from_bytes(await file.read(), camera_id, source=camera_id or file.filename)
         return VisionResponse(**result)
+    except VisionOverloaded as vo:
+        raise HTTPException(503, str(vo))
+    except ValueError as ve:
+        raise HTTPException(400, str(ve))
     except Exception as e:
         raise HTTPException(500, str(e))
+
+@router.get("/vision/stats")
+async def vision_stats():
+    """Pool saturation, per-frame queue-wait and compute times, tracker transition/suppression counts and open streams."""
+    return {**vision_pool.stats(), "tracker": table_tracker.stats(), "streams": camera_streams.stats()}
+
+@router.websocket("/vision/stream/{camera_id}")
+async def stream_frames(websocket: WebSocket, camera_id: str):
+    """
+    Long-lived frame ingest for one camera: send encoded frames as binary messages.
+
+    Only the newest frame is analyzed; frames that arrive while detection
+    is busy are skipped. Each result is sent back as JSON with the frame's
+    sequence number, the skipped count so far and the frame's latency.
+    """
+    await websocket.accept()
+    frames = camera_streams.open(camera_id)
+
+    async def receive():
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+                if message.get("bytes"):
+                    frames.put(message["bytes"])
+        finally:
+            frames.close()
+
+    receiver = asyncio.create_task(receive())
+    try:
+        while (frame := await frames.get()) is not None:
+            seq, data, arrived_at = frame
+            try:
+                result = VisionResponse(**await detect_table_status_from_bytes(data, camera_id, source=camera_id)).model_dump()
+            except (ValueError, VisionOverloaded) as e:
+                result = {"error": str(e)}
+            result.update(seq=seq, skipped=frames.skipped, latency_ms=round((time.monotonic() - arrived_at) * 1000, 3))
+            await websocket.send_json(result)
+    except WebSocketDisconnect:
+        pass
+    except Exception as e:
+        logger.error(f"Camera {camera_id} stream error: {str(e)}")
     finally:
-        # Clean up file
-        if os.path.exists(path):
-            os.remove(path)
\ No newline at end of file
+        receiver.cancel()
+        camera_streams.close(frames)
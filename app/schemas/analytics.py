@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List
+from typing import List, Optional
 
 class TopItem(BaseModel):
     menu_id: int
@@ -10,4 +10,20 @@ class AnalyticsResponse(BaseModel):
     total_orders: int
     total_revenue: float
     top_items: List[TopItem]
-    avg_ticket_size: float
\ No newline at end of file
+    avg_ticket_size: float
+    paid_orders: int = 0
+
+class ItemSeries(BaseModel):
+    menu_id: int
+    name: str
+    quantity: List[int]
+
+class TimeseriesResponse(BaseModel):
+    start: str
+    end: str
+    bucket_minutes: int
+    buckets: List[str]  # bucket start times; every list below is aligned with it
+    orders: List[int]
+    covers: List[int]
+    revenue: List[float]
+    items: Optional[List[ItemSeries]] = None
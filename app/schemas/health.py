@@ -6,3 +6,4 @@ class HealthResponse(BaseModel):
     db_connected: bool
     timestamp: datetime
     message: str | None = None
+    db_profile: dict | None = None
@@ -1,4 +1,5 @@
 from pydantic import BaseModel
+from datetime import datetime
 
 class TableAssignRequest(BaseModel):
     table_id: int
@@ -6,4 +7,22 @@ class TableAssignRequest(BaseModel):
 class TableAssignResponse(BaseModel):
     table_id: int
     order_id: int
-    reservation_id: int | None = None
\ No newline at end of file
+    reservation_id: int | None = None
+
+class ReplayRequest(BaseModel):
+    since: datetime
+    until: datetime | None = None
+
+class ReplayResponse(BaseModel):
+    replayed: int
+
+class ReservationCreateRequest(BaseModel):
+    customer_name: str
+    reservation_time: datetime
+    party_size: int = 2
+
+class ReservationResponse(BaseModel):
+    reservation_id: int
+    customer_name: str
+    reservation_time: datetime
+    party_size: int
\ No newline at end of file
@@ -1,5 +1,9 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import List, Optional
+from datetime import datetime
+
+# Order lifecycle, in order; shared by the order and reco services
+VALID_STATUSES = ["pending", "preparing", "served", "paid"]
 
 class OrderItem(BaseModel):
     menu_id: int
@@ -17,4 +21,25 @@ class OrderResponse(BaseModel):
     order_id: int
     table_id: int
     status: str
-    items: Optional[List[OrderItem]] = None
\ No newline at end of file
+    items: Optional[List[OrderItem]] = None
+
+class BulkOrder(BaseModel):
+    table_id: int
+    items: List[OrderItem]
+    status: str = "pending"
+    created_at: Optional[datetime] = None
+
+class BulkOrderCreateRequest(BaseModel):
+    orders: List[BulkOrder]
+    batch_size: int = Field(default=100, ge=1, le=1000)
+
+class BulkOrderResult(BaseModel):
+    index: int
+    order_id: Optional[int] = None
+    status: str  # created | failed
+    error: Optional[str] = None
+
+class BulkOrderResponse(BaseModel):
+    created: int
+    failed: int
+    results: List[BulkOrderResult]
\ No newline at end of file
@@ -1,8 +1,15 @@
 from pydantic import BaseModel
-from typing import List
+from typing import Dict, List, Optional
 
 class RecoRequest(BaseModel):
     order_id: int
 
 class RecoResponse(BaseModel):
-    suggestions: List[dict]  # e.g., [{"item_id": int, "uplift": float}]
\ No newline at end of file
+    suggestions: List[dict]  # e.g., [{"item_id": int, "uplift": float}]
+
+class RecoBatchRequest(BaseModel):
+    order_ids: Optional[List[int]] = None
+    status: Optional[str] = None  # e.g. "pending": every order currently in that status
+
+class RecoBatchResponse(BaseModel):
+    suggestions: Dict[int, List[dict]]  # order_id -> suggestions
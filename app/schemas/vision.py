@@ -1,6 +1,16 @@
 from pydantic import BaseModel
+from typing import List, Optional
 
-class VisionResponse(BaseModel):
+class TableDetection(BaseModel):
     table_id: int
     status: str
-    confidence: float
\ No newline at end of file
+    confidence: float
+    changed: bool = False  # False when the tracker suppressed this frame's event
+
+class VisionResponse(BaseModel):
+    table_id: int  # first table in the frame, for single-table clients
+    status: str
+    confidence: float
+    changed: bool = False
+    camera_id: Optional[str] = None
+    tables: List[TableDetection] = []
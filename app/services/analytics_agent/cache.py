@@ -0,0 +1,98 @@
+import copy
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+ANALYTICS_CACHE_SIZE = int(os.getenv("ANALYTICS_CACHE_SIZE", "256"))
+# Entries covering today expire after this long if no order event invalidates them first
+ANALYTICS_CACHE_TTL_SECONDS = float(os.getenv("ANALYTICS_CACHE_TTL_SECONDS", "30"))
+
+
+class KpiCache:
+    """
+    LRU cache of compute_kpis results keyed by (date, range_type).
+
+    Entries for closed periods never expire; entries whose range includes
+    today expire after `ttl` seconds. Either kind is dropped when an order
+    event lands on one of its days (see invalidate_day), which also covers
+    orders back-filled into a closed period.
+    """
+
+    def __init__(self, max_size: int = ANALYTICS_CACHE_SIZE, ttl: float = ANALYTICS_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[Tuple[str, str], Tuple[Dict, date, date, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        # Bumped on every invalidation; each day remembers the generation it was last
+        # invalidated at, so only results overlapping an invalidated day are discarded
+        self.generation = 0
+        self._invalidated: Dict[date, int] = {}
+        self._cleared = 0
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Tuple[str, str]) -> Optional[Dict]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[3] is not None and entry[3] <= time.monotonic():
+                del self._entries[key]
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return copy.deepcopy(entry[0])
+
+    def put(self, key: Tuple[str, str], kpis: Dict, start: date, end: date, closed: bool, generation: int):
+        """Store a result for days [start, end) unless one of those days was invalidated since `generation`."""
+        with self._lock:
+            if self._cleared > generation or any(start <= day < end and at > generation for day, at in self._invalidated.items()):
+                return
+            expires_at = None if closed else time.monotonic() + self.ttl
+            self._entries[key] = (copy.deepcopy(kpis), start, end, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate_day(self, day: date) -> int:
+        with self._lock:
+            self.generation += 1
+            self._invalidated[day] = self.generation
+            stale = [key for key, entry in self._entries.items() if entry[1] <= day < entry[2]]
+            for key in stale:
+                del self._entries[key]
+            self.invalidations += len(stale)
+        if stale:
+            logger.info(f"KPI cache dropped {len(stale)} entries covering {day}")
+        return len(stale)
+
+    def clear(self):
+        with self._lock:
+            self.generation += 1
+            self._cleared = self.generation
+            # Covered by _cleared from now on
+            self._invalidated.clear()
+            self._entries.clear()
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else None,
+            "invalidations": self.invalidations,
+        }
+
+
+kpi_cache = KpiCache()
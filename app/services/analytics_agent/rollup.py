@@ -0,0 +1,199 @@
+import logging
+from collections import Counter
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from db.connection import AsyncSessionLocal
+from app.menu_catalog import menu_catalog
+
+logger = logging.getLogger(__name__)
+
+# analytics_daily holds one row per UTC day: order count, revenue (the sum of
+# ticket sizes, so avg ticket = total_revenue / total_orders), paid orders and
+# the most popular item; analytics_daily_items holds per-item quantities.
+# Order events add deltas to a day's rows. A closed day is recomputed once from
+# orders/order_items and stamped finalized_at; later deltas (e.g. back-filled
+# orders) still apply on top of it. analytics_order_state records every order
+# already counted (and whether it was counted as paid), so a delta is applied
+# at most once per order: events recovered from the journal, replayed, or
+# still queued while recompute ran are skipped.
+
+UPSERT_DAY = text("""
+    INSERT INTO analytics_daily (date, total_orders, total_revenue, paid_orders)
+    VALUES (:date, :orders, :revenue, :paid)
+    ON CONFLICT (date) DO UPDATE SET
+        total_orders = analytics_daily.total_orders + excluded.total_orders,
+        total_revenue = analytics_daily.total_revenue + excluded.total_revenue,
+        paid_orders = analytics_daily.paid_orders + excluded.paid_orders
+""")
+
+UPSERT_ITEM = text("""
+    INSERT INTO analytics_daily_items (date, menu_id, quantity)
+    VALUES (:date, :menu_id, :quantity)
+    ON CONFLICT (date, menu_id) DO UPDATE SET quantity = analytics_daily_items.quantity + excluded.quantity
+""")
+
+MARK_ORDER = text("""
+    INSERT INTO analytics_order_state (order_id, date, paid) VALUES (:order_id, :date, :paid)
+    ON CONFLICT (order_id) DO NOTHING
+""")
+
+MARK_PAID = text("""
+    UPDATE analytics_order_state SET paid = :paid WHERE order_id = :order_id AND paid != :paid
+""")
+
+UPDATE_POPULAR = text("""
+    UPDATE analytics_daily SET popular_item_id = (
+        SELECT menu_id FROM analytics_daily_items WHERE date = :date ORDER BY quantity DESC, menu_id LIMIT 1
+    ) WHERE date = :date
+""")
+
+def as_date(value) -> date:
+    """SQLite hands DATE()/date columns back as strings; Postgres as dates."""
+    if isinstance(value, datetime):
+        return value.date()
+    return value if isinstance(value, date) else date.fromisoformat(str(value)[:10])
+
+def utc_today() -> date:
+    return datetime.utcnow().date()
+
+async def apply_order_created(payload: Dict):
+    """Add one new order to its day's rollup rows, unless that order is already counted."""
+    created_at = payload.get("created_at")
+    day = as_date(created_at) if created_at else utc_today()
+    quantities = Counter()
+    for item in payload.get("items", []):
+        quantities[item["menu_id"]] += item["quantity"]
+    async with AsyncSessionLocal() as db:
+        catalog = await menu_catalog.get(db)
+        revenue = float(sum(quantity * catalog.prices.get(menu_id, 0.0) for menu_id, quantity in quantities.items()))
+        paid = int(payload.get("status") == "paid")
+        marked = await db.execute(MARK_ORDER, {"order_id": payload["order_id"], "date": day, "paid": paid})
+        if marked.rowcount == 0:
+            logger.info(f"Order {payload['order_id']} already in the analytics rollup; skipping")
+            return
+        await db.execute(UPSERT_DAY, {"date": day, "orders": 1, "revenue": revenue, "paid": paid})
+        if quantities:
+            await db.execute(UPSERT_ITEM, [{"date": day, "menu_id": m, "quantity": q} for m, q in quantities.items()])
+            await db.execute(UPDATE_POPULAR, {"date": day})
+        await db.commit()
+
+async def apply_order_updated(payload: Dict):
+    """Track orders moving into or out of 'paid' on their day's row (once per actual change)."""
+    paid = int(payload.get("status") == "paid")
+    delta = paid - int(payload.get("previous_status") == "paid")
+    if not delta or not payload.get("created_at"):
+        return
+    async with AsyncSessionLocal() as db:
+        # Orders not counted yet (or already at this paid state) are left to recompute
+        if (await db.execute(MARK_PAID, {"order_id": payload["order_id"], "paid": paid})).rowcount == 0:
+            return
+        await db.execute(UPSERT_DAY, {"date": as_date(payload["created_at"]), "orders": 0, "revenue": 0.0, "paid": delta})
+        await db.commit()
+
+async def recompute(db: AsyncSession, start: date, end: date):
+    """Rebuild the rollup for days in [start, end) from orders/order_items and mark the closed ones final."""
+    bounds = {"start": datetime.combine(start, datetime.min.time()), "end": datetime.combine(end, datetime.min.time())}
+    orders = (await db.execute(
+        text("""
+            SELECT DATE(created_at), COUNT(*), SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END)
+            FROM orders
+            WHERE created_at >= :start AND created_at < :end
+            GROUP BY DATE(created_at)
+        """),
+        bounds
+    )).fetchall()
+    items = (await db.execute(
+        text("""
+            SELECT DATE(o.created_at), oi.menu_id, SUM(oi.quantity)
+            FROM order_items oi
+            JOIN orders o ON oi.order_id = o.id
+            WHERE o.created_at >= :start AND o.created_at < :end
+            GROUP BY DATE(o.created_at), oi.menu_id
+        """),
+        bounds
+    )).fetchall()
+    catalog = await menu_catalog.get(db)
+
+    days = {start + timedelta(days=i): {"orders": 0, "paid": 0, "revenue": 0.0, "items": {}} for i in range((end - start).days)}
+    for row in orders:
+        days[as_date(row[0])].update(orders=row[1], paid=int(row[2] or 0))
+    for row in items:
+        day = days[as_date(row[0])]
+        day["items"][row[1]] = int(row[2])
+        day["revenue"] += int(row[2]) * catalog.prices.get(row[1], 0.0)
+
+    today = utc_today()
+    now = datetime.utcnow()
+    await db.execute(text("DELETE FROM analytics_daily_items WHERE date >= :start AND date < :end"), {"start": start, "end": end})
+    await db.execute(text("DELETE FROM analytics_daily WHERE date >= :start AND date < :end"), {"start": start, "end": end})
+    # Every order read above is now counted; later events for them must not add deltas
+    await db.execute(text("DELETE FROM analytics_order_state WHERE date >= :start AND date < :end"), {"start": start, "end": end})
+    await db.execute(
+        text("""
+            INSERT INTO analytics_order_state (order_id, date, paid)
+            SELECT id, DATE(created_at), CASE WHEN status = 'paid' THEN 1 ELSE 0 END
+            FROM orders WHERE created_at >= :start AND created_at < :end
+        """),
+        bounds
+    )
+    await db.execute(
+        text("""
+            INSERT INTO analytics_daily (date, total_orders, total_revenue, paid_orders, popular_item_id, finalized_at)
+            VALUES (:date, :orders, :revenue, :paid, :popular, :finalized_at)
+        """),
+        [
+            {
+                "date": day, "orders": totals["orders"], "revenue": totals["revenue"], "paid": totals["paid"],
+                "popular": min(totals["items"], key=lambda m: (-totals["items"][m], m)) if totals["items"] else None,
+                "finalized_at": now if day < today else None,
+            }
+            for day, totals in days.items()
+        ]
+    )
+    item_rows = [{"date": day, "menu_id": m, "quantity": q} for day, totals in days.items() for m, q in totals["items"].items()]
+    if item_rows:
+        await db.execute(text("INSERT INTO analytics_daily_items (date, menu_id, quantity) VALUES (:date, :menu_id, :quantity)"), item_rows)
+    await db.commit()
+    logger.info(f"Analytics rollup recomputed for {start} to {end}")
+
+async def ensure_finalized(db: AsyncSession, start: date, end: date):
+    """Recompute [start, end) unless every day in it already has a finalized row."""
+    finalized = (await db.execute(
+        text("SELECT COUNT(*) FROM analytics_daily WHERE date >= :start AND date < :end AND finalized_at IS NOT NULL"),
+        {"start": start, "end": end}
+    )).scalar()
+    if finalized < (end - start).days:
+        await recompute(db, start, end)
+
+async def catch_up(db: AsyncSession, until: Optional[date] = None):
+    """Finalize every closed day after the last finalized one (the startup catch-up job)."""
+    until = until or utc_today()
+    last = (await db.execute(text("SELECT MAX(date) FROM analytics_daily WHERE finalized_at IS NOT NULL"))).scalar()
+    if last is not None:
+        start = as_date(last) + timedelta(days=1)
+    else:
+        first = (await db.execute(text("SELECT MIN(created_at) FROM orders"))).scalar()
+        if first is None:
+            return
+        start = as_date(first)
+    if start < until:
+        await recompute(db, start, until)
+
+async def read_days(db: AsyncSession, start: date, end: date) -> Tuple[int, float, int, Dict[int, int]]:
+    """Totals for finalized days in [start, end): (orders, revenue, paid orders, quantity per menu id)."""
+    rows: List = (await db.execute(
+        text("""
+            SELECT NULL, SUM(total_orders), SUM(total_revenue), SUM(paid_orders)
+            FROM analytics_daily WHERE date >= :start AND date < :end
+            UNION ALL
+            SELECT menu_id, SUM(quantity), NULL, NULL
+            FROM analytics_daily_items WHERE date >= :start AND date < :end
+            GROUP BY menu_id
+        """),
+        {"start": start, "end": end}
+    )).fetchall()
+    totals = next(row for row in rows if row[0] is None)
+    quantities = {row[0]: int(row[1]) for row in rows if row[0] is not None}
+    return int(totals[1] or 0), float(totals[2] or 0.0), int(totals[3] or 0), quantities
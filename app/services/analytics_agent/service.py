@@ -1,71 +1,82 @@
 from sqlalchemy.sql import text
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import datetime, timedelta
+from typing import Dict, Tuple
 import logging
+import traceback
 from app.orchestrator import publish_event
+from app.menu_catalog import menu_catalog
+from app.services.analytics_agent.rollup import ensure_finalized, read_days, utc_today
+from app.services.analytics_agent.cache import kpi_cache
 
 logger = logging.getLogger(__name__)
 
-async def compute_kpis(db: Session, date: str, range_type: str) -> dict:
+# Order count, paid count and per-item quantities for a live range in one round trip
+LIVE_QUERY = text("""
+    SELECT NULL AS menu_id, COUNT(*) AS quantity, SUM(CASE WHEN status = 'paid' THEN 1 ELSE 0 END) AS paid
+    FROM orders
+    WHERE created_at >= :start AND created_at < :end
+    UNION ALL
+    SELECT oi.menu_id, SUM(oi.quantity), NULL
+    FROM order_items oi
+    JOIN orders o ON oi.order_id = o.id
+    WHERE o.created_at >= :start AND o.created_at < :end
+    GROUP BY oi.menu_id
+""")
+
+async def compute_live(db: AsyncSession, start: datetime, end: datetime) -> Tuple[int, int, Dict[int, int]]:
+    """(orders, paid orders, quantity per menu id) for [start, end) straight from orders/order_items."""
+    rows = (await db.execute(LIVE_QUERY, {"start": start, "end": end})).fetchall()
+    totals = next(row for row in rows if row[0] is None)
+    return int(totals[1] or 0), int(totals[2] or 0), {row[0]: int(row[1]) for row in rows if row[0] is not None}
+
+async def compute_kpis(db: AsyncSession, date: str, range_type: str) -> dict:
     try:
         start_date = datetime.strptime(date, "%Y-%m-%d")
         end_date = start_date + timedelta(days=1 if range_type == "daily" else 7)
-        
-        logger.info(f"Querying orders for range: {start_date} to {end_date}")
-        orders = db.execute(
-            text("""
-            SELECT COUNT(*) as total_orders, COALESCE(SUM(oi.quantity * m.price), 0) as total_revenue
-            FROM orders o
-            LEFT JOIN order_items oi ON o.id = oi.order_id
-            LEFT JOIN menu m ON oi.menu_id = m.id
-            WHERE o.created_at BETWEEN :start_date AND :end_date
-            """),
-            {"start_date": start_date, "end_date": end_date}
-        ).fetchone()
-        logger.info(f"Orders query result: {orders}")
-        total_orders = orders[0] if orders else 0
-        total_revenue = float(orders[1]) if orders and orders[1] is not None else 0.0
 
-        logger.info(f"Querying top items for range: {start_date} to {end_date}")
-        top_items = db.execute(
-            text("""
-            SELECT m.id, m.name, COALESCE(SUM(oi.quantity), 0) as quantity
-            FROM order_items oi
-            LEFT JOIN menu m ON oi.menu_id = m.id
-            LEFT JOIN orders o ON oi.order_id = o.id
-            WHERE o.created_at BETWEEN :start_date AND :end_date
-            GROUP BY m.id, m.name
-            ORDER BY quantity DESC
-            LIMIT 3
-            """),
-            {"start_date": start_date, "end_date": end_date}
-        ).fetchall() or []
-        logger.info(f"Top items query result: {top_items}")
+        key = (start_date.date().isoformat(), "daily" if range_type == "daily" else "weekly")
+        cached = kpi_cache.get(key)
+        if cached is not None:
+            logger.info(f"KPI cache hit for {key}")
+            return cached
+        generation = kpi_cache.generation
+
+        # Closed days come from the analytics_daily rollup; only today is computed live
+        today = utc_today()
+        closed_end = min(end_date.date(), today)
+        total_orders, total_revenue, paid_orders, quantities = 0, 0.0, 0, {}
+        if start_date.date() < closed_end:
+            logger.info(f"Reading rollup for range: {start_date.date()} to {closed_end}")
+            await ensure_finalized(db, start_date.date(), closed_end)
+            total_orders, total_revenue, paid_orders, quantities = await read_days(db, start_date.date(), closed_end)
 
-        logger.info(f"Querying avg ticket for range: {start_date} to {end_date}")
-        avg_ticket_result = db.execute(
-            text("""
-            SELECT COALESCE(AVG(total), 0) FROM (
-                SELECT o.id, COALESCE(SUM(oi.quantity * m.price), 0) as total
-                FROM orders o
-                LEFT JOIN order_items oi ON o.id = oi.order_id
-                LEFT JOIN menu m ON oi.menu_id = m.id
-                WHERE o.created_at BETWEEN :start_date AND :end_date
-                GROUP BY o.id
-            ) as ticket_sizes
-            """),
-            {"start_date": start_date, "end_date": end_date}
-        ).fetchone()
-        logger.info(f"Avg ticket query result: {avg_ticket_result}")
-        avg_ticket = float(avg_ticket_result[0]) if avg_ticket_result and avg_ticket_result[0] is not None else 0.0
+        catalog = await menu_catalog.get(db)
+        if start_date.date() <= today < end_date.date():
+            logger.info(f"Querying live orders for {today}")
+            day_start = datetime.combine(today, datetime.min.time())
+            live_orders, live_paid, live_quantities = await compute_live(db, day_start, day_start + timedelta(days=1))
+            total_orders += live_orders
+            paid_orders += live_paid
+            # Prices and names come from the menu catalog instead of a join
+            total_revenue += float(sum(quantity * catalog.prices.get(menu_id, 0.0) for menu_id, quantity in live_quantities.items()))
+            for menu_id, quantity in live_quantities.items():
+                quantities[menu_id] = quantities.get(menu_id, 0) + quantity
+
+        top_items = sorted(quantities.items(), key=lambda item: item[1], reverse=True)[:3]
+        # Orders without items count as zero-value tickets
+        avg_ticket = total_revenue / total_orders if total_orders else 0.0
 
         kpis = {
             "total_orders": total_orders,
             "total_revenue": total_revenue,
-            "top_items": [{"menu_id": row[0], "name": row[1], "quantity": row[2]} for row in top_items],
-            "avg_ticket_size": avg_ticket
+            "top_items": [{"menu_id": menu_id, "name": catalog.names.get(menu_id, "Unknown"), "quantity": quantity} for menu_id, quantity in top_items],
+            "avg_ticket_size": avg_ticket,
+            "paid_orders": paid_orders
         }
-        
+        kpi_cache.put(key, kpis, start_date.date(), end_date.date(), closed=end_date.date() <= today, generation=generation)
+
+        # Only freshly computed results are announced
         await publish_event("analytics_generated", kpis)
         logger.info(f"Computed KPIs: {kpis}")
         return kpis
@@ -75,4 +86,3 @@ async def compute_kpis(db: Session, date: str, range_type: str) -> dict:
     except Exception as e:
         logger.error(f"Compute KPIs failed: {str(e)}, Traceback: {traceback.format_exc()}")
         raise
-import traceback  # Add this at the top
\ No newline at end of file
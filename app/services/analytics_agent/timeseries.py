@@ -0,0 +1,92 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+from app.menu_catalog import menu_catalog
+
+logger = logging.getLogger(__name__)
+
+# Refuse requests that would return more buckets than this
+MAX_BUCKETS = 10000
+
+# One row per order item (or per order without items); covers come from the
+# seated reservation, and walk-in orders count as one cover
+TIMESERIES_QUERY = text("""
+    SELECT o.id, o.created_at, COALESCE(r.party_size, 1), oi.menu_id, oi.quantity
+    FROM orders o
+    LEFT JOIN reservations r ON o.reservation_id = r.id
+    LEFT JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.created_at >= :start AND o.created_at < :end
+""")
+
+def to_datetime64(values) -> np.ndarray:
+    """SQLite hands timestamps back as strings, Postgres as datetimes; both parse via str()."""
+    return np.array([str(value) for value in values], dtype="datetime64[us]")
+
+async def compute_timeseries(db: AsyncSession, start: datetime, end: datetime, bucket_minutes: int, include_items: bool = True) -> Dict:
+    """
+    Orders, covers, revenue and (optionally) per-item quantities per bucket over [start, end).
+
+    The rows are read once and bucketed with np.bincount; the result is
+    column-oriented: one list per metric, aligned with `buckets`.
+    """
+    # created_at is stored as naive UTC
+    start, end = [t.astimezone(timezone.utc).replace(tzinfo=None) if t.tzinfo else t for t in (start, end)]
+    if bucket_minutes <= 0:
+        raise ValueError(f"Invalid bucket size: {bucket_minutes}")
+    if end <= start:
+        raise ValueError("end must be after start")
+    width = timedelta(minutes=bucket_minutes)
+    n_buckets = -(-(end - start) // width)
+    if n_buckets > MAX_BUCKETS:
+        raise ValueError(f"Range spans {n_buckets} buckets; the limit is {MAX_BUCKETS}")
+
+    rows = (await db.execute(TIMESERIES_QUERY, {"start": start, "end": end})).fetchall()
+    catalog = await menu_catalog.get(db)
+    logger.info(f"Bucketing {len(rows)} rows from {start} to {end} into {n_buckets} x {bucket_minutes} min")
+
+    origin = np.datetime64(start, "us")
+    step = np.timedelta64(bucket_minutes, "m").astype("timedelta64[us]")
+    buckets = origin + step * np.arange(n_buckets)
+    result = {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "bucket_minutes": bucket_minutes,
+        "buckets": [str(b) for b in buckets.astype("datetime64[s]")],
+        "orders": [0] * n_buckets,
+        "covers": [0] * n_buckets,
+        "revenue": [0.0] * n_buckets,
+    }
+    if include_items:
+        result["items"] = []
+    if not rows:
+        return result
+
+    order_ids = np.array([row[0] for row in rows], dtype=np.int64)
+    bucket = ((to_datetime64(row[1] for row in rows) - origin) // step).astype(np.int64)
+
+    # Orders and covers: first row of each order only
+    first = np.unique(order_ids, return_index=True)[1]
+    covers = np.array([rows[i][2] for i in first], dtype=np.int64)
+    result["orders"] = np.bincount(bucket[first], minlength=n_buckets).tolist()
+    result["covers"] = np.bincount(bucket[first], weights=covers, minlength=n_buckets).astype(np.int64).tolist()
+
+    # Item rows: quantity, revenue at catalog prices, and an (item x bucket) quantity grid
+    has_item = np.array([row[3] is not None for row in rows], dtype=bool)
+    if has_item.any():
+        menu_ids = np.array([row[3] for row in rows if row[3] is not None], dtype=np.int64)
+        quantities = np.array([row[4] for row in rows if row[3] is not None], dtype=np.float64)
+        item_bucket = bucket[has_item]
+        item_ids, item_pos = np.unique(menu_ids, return_inverse=True)
+        prices = np.array([catalog.prices.get(int(m), 0.0) for m in item_ids])
+        result["revenue"] = np.bincount(item_bucket, weights=quantities * prices[item_pos], minlength=n_buckets).tolist()
+        if include_items:
+            grid = np.bincount(item_pos * n_buckets + item_bucket, weights=quantities, minlength=len(item_ids) * n_buckets)
+            grid = grid.reshape(len(item_ids), n_buckets).astype(np.int64)
+            result["items"] = [
+                {"menu_id": int(menu_id), "name": catalog.names.get(int(menu_id), "Unknown"), "quantity": grid[i].tolist()}
+                for i, menu_id in enumerate(item_ids)
+            ]
+    return result
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+from app.latency import latency_summary
+
+logger = logging.getLogger(__name__)
+
+FAQ_CACHE_SIZE = int(os.getenv("FAQ_CACHE_SIZE", "256"))
+FAQ_CACHE_TTL_SECONDS = float(os.getenv("FAQ_CACHE_TTL_SECONDS", "3600"))
+
+STATS_WINDOW = 1000
+
+
+class FaqCache:
+    """
+    TTL- and size-bounded LRU cache of FAQ answers with single-flight misses.
+
+    Concurrent requests for a key that is not cached share one in-flight
+    computation (one LLM call) instead of each starting their own. The
+    computation runs as its own task, so a caller that is cancelled only
+    stops waiting for it. Failed computations are not cached. clear() drops
+    everything, including in-flight computations, and bumps the generation,
+    so an answer computed against the old menu or policy is neither stored
+    nor handed to callers arriving after the clear.
+    """
+
+    def __init__(self, max_size: int = FAQ_CACHE_SIZE, ttl: float = FAQ_CACHE_TTL_SECONDS):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+        self._in_flight: Dict[Tuple[int, str], asyncio.Task] = {}
+        self._lock = threading.Lock()
+        self._latency = deque(maxlen=STATS_WINDOW)
+        self.generation = 0
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.invalidations = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def put(self, key: str, answer: str, generation: int):
+        with self._lock:
+            if generation != self.generation:
+                return
+            self._entries[key] = (answer, time.monotonic() + self.ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    async def get_or_compute(self, key: str, compute: Callable[[], Awaitable[str]]) -> str:
+        """Cached answer for `key`, else await compute() once for every concurrent caller."""
+        answer = self.get(key)
+        if answer is not None:
+            self.hits += 1
+            return answer
+        generation = self.generation
+        task = self._in_flight.get((generation, key))
+        if task is not None:
+            self.coalesced += 1
+        else:
+            self.misses += 1
+            task = asyncio.create_task(self._compute(key, compute, generation))
+            self._in_flight[(generation, key)] = task
+        return await asyncio.shield(task)
+
+    async def _compute(self, key: str, compute: Callable[[], Awaitable[str]], generation: int) -> str:
+        started = time.monotonic()
+        try:
+            answer = await compute()
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            if self._in_flight.get((generation, key)) is asyncio.current_task():
+                del self._in_flight[(generation, key)]
+        self._latency.append(time.monotonic() - started)
+        self.put(key, answer, generation)
+        return answer
+
+    def clear(self, reason: str = "manual"):
+        with self._lock:
+            self.generation += 1
+            dropped = len(self._entries)
+            self._entries.clear()
+            # Callers already waiting still get their answer; new callers start over
+            self._in_flight.clear()
+            self.invalidations += 1
+        logger.info(f"FAQ cache cleared ({reason}), {dropped} entries dropped")
+
+    def stats(self) -> Dict:
+        lookups = self.hits + self.misses + self.coalesced
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl_seconds": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            # Coalesced requests were served without an LLM call of their own
+            "hit_rate": round((self.hits + self.coalesced) / lookups, 4) if lookups else None,
+            "in_flight": len(self._in_flight),
+            "invalidations": self.invalidations,
+            "errors": self.errors,
+            "llm_latency": latency_summary(self._latency, scale=1000),
+        }
+
+
+faq_cache = FaqCache()
@@ -0,0 +1,117 @@
+import abc
+import asyncio
+import logging
+import os
+import threading
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FAQ_LLM_PROVIDER = os.getenv("FAQ_LLM_PROVIDER", "mistral")  # mistral | stub
+FAQ_LLM_MODEL = os.getenv("FAQ_LLM_MODEL", "mistral-small")
+# Simulated round-trip of the stub backend
+FAQ_STUB_LATENCY_MS = float(os.getenv("FAQ_STUB_LATENCY_MS", "200"))
+
+SYSTEM_PROMPT = "You are a restaurant assistant. Use tools to fetch data. Always call 'search_menu' for menu-related queries and 'check_reservations' for reservation queries. Policy: {policy}"
+
+
+class FaqReply:
+    """What a provider returns: the answer text and any tool calls ({"name", "args"}) it requested."""
+
+    def __init__(self, content: str, tool_calls: Optional[List[Dict]] = None):
+        self.content = content
+        self.tool_calls = tool_calls or []
+
+
+class FaqLLM(abc.ABC):
+    """Interface for FAQ LLM backends."""
+
+    name = "base"
+
+    @abc.abstractmethod
+    async def ask(self, query: str, policy: str) -> FaqReply:
+        """Answer `query` with `policy` in the system prompt."""
+
+
+class MistralLLM(FaqLLM):
+    """
+    ChatMistralAI with the FAQ tools bound; langchain is imported here, not at app import.
+
+    The prompt and tool-bound model are built once; the chain with the policy
+    filled in is rebuilt only when a different policy text is passed in.
+    """
+
+    name = "mistral"
+
+    def __init__(self, tools: List[Callable], model: str = FAQ_LLM_MODEL):
+        api_key = os.getenv("MISTRAL_API_KEY")
+        if not api_key:
+            raise ValueError("MISTRAL_API_KEY is not set in .env")
+        from langchain_core.prompts import ChatPromptTemplate
+        from langchain_core.tools import tool
+        from langchain_mistralai import ChatMistralAI
+
+        llm = ChatMistralAI(api_key=api_key, model=model)
+        self.prompt = ChatPromptTemplate.from_messages([("system", SYSTEM_PROMPT), ("user", "{query}")])
+        self.bound = llm.bind_tools([tool(fn) for fn in tools])
+        self.chain = None
+        self._policy: Optional[str] = None
+        logger.info(f"Mistral LLM initialized successfully ({model})")
+
+    def _chain_for(self, policy: str):
+        # The policy string is resident, so an identity check is enough
+        if self.chain is None or policy is not self._policy:
+            self.chain = self.prompt.partial(policy=policy) | self.bound
+            self._policy = policy
+            logger.info("FAQ chain rebuilt for a new policy")
+        return self.chain
+
+    async def ask(self, query: str, policy: str) -> FaqReply:
+        response = await self._chain_for(policy).ainvoke({"query": query})
+        return FaqReply(response.content, [{"name": c["name"], "args": c["args"]} for c in response.tool_calls])
+
+
+class StubLLM(FaqLLM):
+    """
+    Offline backend for load tests: waits `latency_ms`, then returns a
+    deterministic answer and no tool calls (so vegan queries still exercise
+    the menu-search fallback against the DB).
+    """
+
+    name = "stub"
+
+    def __init__(self, latency_ms: float = FAQ_STUB_LATENCY_MS):
+        self.latency = latency_ms / 1000
+        self.calls = 0
+
+    async def ask(self, query: str, policy: str) -> FaqReply:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return FaqReply(f"[stub] Answer to: {query.strip()}")
+
+
+LLM_PROVIDERS = ("mistral", "stub")
+
+_llm: Optional[FaqLLM] = None
+_lock = threading.Lock()
+
+
+def get_llm(tools: List[Callable], provider: Optional[str] = None) -> FaqLLM:
+    """The configured provider (FAQ_LLM_PROVIDER), created on first use; a failed creation is retried on the next call."""
+    global _llm
+    if _llm is None:
+        with _lock:
+            if _llm is None:
+                provider = provider or FAQ_LLM_PROVIDER
+                if provider not in LLM_PROVIDERS:
+                    raise ValueError(f"Invalid FAQ LLM provider: {provider}. Use {list(LLM_PROVIDERS)}")
+                _llm = MistralLLM(tools, FAQ_LLM_MODEL) if provider == "mistral" else StubLLM(FAQ_STUB_LATENCY_MS)
+                logger.info(f"FAQ LLM provider ready: {provider}")
+    return _llm
+
+
+def reset_llm():
+    """Drop the provider so the next FAQ query creates it again (e.g. after changing credentials)."""
+    global _llm
+    with _lock:
+        _llm = None
@@ -0,0 +1,83 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+from app.services.faq_agent.cache import faq_cache
+from app.services.faq_agent.similarity import faq_index
+
+logger = logging.getLogger(__name__)
+
+POLICY_PATH = os.getenv("FAQ_POLICY_PATH", "data/policy.txt")
+# stat() the policy file at most this often to notice an edit
+FAQ_POLICY_CHECK_SECONDS = float(os.getenv("FAQ_POLICY_CHECK_SECONDS", "5"))
+
+
+class PolicyStore:
+    """
+    The restaurant policy text, read once and kept resident for the FAQ prompt.
+
+    The file is identified by its (mtime, size) and re-checked at most every
+    `check_seconds`; when it changes, or on reload(), the text is re-read,
+    `version` is bumped and every cached FAQ answer is dropped, since all of
+    them were generated with the old policy in the prompt. A missing file
+    gives an empty policy.
+    """
+
+    def __init__(self, path: str = POLICY_PATH, check_seconds: float = FAQ_POLICY_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._current: Optional[Tuple[Optional[Tuple[int, int]], str]] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def _stamp(self) -> Optional[Tuple[int, int]]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self) -> str:
+        current = self._current
+        now = time.monotonic()
+        if current is not None and self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return current[1]
+        stamp = self._stamp()
+        self._checked_at = now
+        if current is not None and current[0] == stamp:
+            return current[1]
+        return self._load(stamp, "policy file changed")
+
+    def reload(self) -> int:
+        """Re-read the policy file now, whether or not it looks modified; returns the new version."""
+        self._checked_at = time.monotonic()
+        self._load(self._stamp(), "admin reload")
+        return self.version
+
+    def _load(self, stamp: Optional[Tuple[int, int]], reason: str) -> str:
+        with self._lock:
+            policy = ""
+            if stamp is not None:
+                with open(self.path, "r") as f:
+                    policy = f.read()
+            first = self._current is None
+            self._current = (stamp, policy)
+            self.version += 1
+        logger.info(f"FAQ policy v{self.version} loaded from {self.path} ({len(policy)} chars)")
+        if not first:
+            faq_cache.clear(reason)
+            faq_index.clear()
+        return policy
+
+    def status(self) -> Dict:
+        return {
+            "path": self.path,
+            "version": self.version,
+            "loaded": self._current is not None,
+            "mtime_ns": self._current[0][0] if self._current and self._current[0] else None,
+        }
+
+
+faq_policy = PolicyStore()
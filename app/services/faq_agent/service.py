@@ -1,11 +1,12 @@
+import asyncio
 import logging
-from langchain_mistralai import ChatMistralAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.tools import tool
 from sqlalchemy.sql import text
 from db.connection import get_db
-from functools import lru_cache
-import os
+from app.menu_catalog import menu_catalog
+from app.services.faq_agent.cache import faq_cache
+from app.services.faq_agent.similarity import faq_index, normalize
+from app.services.faq_agent.llm import get_llm
+from app.services.faq_agent.policy import faq_policy
 from dotenv import load_dotenv
 
 # Load environment variables
@@ -15,37 +16,18 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize Mistral LLM
-try:
-    api_key = os.getenv("MISTRAL_API_KEY")
-    if not api_key:
-        raise ValueError("MISTRAL_API_KEY is not set in .env")
-    llm = ChatMistralAI(api_key=api_key, model="mistral-small")
-    logger.info("Mistral LLM initialized successfully")
-except Exception as e:
-    logger.error(f"Failed to initialize Mistral LLM: {str(e)}")
-    raise
-
-# Tools for LLM
-@tool
+# Tools for LLM (wrapped as langchain tools by the provider, when it is created)
 def search_menu(query: str) -> list:
     """Search menu for items matching query (e.g., vegan, category)."""
     try:
         with next(get_db()) as db:
-            if "vegan" in query.lower():
-                result = db.execute(text("SELECT name, description, price FROM menu WHERE is_vegan = 1")).fetchall()
-            else:
-                result = db.execute(
-                    text("SELECT name, description, price FROM menu WHERE name LIKE :q OR category LIKE :q"),
-                    {"q": f"%{query}%"}
-                ).fetchall()
-            logger.info(f"Menu search query: {query}, results: {len(result)}")
-            return [{"name": row[0], "description": row[1], "price": row[2]} for row in result]
+            result = menu_catalog.get_sync(db).search(query)
+        logger.info(f"Menu search query: {query}, results: {len(result)}")
+        return result
     except Exception as e:
         logger.error(f"Menu search error: {str(e)}")
         return []
 
-@tool
 def check_reservations(customer_name: str) -> list:
     """Check reservations by customer name."""
     try:
@@ -60,55 +42,75 @@ def check_reservations(customer_name: str) -> list:
         logger.error(f"Reservation check error: {str(e)}")
         return []
 
-# Cache responses for repeated queries
-@lru_cache(maxsize=100)
-def cached_query(query: str) -> str:
-    """Cached FAQ query processing."""
+TOOLS = {"search_menu": search_menu, "check_reservations": check_reservations}
+
+FALLBACK_RESPONSE = "Sorry, I couldn't process your request. Please try again."
+
+async def run_chain(query: str, policy: str) -> str:
+    """One LLM round-trip (plus tool fallback) for a query; raises on failure so errors are never cached."""
+    # Created on first use (FAQ_LLM_PROVIDER), so the API starts without LLM credentials
+    llm = get_llm(list(TOOLS.values()))
+
+    # Invoke LLM without blocking the event loop
+    logger.info(f"Invoking {llm.name} LLM with query: {query}")
+    response = await llm.ask(query, policy)
+
+    # Parse response
+    content = response.content
+    logger.info(f"LLM response content: {content}")
+    if response.tool_calls:
+        logger.info(f"Tool calls: {response.tool_calls}")
+        for call in response.tool_calls:
+            output = await asyncio.to_thread(TOOLS[call["name"]], **call["args"])
+            content += f"\nTool result: {call['name']} returned {output}"
+    else:
+        # Fallback for vegan queries if tool-calling fails
+        if "vegan" in query.lower():
+            logger.info("Tool-calling failed; using direct search_menu call")
+            results = await asyncio.to_thread(search_menu, query)
+            content = "Vegan dishes: " + "; ".join([f"{r['name']}: {r['description']}, ${r['price']}" for r in results])
+    logger.info(f"Processed FAQ query: {query}")
+    return content
+
+async def cached_query(query: str) -> str:
+    """
+    Cached FAQ query processing.
+
+    Answers live in faq_cache (TTL + LRU bound) under the normalized query,
+    so "What vegan dishes do you have?" and "do you have vegan food" share
+    one entry ("vegan dish"), while "how ..." and "why ..." questions keep
+    their own; a query with no entry of its own is answered from the most
+    similar cached question when the TF-IDF cosine reaches
+    FAQ_SIMILARITY_THRESHOLD. Identical concurrent queries share one LLM
+    call. The cache is cleared when the menu changes (menu_updated event) or
+    the resident policy text is reloaded.
+    """
+    # Resident text; a modified policy file is picked up (and the cache cleared) here
+    policy = faq_policy.get()
+    key = normalize(query) or query.strip().casefold()
+    if faq_cache.get(key) is None:
+        similar = faq_index.match(key)
+        if similar is not None:
+            answer = faq_cache.get(similar)
+            if answer is not None:
+                return answer
+            faq_index.discard(similar)  # expired or evicted from the cache
+
+    async def compute() -> str:
+        answer = await run_chain(query, policy)
+        faq_index.add(key)
+        return answer
+
     try:
-        # Load static policy
-        logger.info("Attempting to load policy file")
-        with open("data/policy.txt", "r") as f:
-            policy = f.read()
-        logger.info("Policy file loaded successfully")
-        
-        # Prompt template
-        logger.info("Creating prompt template")
-        prompt = ChatPromptTemplate.from_messages([
-            ("system", "You are a restaurant assistant. Use tools to fetch data. Always call 'search_menu' for menu-related queries and 'check_reservations' for reservation queries. Policy: {policy}"),
-            ("user", "{query}")
-        ])
-        
-        # Chain with tools
-        logger.info("Binding tools to LLM")
-        chain = prompt | llm.bind_tools([search_menu, check_reservations])
-        
-        # Invoke LLM
-        logger.info(f"Invoking LLM with query: {query}")
-        response = chain.invoke({"query": query, "policy": policy})
-        
-        # Parse response
-        content = response.content
-        logger.info(f"LLM response content: {content}")
-        if response.tool_calls:
-            logger.info(f"Tool calls: {response.tool_calls}")
-            for call in response.tool_calls:
-                content += f"\nTool result: {call['name']} returned {call['output']}"
-        else:
-            # Fallback for vegan queries if tool-calling fails
-            if "vegan" in query.lower():
-                logger.info("Tool-calling failed; using direct search_menu call")
-                results = search_menu(query)
-                content = "Vegan dishes: " + "; ".join([f"{r['name']}: {r['description']}, ${r['price']}" for r in results])
-        logger.info(f"Processed FAQ query: {query}")
-        return content
+        return await faq_cache.get_or_compute(key, compute)
     except Exception as e:
         logger.error(f"FAQ query error: {str(e)}")
-        return "Sorry, I couldn't process your request. Please try again."
+        return FALLBACK_RESPONSE
 
 # Main query function (publishes event to orchestrator)
 async def answer_query(query: str) -> str:
     """Answer a customer query and publish event to orchestrator."""
     from app.orchestrator import publish_event
-    response = cached_query(query)
+    response = await cached_query(query)
     await publish_event("faq_query_processed", {"query": query, "response": response})
-    return response
\ No newline at end of file
+    return response
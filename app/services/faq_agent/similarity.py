@@ -0,0 +1,155 @@
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+import numpy as np
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize as l2_normalize
+from app.latency import latency_summary
+
+logger = logging.getLogger(__name__)
+
+# Minimum cosine similarity for a previously answered question to count as the same one
+FAQ_SIMILARITY_THRESHOLD = float(os.getenv("FAQ_SIMILARITY_THRESHOLD", "0.9"))
+FAQ_SIMILARITY_SIZE = int(os.getenv("FAQ_SIMILARITY_SIZE", os.getenv("FAQ_CACHE_SIZE", "256")))
+
+# Function words only; sklearn's English list also drops words like "bill", "no" and "not".
+# Question words and modals stay: "how do I cancel" and "why did you cancel" ask different things.
+STOPWORDS = frozenset("""
+    a an the and or but if so to of in on at by for from with about into as is are was were be been am
+    do does did doing have has had having
+    i me my we our us you your he she it its they them their this that these those there here
+    any some please tell know like want get got just also
+    hi hello hey thanks thank
+""".split())
+
+# A leading "what"/"which" only introduces a list question ("what vegan dishes ..." asks
+# the same as "vegan dishes ..."); other question words change the intent and are kept
+LEADING_DETERMINERS = frozenset({"what", "which"})
+
+# Canonical forms for words customers use interchangeably
+SYNONYMS = {"food": "dish", "meal": "dish", "option": "dish", "item": "dish", "plate": "dish", "booking": "reservation", "book": "reservation"}
+
+PUNCTUATION = re.compile(r"[^\w\s]+")
+
+
+def stem(word: str) -> str:
+    """Strip common plural endings (dishes -> dish, allergies -> allergy, options -> option)."""
+    if len(word) > 4 and word.endswith("ies"):
+        return word[:-3] + "y"
+    if len(word) > 4 and word.endswith("es") and word[-3] in "sxh":
+        return word[:-2]
+    if len(word) > 3 and word.endswith("s") and not word.endswith("ss"):
+        return word[:-1]
+    return word
+
+
+def normalize(query: str) -> str:
+    """Casefold, drop punctuation, stopwords and a leading what/which, and canonicalize plurals and synonyms."""
+    words = [w for w in PUNCTUATION.sub(" ", query.casefold()).split() if w not in STOPWORDS]
+    if len(words) > 1 and words[0] in LEADING_DETERMINERS:
+        words = words[1:]
+    return " ".join(SYNONYMS.get(stem(w), stem(w)) for w in words)
+
+
+class SimilarityIndex:
+    """
+    TF-IDF index of previously answered (normalized) questions.
+
+    Questions are hashed into sublinear term frequencies (HashingVectorizer,
+    so there is no vocabulary to refit) and document frequencies are kept
+    up to date on add/discard; IDF weights are applied to the non-zero
+    entries at lookup, which keeps a lookup well under a millisecond for a
+    full index. A word the index has never seen gets the highest IDF
+    instead of being ignored, so "reservation bob" does not match
+    "reservation alice". Holds at most `max_size` questions, oldest dropped
+    first.
+    """
+
+    N_FEATURES = 2 ** 18
+
+    def __init__(self, threshold: float = FAQ_SIMILARITY_THRESHOLD, max_size: int = FAQ_SIMILARITY_SIZE):
+        self.threshold = threshold
+        self.max_size = max_size
+        # Single-character tokens count too: "table 2" is not "table 4"
+        self._hasher = HashingVectorizer(n_features=self.N_FEATURES, alternate_sign=False, norm=None, token_pattern=r"(?u)\b\w+\b")
+        self._keys: List[str] = []
+        self._rows: List[sp.csr_matrix] = []
+        self._df = np.zeros(self.N_FEATURES)
+        self._matrix: Optional[sp.csr_matrix] = None
+        self._lock = threading.Lock()
+        self._latency = deque(maxlen=1000)
+        self.lookups = 0
+        self.matches = 0
+
+    def _tf(self, key: str) -> sp.csr_matrix:
+        row = self._hasher.transform([key])
+        row.data = 1 + np.log(row.data)
+        return row
+
+    def _tfidf(self, tf: sp.csr_matrix) -> sp.csr_matrix:
+        """Smoothed IDF (as in sklearn's TfidfTransformer) applied to the non-zero entries, rows L2-normalized."""
+        weighted = tf.copy()
+        weighted.data *= np.log((1 + len(self._keys)) / (1 + self._df[weighted.indices])) + 1
+        return l2_normalize(weighted)
+
+    def _remove(self, i: int):
+        self._df[self._rows[i].indices] -= 1
+        del self._keys[i], self._rows[i]
+        self._matrix = None
+
+    def add(self, key: str):
+        with self._lock:
+            if key in self._keys:
+                return
+            row = self._tf(key)
+            self._keys.append(key)
+            self._rows.append(row)
+            self._df[row.indices] += 1
+            self._matrix = None if self._matrix is None else sp.vstack([self._matrix, row], format="csr")
+            if len(self._keys) > self.max_size:
+                self._remove(0)
+
+    def discard(self, key: str):
+        with self._lock:
+            if key in self._keys:
+                self._remove(self._keys.index(key))
+
+    def clear(self):
+        with self._lock:
+            self._keys, self._rows, self._matrix = [], [], None
+            self._df[:] = 0
+
+    def match(self, key: str) -> Optional[str]:
+        """The stored question most similar to `key`, if its cosine similarity reaches the threshold."""
+        started = time.perf_counter()
+        self.lookups += 1
+        with self._lock:
+            if not self._keys:
+                return None
+            if self._matrix is None:
+                self._matrix = sp.vstack(self._rows, format="csr")
+            scores = (self._tfidf(self._matrix) @ self._tfidf(self._tf(key)).T).toarray().ravel()
+            best = int(np.argmax(scores))
+            found = self._keys[best] if scores[best] >= self.threshold else None
+        self._latency.append(time.perf_counter() - started)
+        if found is not None:
+            self.matches += 1
+            logger.info(f"FAQ query '{key}' matched '{found}' (cosine {scores[best]:.3f})")
+        return found
+
+    def stats(self) -> Dict:
+        return {
+            "size": len(self._keys),
+            "threshold": self.threshold,
+            "lookups": self.lookups,
+            "matches": self.matches,
+            "match_latency": latency_summary(self._latency, scale=1000),
+        }
+
+
+faq_index = SimilarityIndex()
@@ -1,68 +1,98 @@
-from sqlalchemy.orm import Session
-from sqlalchemy.sql import text
-from datetime import datetime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text, bindparam
+from datetime import datetime, timezone
+from typing import Optional
 import logging
 from app.orchestrator import publish_event
+from app.table_index import table_index, claim_table, release_table
+from app.menu_catalog import menu_catalog
+from app.schemas.orders import VALID_STATUSES
 
 logger = logging.getLogger(__name__)
 
-async def create_order(db: Session, table_id: int, items: list[dict]) -> dict:
-    try:
-        logger.info(f"Checking table with id {table_id}")
-        table = db.execute(
-            text("SELECT status FROM tables WHERE id = :table_id"),  # Changed to id
-            {"table_id": table_id}
-        ).fetchone()
-        logger.info(f"Table query result: {table}")
-        if not table:
-            logger.error(f"Table with id {table_id} not found")
-            raise ValueError(f"Table with id {table_id} not found")
-        if table[0] != "available":
-            logger.error(f"Table with id {table_id} status is {table[0]}, not available")
-            raise ValueError(f"Table with id {table_id} is not available (status: {table[0]})")
+INSERT_ORDER_ITEMS = text("""
+    INSERT INTO order_items (order_id, menu_id, quantity)
+    VALUES (:order_id, :menu_id, :quantity)
+""")
+
+def validate_item_format(items: list[dict]):
+    """Shape and quantity checks that need no DB access."""
+    for item in items:
+        if not all(k in item for k in ["menu_id", "quantity"]):
+            logger.error(f"Invalid item format: {item}")
+            raise ValueError(f"Invalid item format: {item}")
+        if not isinstance(item["quantity"], int) or item["quantity"] <= 0:
+            logger.error(f"Invalid quantity for item {item['menu_id']}: {item['quantity']}")
+            raise ValueError(f"Invalid quantity for item {item['menu_id']}: {item['quantity']}")
+
+def to_naive_utc(value: Optional[datetime]) -> Optional[datetime]:
+    """orders.created_at holds naive UTC; convert timezone-aware timestamps before storing them."""
+    if value is not None and value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
 
+async def find_missing_menu_ids(db: AsyncSession, menu_ids: set) -> set:
+    """Menu ids that don't exist; checked against the catalog, with the DB as fallback for items newer than it."""
+    catalog = await menu_catalog.get(db)
+    unknown = {menu_id for menu_id in menu_ids if menu_id not in catalog.prices}
+    return await find_missing_ids(db, "menu", unknown)
+
+async def find_missing_ids(db: AsyncSession, table: str, ids: set) -> set:
+    """Ids from `ids` that have no row in `table`, in one set-based lookup."""
+    if not ids:
+        return set()
+    found = (await db.execute(
+        text(f"SELECT id FROM {table} WHERE id IN :ids").bindparams(bindparam("ids", expanding=True)),
+        {"ids": list(ids)}
+    )).fetchall()
+    return ids - {row[0] for row in found}
+
+async def create_order(db: AsyncSession, table_id: int, items: list[dict]) -> dict:
+    claimed = False
+    try:
         logger.info(f"Validating items: {items}")
-        for item in items:
-            if not all(k in item for k in ["menu_id", "quantity"]):
-                logger.error(f"Invalid item format: {item}")
-                raise ValueError(f"Invalid item format: {item}")
-            menu_item = db.execute(
-                text("SELECT id FROM menu WHERE id = :menu_id"),
-                {"menu_id": item["menu_id"]}
-            ).fetchone()
-            if not menu_item:
-                logger.error(f"Menu item {item['menu_id']} not found")
-                raise ValueError(f"Menu item {item['menu_id']} not found")
-            if not isinstance(item["quantity"], int) or item["quantity"] <= 0:
-                logger.error(f"Invalid quantity for item {item['menu_id']}: {item['quantity']}")
-                raise ValueError(f"Invalid quantity for item {item['menu_id']}: {item['quantity']}")
-
-        order_result = db.execute(
+        validate_item_format(items)
+        missing = await find_missing_menu_ids(db, {item["menu_id"] for item in items})
+        if missing:
+            logger.error(f"Menu items {sorted(missing)} not found")
+            raise ValueError(f"Menu item {min(missing)} not found")
+
+        logger.info(f"Claiming table with id {table_id}")
+        if not await claim_table(db, table_id):
+            table = table_index.get(table_id)
+            if not table:
+                logger.error(f"Table with id {table_id} not found")
+                raise ValueError(f"Table with id {table_id} not found")
+            logger.error(f"Table with id {table_id} status is {table['status']}, not available")
+            raise ValueError(f"Table with id {table_id} is not available (status: {table['status']})")
+        claimed = True
+
+        now = datetime.utcnow()
+        order_result = await db.execute(
             text("""
                 INSERT INTO orders (table_id, status, created_at)
                 VALUES (:table_id, 'pending', :now)
                 RETURNING id
             """),
-            {"table_id": table_id, "now": datetime.utcnow()}
+            {"table_id": table_id, "now": now}
         )
         order_id = order_result.fetchone()[0]
 
-        for item in items:
-            db.execute(
-                text("""
-                    INSERT INTO order_items (order_id, menu_id, quantity)
-                    VALUES (:order_id, :menu_id, :quantity)
-                """),
-                {"order_id": order_id, "menu_id": item["menu_id"], "quantity": item["quantity"]}
+        if items:
+            # One executemany for all lines
+            await db.execute(
+                INSERT_ORDER_ITEMS,
+                [{"order_id": order_id, "menu_id": item["menu_id"], "quantity": item["quantity"]} for item in items]
             )
+        await db.commit()
 
-        db.execute(
-            text("UPDATE tables SET status = 'occupied' WHERE id = :table_id"),  # Changed to id
-            {"table_id": table_id}
-        )
-        db.commit()
-
-        await publish_event("order_created", {"order_id": order_id, "table_id": table_id})
+        await publish_event("order_created", {
+            "order_id": order_id,
+            "table_id": table_id,
+            "status": "pending",
+            "created_at": now.isoformat(),
+            "items": [{"menu_id": item["menu_id"], "quantity": item["quantity"]} for item in items]
+        })
 
         logger.info(f"Created order {order_id} for table with id {table_id}")
         return {
@@ -72,33 +102,119 @@ async def create_order(db: Session, table_id: int, items: list[dict]) -> dict:
             "items": [{"menu_id": item["menu_id"], "quantity": item["quantity"]} for item in items]
         }
     except Exception as e:
-        db.rollback()
+        await db.rollback()
+        if claimed:
+            release_table(table_id)
         logger.error(f"Order creation failed: {str(e)}", exc_info=True)
         raise
 
-async def update_order_status(db: Session, order_id: int, status: str) -> dict:
+async def create_orders_bulk(db: AsyncSession, orders: list[dict], batch_size: int = 100) -> list[dict]:
+    """
+    Record many already-placed orders (POS sync, back-filling) in batched transactions.
+
+    Menu and table ids for the whole request are validated with one lookup each.
+    Tables are not claimed, since these orders were seated elsewhere; `status`
+    and `created_at` (converted to naive UTC) are taken from each order when
+    given. Each batch commits
+    on its own, so a failing batch does not undo earlier ones. Returns one
+    result per input order, in input order.
+    """
+    if batch_size <= 0:
+        raise ValueError(f"Invalid batch size: {batch_size}")
+    results = [{"index": i, "order_id": None, "status": "failed", "error": None} for i in range(len(orders))]
+
+    valid = []
+    for i, order in enumerate(orders):
+        try:
+            validate_item_format(order["items"])
+            if order.get("status", "pending") not in VALID_STATUSES:
+                raise ValueError(f"Invalid status: {order['status']}. Use {VALID_STATUSES}")
+            valid.append(i)
+        except ValueError as ve:
+            results[i]["error"] = str(ve)
+
+    missing_menu = await find_missing_menu_ids(db, {item["menu_id"] for i in valid for item in orders[i]["items"]})
+    missing_tables = await find_missing_ids(db, "tables", {orders[i]["table_id"] for i in valid})
+    ready = []
+    for i in valid:
+        bad_items = sorted({item["menu_id"] for item in orders[i]["items"]} & missing_menu)
+        if bad_items:
+            results[i]["error"] = f"Menu items {bad_items} not found"
+        elif orders[i]["table_id"] in missing_tables:
+            results[i]["error"] = f"Table with id {orders[i]['table_id']} not found"
+        else:
+            ready.append(i)
+
+    now = datetime.utcnow()
+    placed_at = {i: to_naive_utc(orders[i].get("created_at")) or now for i in ready}
+    for start in range(0, len(ready), batch_size):
+        batch = ready[start:start + batch_size]
+        created = []
+        try:
+            item_rows = []
+            for i in batch:
+                order = orders[i]
+                order_id = (await db.execute(
+                    text("""
+                        INSERT INTO orders (table_id, status, created_at)
+                        VALUES (:table_id, :status, :created_at)
+                        RETURNING id
+                    """),
+                    {"table_id": order["table_id"], "status": order.get("status", "pending"), "created_at": placed_at[i]}
+                )).fetchone()[0]
+                created.append((i, order_id))
+                item_rows.extend({"order_id": order_id, "menu_id": item["menu_id"], "quantity": item["quantity"]} for item in order["items"])
+            if item_rows:
+                await db.execute(INSERT_ORDER_ITEMS, item_rows)
+            await db.commit()
+        except Exception as e:
+            await db.rollback()
+            logger.error(f"Bulk order batch starting at {start} failed: {str(e)}", exc_info=True)
+            for i in batch:
+                results[i]["error"] = f"Batch failed: {str(e)}"
+            continue
+        for i, order_id in created:
+            results[i].update(order_id=order_id, status="created")
+            await publish_event("order_created", {
+                "order_id": order_id,
+                "table_id": orders[i]["table_id"],
+                "status": orders[i].get("status", "pending"),
+                # Back-filled orders land in the analytics rollup for the day they were placed
+                "created_at": placed_at[i].isoformat(),
+                "items": [{"menu_id": item["menu_id"], "quantity": item["quantity"]} for item in orders[i]["items"]]
+            })
+
+    logger.info(f"Bulk created {sum(r['status'] == 'created' for r in results)} of {len(orders)} orders")
+    return results
+
+async def update_order_status(db: AsyncSession, order_id: int, status: str) -> dict:
     try:
-        valid_statuses = ["pending", "preparing", "served", "paid"]
-        if status not in valid_statuses:
-            raise ValueError(f"Invalid status: {status}. Use {valid_statuses}")
+        if status not in VALID_STATUSES:
+            raise ValueError(f"Invalid status: {status}. Use {VALID_STATUSES}")
 
-        order = db.execute(
-            text("SELECT id, table_id, status FROM orders WHERE id = :order_id"),
+        order = (await db.execute(
+            text("SELECT id, table_id, status, created_at FROM orders WHERE id = :order_id"),
             {"order_id": order_id}
-        ).fetchone()
+        )).fetchone()
         if not order:
             raise ValueError(f"Order {order_id} not found")
 
-        db.execute(
+        await db.execute(
             text("UPDATE orders SET status = :status WHERE id = :order_id"),
             {"status": status, "order_id": order_id}
         )
-        db.commit()
+        await db.commit()
 
-        await publish_event("order_updated", {"order_id": order_id, "status": status})
+        await publish_event("order_updated", {
+            "order_id": order_id,
+            "table_id": order[1],
+            "status": status,
+            "previous_status": order[2],
+            "created_at": str(order[3]) if order[3] is not None else None
+        })
         logger.info(f"Updated order {order_id} to status {status} (previous: {order[2]})")
         return {"order_id": order_id, "table_id": order[1], "status": status}
     except Exception as e:
-        db.rollback()
+        await db.rollback()
         logger.error(f"Order update failed: {str(e)}", exc_info=True)
         raise
\ No newline at end of file
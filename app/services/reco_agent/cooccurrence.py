@@ -0,0 +1,201 @@
+import asyncio
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Optional, Set, Tuple
+import numpy as np
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+logger = logging.getLogger(__name__)
+
+COOCCURRENCE_PATH = os.getenv("COOCCURRENCE_PATH", "data/models/cooccurrence.npz")
+# Write a snapshot after this many incremental updates
+COOCCURRENCE_SNAPSHOT_EVERY = int(os.getenv("COOCCURRENCE_SNAPSHOT_EVERY", "100"))
+BUILD_CHUNK_ROWS = 50000
+
+
+class CooccurrenceStore:
+    """
+    Item co-occurrence counts over menu ids, as a dense NumPy matrix.
+
+    matrix[i, j] is the number of orders containing both item i and item j (the
+    diagonal is how many orders contain item i). The menu is small enough that
+    a dense n x n matrix beats a sparse one. It is built once from order
+    history, then updated per order_created event and snapshotted to disk so
+    a restart only has to replay orders newer than the snapshot.
+
+    `last_order_id` is a low-water mark: every order up to it is counted.
+    Events arrive out of order across shards, so orders counted above it are
+    kept in `applied_ids` (and in the snapshot) until the gap below them
+    fills; an order is never counted twice and a lower-id order still queued
+    elsewhere is not skipped.
+    """
+
+    def __init__(self, path: str = COOCCURRENCE_PATH, snapshot_every: int = COOCCURRENCE_SNAPSHOT_EVERY):
+        self.path = path
+        self.snapshot_every = snapshot_every
+        self.menu_ids = np.zeros(0, dtype=np.int64)
+        self.matrix = np.zeros((0, 0), dtype=np.int64)
+        self.last_order_id = 0
+        self.applied_ids: Set[int] = set()
+        self._index: Dict[int, int] = {}
+        self._dirty = 0
+        self._ready = False
+        self._lock = threading.Lock()
+        self._build_lock: Optional[asyncio.Lock] = None
+
+    @property
+    def ready(self) -> bool:
+        return self._ready
+
+    def _reset(self, menu_ids: np.ndarray, matrix: np.ndarray, last_order_id: int, applied_ids: Iterable[int] = ()):
+        self.menu_ids = menu_ids.astype(np.int64)
+        self.matrix = matrix.astype(np.int64)
+        self.last_order_id = int(last_order_id)
+        self.applied_ids = {int(order_id) for order_id in applied_ids}
+        self._index = {int(menu_id): i for i, menu_id in enumerate(self.menu_ids)}
+
+    def _indices(self, menu_ids: Iterable[int]) -> np.ndarray:
+        """Matrix indices for menu ids, growing the matrix for ids not seen before."""
+        menu_ids = list(menu_ids)
+        new = sorted({m for m in menu_ids if m not in self._index})
+        if new:
+            n = len(self.menu_ids)
+            grown = np.zeros((n + len(new), n + len(new)), dtype=np.int64)
+            grown[:n, :n] = self.matrix
+            self.matrix = grown
+            self.menu_ids = np.concatenate([self.menu_ids, np.array(new, dtype=np.int64)])
+            for offset, menu_id in enumerate(new):
+                self._index[menu_id] = n + offset
+        return np.array([self._index[m] for m in menu_ids], dtype=np.int64)
+
+    def _add_incidence(self, order_idx: np.ndarray, item_idx: np.ndarray):
+        """Accumulate X.T @ X for an orders x items incidence chunk."""
+        orders, order_rows = np.unique(order_idx, return_inverse=True)
+        incidence = np.zeros((len(orders), len(self.menu_ids)), dtype=np.int64)
+        incidence[order_rows, item_idx] = 1
+        self.matrix += incidence.T @ incidence
+
+    async def build(self, db: AsyncSession):
+        """Rebuild from the full order history, streaming order_items in chunks."""
+        self._reset(np.zeros(0), np.zeros((0, 0)), 0)
+        menu_ids = (await db.execute(text("SELECT DISTINCT menu_id FROM order_items"))).fetchall()
+        with self._lock:
+            self._indices(sorted(row[0] for row in menu_ids))
+        last_order_id = 0
+        pending = np.zeros((0, 2), dtype=np.int64)
+        result = await db.stream(text("SELECT order_id, menu_id FROM order_items ORDER BY order_id"))
+        async for rows in result.partitions(BUILD_CHUNK_ROWS):
+            chunk = np.concatenate([pending, np.array([tuple(row) for row in rows], dtype=np.int64).reshape(-1, 2)])
+            # Hold back the last (possibly incomplete) order for the next chunk
+            cut = np.searchsorted(chunk[:, 0], chunk[-1, 0])
+            pending, chunk = chunk[cut:], chunk[:cut]
+            if len(chunk):
+                with self._lock:
+                    self._add_incidence(chunk[:, 0], self._indices(chunk[:, 1].tolist()))
+                last_order_id = int(chunk[-1, 0])
+        if len(pending):
+            with self._lock:
+                self._add_incidence(pending[:, 0], self._indices(pending[:, 1].tolist()))
+            last_order_id = int(pending[-1, 0])
+        self.last_order_id = max(last_order_id, (await db.execute(text("SELECT COALESCE(MAX(id), 0) FROM orders"))).scalar())
+        self._ready = True
+        logger.info(f"Co-occurrence matrix built over {len(self.menu_ids)} items up to order {self.last_order_id}")
+
+    def load(self) -> bool:
+        if not os.path.exists(self.path):
+            return False
+        with np.load(self.path) as snapshot:
+            applied_ids = snapshot["applied_ids"] if "applied_ids" in snapshot.files else ()
+            with self._lock:
+                self._reset(snapshot["menu_ids"], snapshot["matrix"], int(snapshot["last_order_id"]), applied_ids)
+        logger.info(f"Co-occurrence snapshot loaded from {self.path} (up to order {self.last_order_id})")
+        return True
+
+    async def catch_up(self, db: AsyncSession):
+        """Apply orders newer than the snapshot that it has not counted yet."""
+        rows = (await db.execute(
+            text("SELECT order_id, menu_id FROM order_items WHERE order_id > :last ORDER BY order_id"),
+            {"last": self.last_order_id}
+        )).fetchall()
+        last_order_id = (await db.execute(text("SELECT COALESCE(MAX(id), 0) FROM orders"))).scalar()
+        rows = [tuple(row) for row in rows if row[0] not in self.applied_ids]
+        with self._lock:
+            if rows:
+                chunk = np.array(rows, dtype=np.int64)
+                self._add_incidence(chunk[:, 0], self._indices(chunk[:, 1].tolist()))
+                self._dirty += len(np.unique(chunk[:, 0]))
+            # Every order in the DB is counted now
+            self.last_order_id = max([self.last_order_id, last_order_id, *self.applied_ids])
+            self.applied_ids.clear()
+        self._ready = True
+
+    async def ensure_ready(self, db: AsyncSession):
+        if self._ready:
+            return
+        if self._build_lock is None:
+            self._build_lock = asyncio.Lock()
+        async with self._build_lock:
+            if self._ready:
+                return
+            if await asyncio.to_thread(self.load):
+                await self.catch_up(db)
+            else:
+                await self.build(db)
+                await self.snapshot()
+
+    def add_order(self, order_id: int, menu_ids: Iterable[int]) -> bool:
+        """Fold one new order into the counts; returns True when a snapshot is due."""
+        menu_ids = sorted(set(menu_ids))
+        if not self._ready:
+            return False
+        with self._lock:
+            if order_id <= self.last_order_id or order_id in self.applied_ids:
+                return False
+            if menu_ids:
+                idx = self._indices(menu_ids)
+                self.matrix[np.ix_(idx, idx)] += 1
+            # Recorded even without items, so the low-water mark can move past it
+            self.applied_ids.add(order_id)
+            while self.last_order_id + 1 in self.applied_ids:
+                self.last_order_id += 1
+                self.applied_ids.discard(self.last_order_id)
+        if not menu_ids:
+            return False
+        self._dirty += 1
+        return self._dirty >= self.snapshot_every
+
+    def _save(self, menu_ids: np.ndarray, matrix: np.ndarray, last_order_id: int, applied_ids: np.ndarray):
+        if os.path.dirname(self.path):
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        tmp_path = self.path + ".tmp.npz"
+        np.savez(tmp_path, menu_ids=menu_ids, matrix=matrix, last_order_id=np.int64(last_order_id), applied_ids=applied_ids)
+        os.replace(tmp_path, self.path)
+
+    async def snapshot(self):
+        if not self._ready:
+            return
+        with self._lock:
+            state = (self.menu_ids.copy(), self.matrix.copy(), self.last_order_id, np.array(sorted(self.applied_ids), dtype=np.int64))
+        self._dirty = 0
+        await asyncio.to_thread(self._save, *state)
+        logger.info(f"Co-occurrence snapshot written to {self.path}")
+
+    def candidates(self, current_menu_ids: Iterable[int]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Candidate menu ids for an order and their summed co-occurrence with its items.
+
+        Sums the matrix rows of the order's items; items already in the order and
+        items never seen together with them are excluded.
+        """
+        idx = [self._index[m] for m in set(current_menu_ids) if m in self._index]
+        if not idx:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+        scores = self.matrix[idx].sum(axis=0)
+        scores[idx] = 0
+        keep = np.nonzero(scores)[0]
+        return self.menu_ids[keep], scores[keep]
+
+
+cooccurrence_store = CooccurrenceStore()
@@ -0,0 +1,67 @@
+import logging
+import os
+import pickle
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MODEL_PATH = os.getenv("RECO_MODEL_PATH", "data/models/reco_model.pkl")
+# stat() the artifact at most this often to notice a retrained model
+RECO_MODEL_CHECK_SECONDS = float(os.getenv("RECO_MODEL_CHECK_SECONDS", "5"))
+
+
+class ModelStore:
+    """
+    The recommendation model, unpickled once and kept resident.
+
+    The artifact is identified by its (mtime, size); when a retrain replaces
+    the file the next get() after the check interval loads the new one and
+    swaps it in with a single assignment, so requests in flight keep scoring
+    with the model they started with.
+    """
+
+    def __init__(self, path: str = MODEL_PATH, check_seconds: float = RECO_MODEL_CHECK_SECONDS):
+        self.path = path
+        self.check_seconds = check_seconds
+        self._current: Optional[Tuple[Tuple[int, int], object]] = None
+        self._checked_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.loads = 0
+
+    def _stamp(self) -> Tuple[int, int]:
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            raise ValueError("Model not found. Train first.")
+        return stat.st_mtime_ns, stat.st_size
+
+    def get(self):
+        current = self._current
+        now = time.monotonic()
+        if current is not None and self._checked_at is not None and now - self._checked_at < self.check_seconds:
+            return current[1]
+        stamp = self._stamp()
+        self._checked_at = now
+        if current is not None and current[0] == stamp:
+            return current[1]
+        with self._lock:
+            if self._current is None or self._current[0] != stamp:
+                with open(self.path, "rb") as f:
+                    model = pickle.load(f)
+                self._current = (stamp, model)
+                self.loads += 1
+                logger.info(f"Recommendation model loaded from {self.path}")
+            return self._current[1]
+
+    def status(self) -> Dict:
+        return {
+            "path": self.path,
+            "loaded": self._current is not None,
+            "mtime_ns": self._current[0][0] if self._current else None,
+            "loads": self.loads,
+        }
+
+
+reco_model = ModelStore()
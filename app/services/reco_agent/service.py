@@ -1,87 +1,130 @@
 import logging
-import pickle
-import os
 from datetime import datetime
-from sklearn.linear_model import LogisticRegression
+import numpy as np
+from sqlalchemy import bindparam
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.sql import text
-from db.connection import get_db
+from db.connection import AsyncSessionLocal
 from app.orchestrator import publish_event
-from typing import List, Dict
+from app.menu_catalog import MenuSnapshot, menu_catalog
+from app.schemas.orders import VALID_STATUSES
+from app.services.reco_agent.cooccurrence import cooccurrence_store
+from app.services.reco_agent.model_store import reco_model
+from typing import Dict, Iterable, List, Optional
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = "data/models/reco_model.pkl"
+TOP_K = 3
 
-def load_model() -> LogisticRegression:
-    """Load the pickled scikit-learn model."""
-    if not os.path.exists(MODEL_PATH):
-        raise ValueError("Model not found. Train first.")
-    with open(MODEL_PATH, "rb") as f:
-        model = pickle.load(f)
-    logger.info("Recommendation model loaded")
-    return model
+ORDER_ITEMS_BY_ID_QUERY = text("SELECT order_id, menu_id FROM order_items WHERE order_id IN :order_ids").bindparams(
+    bindparam("order_ids", expanding=True)
+)
+ORDER_ITEMS_BY_STATUS_QUERY = text("""
+    SELECT o.id, oi.menu_id
+    FROM orders o
+    LEFT JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.status = :status
+    ORDER BY o.id
+""")
+INVENTORY_QUERY = text("SELECT ingredient, quantity FROM inventory WHERE ingredient IN :names").bindparams(
+    bindparam("names", expanding=True)
+)
 
-async def get_recommendations(order_id: int) -> List[Dict]:
-    """Generate upsell suggestions for an order using the loaded model."""
+def load_model():
+    """The resident scikit-learn model, reloaded when the artifact on disk changes."""
+    return reco_model.get()
+
+async def fetch_stock(db: AsyncSession, names: Iterable[str]) -> Dict[str, float]:
+    """Inventory quantity per ingredient name, in one query."""
+    names = sorted({name for name in names if name is not None})
+    if not names:
+        return {}
+    rows = (await db.execute(INVENTORY_QUERY, {"names": names})).fetchall()
+    return {row[0]: row[1] for row in rows}
+
+def score_candidates(model, candidate_ids: np.ndarray, co_counts: np.ndarray, hour: int, day_of_week: int) -> np.ndarray:
+    """Uplift (probability of upsell acceptance) for every candidate in one predict_proba call."""
+    n = len(candidate_ids)
+    features = np.column_stack([np.full(n, hour), np.full(n, day_of_week), co_counts]).astype(np.float64)
+    return model.predict_proba(features)[:, 1]
+
+def rank_candidates(candidate_ids: np.ndarray, uplift: np.ndarray, catalog: MenuSnapshot, stock: Dict[str, float], top_k: int = TOP_K) -> List[Dict]:
+    """Top suggestions by uplift, suppressing items whose inventory row is below one unit."""
+    in_stock = np.array(
+        [stock.get(catalog.names.get(int(item_id)), 1) >= 1 for item_id in candidate_ids],
+        dtype=bool
+    )
+    keep = np.nonzero(in_stock)[0]
+    best = keep[np.argsort(-uplift[keep], kind="stable")[:top_k]]
+    return [{"item_id": int(candidate_ids[i]), "uplift": float(uplift[i])} for i in best]
+
+async def fetch_order_items(db: AsyncSession, order_ids: Optional[List[int]] = None, status: Optional[str] = None) -> Dict[int, List[int]]:
+    """Menu ids per order, in one query, for the given ids or for every order in `status`."""
+    if order_ids is not None:
+        items: Dict[int, List[int]] = {order_id: [] for order_id in order_ids}
+        if not order_ids:
+            return items
+        rows = (await db.execute(ORDER_ITEMS_BY_ID_QUERY, {"order_ids": sorted(items)})).fetchall()
+    else:
+        items = {}
+        rows = (await db.execute(ORDER_ITEMS_BY_STATUS_QUERY, {"status": status})).fetchall()
+    for row in rows:
+        menu_ids = items.setdefault(row[0], [])
+        if row[1] is not None:
+            menu_ids.append(row[1])
+    return items
+
+async def get_recommendations_batch(order_ids: Optional[List[int]] = None, status: Optional[str] = None) -> Dict[int, List[Dict]]:
+    """
+    Upsell suggestions for many orders at once, keyed by order id.
+
+    Every order's candidates are stacked into one feature matrix, so the batch
+    costs one items query, one inventory query and one predict_proba call.
+    """
     try:
+        if (order_ids is None) == (status is None):
+            raise ValueError("Provide either order_ids or status")
+        if status is not None and status not in VALID_STATUSES:
+            raise ValueError(f"Invalid status: {status}")
         model = load_model()
-        with next(get_db()) as db:
-            # Fetch current order items
-            current_items = db.execute(
-                text("SELECT menu_id FROM order_items WHERE order_id = :order_id"),
-                {"order_id": order_id}
-            ).fetchall()
-            current_menu_ids = [row.menu_id for row in current_items]
+        async with AsyncSessionLocal() as db:
+            items = await fetch_order_items(db, order_ids, status)
 
             # Fetch features: time/day, inventory, co-occurrence from history
             now = datetime.now()
             hour = now.hour
             day_of_week = now.weekday()
 
-            # Simple feature engineering: average co-occurrence from history
-            history = db.execute(
-                text("""
-                    SELECT oi1.menu_id as current, oi2.menu_id as suggested, COUNT(*) as co_count
-                    FROM order_items oi1
-                    JOIN order_items oi2 ON oi1.order_id = oi2.order_id AND oi1.menu_id != oi2.menu_id
-                    GROUP BY oi1.menu_id, oi2.menu_id
-                """)
-            ).fetchall()
-
-            features = []
-            for row in history:
-                if row.current in current_menu_ids:
-                    feature = [hour, day_of_week, row.co_count]
-                    features.append((row.suggested, feature))
-
-            if not features:
-                return []
-
-            # Predict uplift (probability of upsell acceptance)
-            suggestions = []
-            for suggested_id, feature in features:
-                # Check inventory using correct menu id reference
-                inventory = db.execute(
-                    text("SELECT quantity FROM inventory WHERE ingredient = (SELECT name FROM menu WHERE id = :menu_id)"),
-                    {"menu_id": suggested_id}
-                ).fetchone()
-                if inventory and inventory.quantity < 1:
-                    continue  # Suppress low-stock
-
-                uplift = model.predict_proba([feature])[0][1]
-                suggestions.append({"item_id": suggested_id, "uplift": uplift})
-
-            # Rank and return top 3
-            suggestions.sort(key=lambda x: x["uplift"], reverse=True)
-            top_suggestions = suggestions[:3]
-
-            logger.info(f"Generated suggestions for order {order_id}: {top_suggestions}")
-
-            # Publish event for orchestrator
-            await publish_event("recommendation_generated", {"order_id": order_id, "suggestions": top_suggestions})
-
-            return top_suggestions
+            # Co-occurrence with each order's items: a row slice and sum over the resident matrix
+            await cooccurrence_store.ensure_ready(db)
+            batch = [(order_id, *cooccurrence_store.candidates(menu_ids)) for order_id, menu_ids in items.items()]
+            results: Dict[int, List[Dict]] = {order_id: [] for order_id in items}
+            batch = [entry for entry in batch if len(entry[1])]
+
+            if batch:
+                candidate_ids = np.concatenate([entry[1] for entry in batch])
+                co_counts = np.concatenate([entry[2] for entry in batch])
+                # One inventory lookup for all candidates, then one predict_proba over the stacked features
+                catalog = await menu_catalog.get(db)
+                stock = await fetch_stock(db, (catalog.names.get(int(item_id)) for item_id in np.unique(candidate_ids)))
+                uplift = score_candidates(model, candidate_ids, co_counts, hour, day_of_week)
+                offset = 0
+                for order_id, ids, _ in batch:
+                    results[order_id] = rank_candidates(ids, uplift[offset:offset + len(ids)], catalog, stock)
+                    offset += len(ids)
+
+        logger.info(f"Generated suggestions for {len(results)} orders")
+
+        # Publish events for orchestrator
+        for order_id, suggestions in results.items():
+            await publish_event("recommendation_generated", {"order_id": order_id, "suggestions": suggestions})
+
+        return results
     except Exception as e:
         logger.error(f"Recommendation generation failed: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+async def get_recommendations(order_id: int) -> List[Dict]:
+    """Generate upsell suggestions for an order using the loaded model."""
+    return (await get_recommendations_batch(order_ids=[order_id]))[order_id]
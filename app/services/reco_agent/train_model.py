@@ -1,72 +1,244 @@
-import sys
+"""
+Train the recommendation model.
+
+    python -m app.services.reco_agent.train_model          # continue from the latest version
+    python -m app.services.reco_agent.train_model --full   # retrain from scratch
+
+Order history is streamed in chunks of TRAIN_CHUNK_ROWS order_items rows. For
+each chunk, every item of a multi-item order is a positive example and
+TRAIN_NEGATIVES_PER_POSITIVE menu items not in that order are sampled as
+negatives. The co_count feature is computed against the co-occurrence counts
+of the orders *before* the chunk (the same summed-row feature the service uses
+at serving time), then the chunk is folded into the counts. The model is a
+StandardScaler + SGDClassifier(loss="log_loss") pipeline updated with
+partial_fit, so an incremental run only reads orders newer than the last
+version and continues from its weights and counts.
+
+Each run writes reco_model_v<N>.pkl, its training state (.npz) and metadata
+(.json, including wall time and peak memory) to data/models/reco/, then
+atomically replaces data/models/reco_model.pkl, which the service reloads.
+"""
+import argparse
+import glob
+import json
+import logging
 import os
-import importlib
-importlib.invalidate_caches()  # Clear import cache
-sys.path.insert(0, "C:\\r\\me\\projects\\ai-restaurant-manager")  # Absolute path to project root
-print("Python Path:", sys.path)
-from db.connection import get_db
 import pickle
-from sklearn.linear_model import LogisticRegression
-from pandas import DataFrame
+import re
+import shutil
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import numpy as np
+from sklearn.linear_model import SGDClassifier
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
 from sqlalchemy.sql import text
-import logging
+from db.connection import SessionLocal
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-MODEL_PATH = "data/models/reco_model.pkl"
+MODEL_PATH = os.getenv("RECO_MODEL_PATH", "data/models/reco_model.pkl")
+ARTIFACT_DIR = os.getenv("RECO_ARTIFACT_DIR", "data/models/reco")
+TRAIN_CHUNK_ROWS = int(os.getenv("TRAIN_CHUNK_ROWS", "20000"))
+TRAIN_NEGATIVES_PER_POSITIVE = int(os.getenv("TRAIN_NEGATIVES_PER_POSITIVE", "3"))
+# Older versions are deleted once this many exist
+RECO_KEEP_VERSIONS = int(os.getenv("RECO_KEEP_VERSIONS", "5"))
+
+HISTORY_QUERY = text("""
+    SELECT o.id, o.created_at, oi.menu_id
+    FROM orders o
+    JOIN order_items oi ON oi.order_id = o.id
+    WHERE o.id > :after
+    ORDER BY o.id
+""")
+
+def new_model() -> Pipeline:
+    return Pipeline([
+        ("scale", StandardScaler()),
+        ("clf", SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)),
+    ])
+
+def time_features(created_at: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Hour of day and weekday (Monday = 0, as datetime.weekday()) for an array of timestamps."""
+    stamps = np.array([str(value) for value in created_at], dtype="datetime64[us]")
+    days = stamps.astype("datetime64[D]")
+    hours = (stamps - days).astype("timedelta64[h]").astype(np.int64)
+    # 1970-01-01 was a Thursday
+    weekdays = (days.astype(np.int64) + 3) % 7
+    return hours, weekdays
+
+def chunk_examples(order_ids: np.ndarray, menu_ids: np.ndarray, created_at: np.ndarray, counts: np.ndarray,
+                   menu: np.ndarray, rng: np.random.Generator, negatives: int = TRAIN_NEGATIVES_PER_POSITIVE) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Features [hour, day_of_week, co_count] and labels for one chunk of order_items rows.
+
+    `counts` is the co-occurrence matrix indexed by menu id, covering orders
+    before this chunk; it is not modified here.
+    """
+    orders, rows = np.unique(order_ids, return_inverse=True)
+    incidence = np.zeros((len(orders), counts.shape[0]), dtype=np.float64)
+    incidence[rows, menu_ids] = 1
+    # co[o, i] = sum over items j of order o of counts[j, i]
+    co = incidence @ counts
+
+    first_row = np.unique(rows, return_index=True)[1]
+    hours, weekdays = time_features(created_at[first_row])
+
+    # Positives: items of orders with at least one other item; leave the item itself out of its co_count
+    positive = incidence.sum(axis=1)[rows] >= 2
+    pos_orders, pos_items = rows[positive], menu_ids[positive]
+    pos_co = co[pos_orders, pos_items] - counts[pos_items, pos_items]
+
+    # Negatives: menu items drawn uniformly, dropping any that are in the order
+    neg_orders = np.repeat(pos_orders, negatives)
+    neg_items = rng.choice(menu, size=len(neg_orders))
+    absent = incidence[neg_orders, neg_items] == 0
+    neg_orders, neg_items = neg_orders[absent], neg_items[absent]
+    neg_co = co[neg_orders, neg_items]
 
-def train_model():
+    all_orders = np.concatenate([pos_orders, neg_orders])
+    X = np.column_stack([hours[all_orders], weekdays[all_orders], np.concatenate([pos_co, neg_co])]).astype(np.float64)
+    y = np.concatenate([np.ones(len(pos_orders), dtype=np.int64), np.zeros(len(neg_orders), dtype=np.int64)])
+    shuffle = rng.permutation(len(y))
+    return X[shuffle], y[shuffle]
+
+def add_counts(counts: np.ndarray, order_ids: np.ndarray, menu_ids: np.ndarray):
+    """Fold a chunk of orders into the co-occurrence matrix (X.T @ X over the incidence)."""
+    orders, rows = np.unique(order_ids, return_inverse=True)
+    incidence = np.zeros((len(orders), counts.shape[0]), dtype=np.float64)
+    incidence[rows, menu_ids] = 1
+    counts += incidence.T @ incidence
+
+def grow(counts: np.ndarray, size: int) -> np.ndarray:
+    if size <= counts.shape[0]:
+        return counts
+    grown = np.zeros((size, size), dtype=counts.dtype)
+    grown[:counts.shape[0], :counts.shape[0]] = counts
+    return grown
+
+def artifact_path(version: int, suffix: str) -> str:
+    return os.path.join(ARTIFACT_DIR, f"reco_model_v{version:04d}{suffix}")
+
+def latest_version() -> int:
+    paths = glob.glob(os.path.join(ARTIFACT_DIR, "reco_model_v*.pkl"))
+    return max((int(re.search(r"_v(\d+)\.pkl$", path).group(1)) for path in paths), default=0)
+
+def load_version(version: int) -> Tuple[Pipeline, np.ndarray, int]:
+    with open(artifact_path(version, ".pkl"), "rb") as f:
+        model = pickle.load(f)
+    with np.load(artifact_path(version, ".npz")) as state:
+        return model, state["counts"], int(state["last_order_id"])
+
+def save_version(version: int, model: Pipeline, counts: np.ndarray, last_order_id: int, metadata: Dict):
+    os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    with open(artifact_path(version, ".pkl"), "wb") as f:
+        pickle.dump(model, f)
+    np.savez(artifact_path(version, ".npz"), counts=counts, last_order_id=np.int64(last_order_id))
+    with open(artifact_path(version, ".json"), "w") as f:
+        json.dump(metadata, f, indent=2)
+
+    # Write then rename so the serving process never reads a half-written file
+    os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
+    tmp_path = MODEL_PATH + ".tmp"
+    shutil.copyfile(artifact_path(version, ".pkl"), tmp_path)
+    os.replace(tmp_path, MODEL_PATH)
+
+    for old in range(1, version - RECO_KEEP_VERSIONS + 1):
+        for suffix in (".pkl", ".npz", ".json"):
+            if os.path.exists(artifact_path(old, suffix)):
+                os.remove(artifact_path(old, suffix))
+
+def train_model(full: bool = False, seed: Optional[int] = None) -> Dict:
+    """Train (or continue training) the model and publish a new version; returns its metadata."""
+    started = time.perf_counter()
+    tracemalloc.start()
     try:
-        with next(get_db()) as db:
-            # Fetch positive examples (co-occurring items)
-            positive_data = db.execute(
-                text("""
-                    SELECT oi1.menu_id as current, oi2.menu_id as suggested, 1 as label, 
-                           strftime('%H', o.created_at) as hour, strftime('%w', o.created_at) as day_of_week, 
-                           COUNT(*) as co_count
-                    FROM orders o
-                    JOIN order_items oi1 ON o.id = oi1.order_id
-                    JOIN order_items oi2 ON o.id = oi2.order_id AND oi1.menu_id != oi2.menu_id
-                    GROUP BY oi1.menu_id, oi2.menu_id, hour, day_of_week
-                """)
-            ).fetchall()
-
-            # Fetch negative examples (non-co-occurring items from different orders)
-            negative_data = db.execute(
-                text("""
-                    SELECT oi1.menu_id as current, oi2.menu_id as suggested, 0 as label, 
-                           strftime('%H', o1.created_at) as hour, strftime('%w', o1.created_at) as day_of_week, 
-                           0 as co_count
-                    FROM orders o1
-                    JOIN order_items oi1 ON o1.id = oi1.order_id
-                    JOIN orders o2 ON o1.id != o2.id
-                    JOIN order_items oi2 ON o2.id = oi2.order_id
-                    WHERE oi1.menu_id != oi2.menu_id
-                    LIMIT 100 -- Limit to avoid excessive data
-                """)
-            ).fetchall()
-
-            # Combine positive and negative examples
-            data = positive_data + negative_data
-            if not data:
-                raise ValueError("No training data available")
+        previous = 0 if full else latest_version()
+        if previous:
+            model, counts, last_order_id = load_version(previous)
+            logger.info(f"Continuing from model v{previous} (orders after {last_order_id})")
+        else:
+            model, counts, last_order_id = new_model(), np.zeros((0, 0)), 0
 
-            df = DataFrame(data, columns=["current", "suggested", "label", "hour", "day_of_week", "co_count"])
-            X = df[["hour", "day_of_week", "co_count"]].astype(float)  # Convert to float for model
-            y = df["label"]
+        rng = np.random.default_rng(seed)
+        positives = negatives = orders_seen = 0
+        with SessionLocal() as db:
+            menu = np.array([row[0] for row in db.execute(text("SELECT id FROM menu")).fetchall()], dtype=np.int64)
+            if not len(menu):
+                raise ValueError("No training data available")
+            max_item = db.execute(text("SELECT COALESCE(MAX(menu_id), 0) FROM order_items")).scalar()
+            counts = grow(counts, max(int(menu.max()), int(max_item)) + 1)
 
-            model = LogisticRegression()
-            model.fit(X, y)
+            result = db.execute(HISTORY_QUERY, {"after": last_order_id}, execution_options={"stream_results": True})
+            pending = None
+            for rows in result.partitions(TRAIN_CHUNK_ROWS):
+                chunk = [np.array(column) for column in zip(*rows)]
+                if pending is not None:
+                    chunk = [np.concatenate([held, new]) for held, new in zip(pending, chunk)]
+                # Hold back the last (possibly incomplete) order for the next chunk
+                cut = np.searchsorted(chunk[0], chunk[0][-1])
+                pending, chunk = [column[cut:] for column in chunk], [column[:cut] for column in chunk]
+                if len(chunk[0]):
+                    positives, negatives, orders_seen, last_order_id = _fit_chunk(
+                        model, counts, chunk, menu, rng, positives, negatives, orders_seen
+                    )
+            if pending is not None and len(pending[0]):
+                positives, negatives, orders_seen, last_order_id = _fit_chunk(
+                    model, counts, pending, menu, rng, positives, negatives, orders_seen
+                )
 
-            os.makedirs(os.path.dirname(MODEL_PATH), exist_ok=True)
-            with open(MODEL_PATH, "wb") as f:
-                pickle.dump(model, f)
+        if not positives and not previous:
+            raise ValueError("No training data available")
+        if not orders_seen:
+            logger.info(f"No orders after {last_order_id}; model v{previous} is up to date")
+            with open(artifact_path(previous, ".json")) as f:
+                return json.load(f)
 
-            logger.info("Recommendation model trained and saved")
+        version = latest_version() + 1
+        _, peak = tracemalloc.get_traced_memory()
+        metadata = {
+            "version": version,
+            "trained_at": datetime.utcnow().isoformat(),
+            "incremental_from": previous or None,
+            "last_order_id": last_order_id,
+            "orders": orders_seen,
+            "positives": positives,
+            "negatives": negatives,
+            "wall_time_seconds": round(time.perf_counter() - started, 3),
+            "peak_memory_mb": round(peak / 2**20, 1),
+        }
+        save_version(version, model, counts, last_order_id, metadata)
+        logger.info(
+            f"Recommendation model v{version} trained on {orders_seen} new orders "
+            f"({positives} positives, {negatives} negatives) in {metadata['wall_time_seconds']}s, "
+            f"peak memory {metadata['peak_memory_mb']} MB"
+        )
+        return metadata
     except Exception as e:
         logger.error(f"Model training failed: {str(e)}")
         raise
+    finally:
+        tracemalloc.stop()
+
+def _fit_chunk(model: Pipeline, counts: np.ndarray, chunk, menu: np.ndarray, rng: np.random.Generator,
+               positives: int, negatives: int, orders_seen: int) -> Tuple[int, int, int, int]:
+    order_ids, created_at, menu_ids = chunk
+    order_ids, menu_ids = order_ids.astype(np.int64), menu_ids.astype(np.int64)
+    X, y = chunk_examples(order_ids, menu_ids, created_at, counts, menu, rng)
+    if len(y):
+        scaler, clf = model.named_steps["scale"], model.named_steps["clf"]
+        scaler.partial_fit(X)
+        clf.partial_fit(scaler.transform(X), y, classes=np.array([0, 1]))
+    add_counts(counts, order_ids, menu_ids)
+    positives += int(y.sum())
+    return positives, negatives + int(len(y) - y.sum()), orders_seen + len(np.unique(order_ids)), int(order_ids[-1])
 
 if __name__ == "__main__":
-    train_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the recommendation model")
+    parser.add_argument("--full", action="store_true", help="retrain from scratch instead of continuing from the latest version")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+    train_model(full=args.full, seed=args.seed)
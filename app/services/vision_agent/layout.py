@@ -0,0 +1,110 @@
+import json
+import logging
+import os
+import threading
+from typing import Dict, List, Optional, Tuple
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+FLOOR_LAYOUT_PATH = os.getenv("FLOOR_LAYOUT_PATH", "data/floor_layout.json")
+BRIGHTNESS_THRESHOLD = 150
+
+# Used for frames without a camera id (or from a camera missing from the layout): the
+# original single centered ROI for table 1
+DEFAULT_CAMERA = {"tables": [{"table_id": 1, "rect": [0.25, 0.25, 0.75, 0.75]}]}
+
+
+class CameraLayout:
+    """
+    The tables one camera sees, as rectangles or polygons in normalized (0-1) coordinates.
+
+    For a given frame size the ROIs are rasterized once into a label map
+    (0 = no table, k = k-th table); per-table brightness is then one
+    np.bincount over the grayscale frame. Where ROIs overlap, the one listed
+    later wins the shared pixels.
+    """
+
+    def __init__(self, camera_id: Optional[str], config: Dict):
+        self.camera_id = camera_id
+        self.table_ids: List[int] = [int(t["table_id"]) for t in config["tables"]]
+        self.shapes = [t.get("polygon") or t.get("rect") for t in config["tables"]]
+        for table_id, shape in zip(self.table_ids, self.shapes):
+            if not shape:
+                raise ValueError(f"Table {table_id} of camera {camera_id} needs a rect or polygon")
+        self.is_polygon = [("polygon" in t) for t in config["tables"]]
+        self.threshold = float(config.get("threshold", BRIGHTNESS_THRESHOLD))
+        self._labels: Dict[Tuple[int, int], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def labels(self, height: int, width: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Flattened label map and per-label pixel counts for a frame size (cached)."""
+        cached = self._labels.get((height, width))
+        if cached is not None:
+            return cached
+        label_map = np.zeros((height, width), dtype=np.int32)
+        scale = np.array([width, height], dtype=np.float64)
+        for k, (shape, is_polygon) in enumerate(zip(self.shapes, self.is_polygon), start=1):
+            if is_polygon:
+                points = np.round(np.array(shape, dtype=np.float64) * scale).astype(np.int32)
+                cv2.fillPoly(label_map, [points], k)
+            else:
+                x0, y0, x1, y1 = shape
+                label_map[int(height * y0):int(height * y1), int(width * x0):int(width * x1)] = k
+        flat = label_map.ravel()
+        counts = np.bincount(flat, minlength=len(self.table_ids) + 1)
+        self._labels[(height, width)] = (flat, counts)
+        return flat, counts
+
+    def brightness(self, img: np.ndarray) -> np.ndarray:
+        """Mean grayscale value inside each table's ROI (NaN for an ROI with no pixels)."""
+        gray = cv2.cvtColor(img, cv2.COLOR_BGR2GRAY)
+        flat, counts = self.labels(*gray.shape)
+        sums = np.bincount(flat, weights=gray.ravel(), minlength=len(counts))
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return (sums / counts)[1:]
+
+
+class FloorLayout:
+    """
+    Camera id -> CameraLayout, loaded from a JSON file:
+
+        {"cameras": {"cam-1": {"threshold": 150, "tables": [
+            {"table_id": 1, "rect": [x0, y0, x1, y1]},
+            {"table_id": 2, "polygon": [[x, y], [x, y], [x, y]]}]}}}
+    """
+
+    def __init__(self, path: str = FLOOR_LAYOUT_PATH):
+        self.path = path
+        self._cameras: Optional[Dict[str, CameraLayout]] = None
+        self._default = CameraLayout(None, DEFAULT_CAMERA)
+        # Unknown camera ids already warned about, so a stream does not log every frame
+        self._warned: set = set()
+        self._lock = threading.Lock()
+
+    def load(self):
+        cameras = {}
+        if os.path.exists(self.path):
+            with open(self.path) as f:
+                config = json.load(f)
+            cameras = {str(camera_id): CameraLayout(str(camera_id), camera) for camera_id, camera in config.get("cameras", {}).items()}
+            logger.info(f"Floor layout loaded from {self.path} with {len(cameras)} cameras")
+        with self._lock:
+            self._cameras = cameras
+            self._warned = set()
+
+    def camera(self, camera_id: Optional[str]) -> CameraLayout:
+        if self._cameras is None:
+            self.load()
+        if camera_id is None:
+            return self._default
+        layout = self._cameras.get(camera_id)
+        if layout is None:
+            if camera_id not in self._warned:
+                self._warned.add(camera_id)
+                logger.warning(f"Camera {camera_id} is not in the floor layout; using the default ROI")
+            return self._default
+        return layout
+
+
+floor_layout = FloorLayout()
@@ -0,0 +1,144 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+from app.latency import latency_summary
+
+logger = logging.getLogger(__name__)
+
+# OpenCV releases the GIL in decode/convert, so threads are the default
+VISION_POOL_KIND = os.getenv("VISION_POOL_KIND", "thread")  # thread | process
+VISION_POOL_WORKERS = int(os.getenv("VISION_POOL_WORKERS", str(min(4, os.cpu_count() or 1))))
+# Frames allowed to wait for a worker; beyond this new frames are dropped or coalesced
+VISION_MAX_PENDING = int(os.getenv("VISION_MAX_PENDING", str(2 * VISION_POOL_WORKERS)))
+VISION_OVERFLOW_POLICY = os.getenv("VISION_OVERFLOW_POLICY", "coalesce")  # drop | coalesce
+POOL_KINDS = ("thread", "process")
+VISION_OVERFLOW_POLICIES = ("drop", "coalesce")
+
+STATS_WINDOW = 1000
+
+
+class VisionOverloaded(Exception):
+    """Raised when a frame is dropped because the pool is saturated."""
+
+
+class _Job:
+    def __init__(self, args: tuple, finish: Optional[Callable[[Any], Awaitable]]):
+        self.args = args
+        self.finish = finish
+        self.submitted_at = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+
+
+class VisionPool:
+    """
+    Runs CPU-bound frame analysis off the event loop with bounded admission.
+
+    At most `workers` jobs run at once and at most `max_pending` wait; when
+    the waiting area is full a new frame is dropped. Under the "coalesce"
+    policy a frame whose source already has one waiting replaces it instead
+    (both callers get the newer frame's result), so each camera has at most
+    one frame queued.
+
+    Each admitted frame runs as its own task, followed by its async `finish`
+    step (e.g. recording the detections) exactly once, however many callers
+    were coalesced onto it. A caller that is cancelled only stops waiting;
+    the others still get the result.
+    """
+
+    def __init__(self, kind: str = VISION_POOL_KIND, workers: int = VISION_POOL_WORKERS,
+                 max_pending: int = VISION_MAX_PENDING, overflow_policy: str = VISION_OVERFLOW_POLICY):
+        if kind not in POOL_KINDS:
+            raise ValueError(f"Invalid pool kind: {kind}. Use {list(POOL_KINDS)}")
+        if overflow_policy not in VISION_OVERFLOW_POLICIES:
+            raise ValueError(f"Invalid overflow policy: {overflow_policy}. Use {list(VISION_OVERFLOW_POLICIES)}")
+        self.kind = kind
+        self.workers = max(1, workers)
+        self.max_pending = max(0, max_pending)
+        self.overflow_policy = overflow_policy
+        self._executor: Optional[Executor] = None
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._waiting: Dict[Hashable, _Job] = {}
+        self._queue_wait = deque(maxlen=STATS_WINDOW)
+        self._compute = deque(maxlen=STATS_WINDOW)
+        self.completed = 0
+        self.dropped = 0
+        self.coalesced = 0
+
+    def _ensure_started(self):
+        if self._executor is None:
+            executor_cls = ProcessPoolExecutor if self.kind == "process" else ThreadPoolExecutor
+            self._executor = executor_cls(max_workers=self.workers)
+            self._semaphore = asyncio.Semaphore(self.workers)
+            logger.info(f"Vision pool started ({self.kind}, {self.workers} workers, {self.max_pending} pending)")
+
+    async def run(self, fn: Callable, *args, key: Optional[Hashable] = None, finish: Optional[Callable[[Any], Awaitable]] = None):
+        """
+        Run fn(*args) in the pool, then `await finish(result)` if given; returns the final result.
+
+        `key` identifies the frame source for coalescing. Raises VisionOverloaded
+        when the frame is dropped, or when the job was cancelled without this
+        caller being cancelled (e.g. at shutdown).
+        """
+        self._ensure_started()
+        if key is not None and self.overflow_policy == "coalesce" and key in self._waiting:
+            job = self._waiting[key]
+            # The newer frame and its finish step replace the waiting ones
+            job.args, job.finish = args, finish
+            self.coalesced += 1
+        else:
+            if len(self._waiting) >= self.max_pending and self._semaphore.locked():
+                self.dropped += 1
+                raise VisionOverloaded("Vision pool saturated; frame dropped")
+            job = _Job(args, finish)
+            slot = key if key is not None else object()
+            self._waiting[slot] = job
+            job.task = asyncio.create_task(self._execute(fn, slot, job))
+        try:
+            return await asyncio.shield(job.task)
+        except asyncio.CancelledError:
+            if job.task.cancelled() and not asyncio.current_task().cancelling():
+                raise VisionOverloaded("Vision job cancelled before it finished") from None
+            raise
+
+    async def _execute(self, fn: Callable, slot: Hashable, job: _Job):
+        try:
+            async with self._semaphore:
+                # From here on a newer frame for this source queues a new job
+                self._waiting.pop(slot, None)
+                started = time.monotonic()
+                self._queue_wait.append(started - job.submitted_at)
+                result = await asyncio.get_running_loop().run_in_executor(self._executor, fn, *job.args)
+                self._compute.append(time.monotonic() - started)
+                self.completed += 1
+        finally:
+            if self._waiting.get(slot) is job:
+                del self._waiting[slot]
+        if job.finish is not None:
+            result = await job.finish(result)
+        return result
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+    def stats(self) -> Dict:
+        return {
+            "kind": self.kind,
+            "workers": self.workers,
+            "max_pending": self.max_pending,
+            "overflow_policy": self.overflow_policy,
+            "waiting": len(self._waiting),
+            "completed": self.completed,
+            "dropped": self.dropped,
+            "coalesced": self.coalesced,
+            "queue_wait": latency_summary(self._queue_wait, scale=1000, percentiles=(50, 95)),
+            "compute": latency_summary(self._compute, scale=1000, percentiles=(50, 95)),
+        }
+
+
+vision_pool = VisionPool()
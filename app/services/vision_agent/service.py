@@ -1,43 +1,115 @@
 import cv2
 import asyncio
+import numpy as np
 from datetime import datetime
-from sqlalchemy.sql import text
-from db.connection import get_db
+from typing import Dict, Hashable, List, Optional, Tuple
 from app.orchestrator import publish_event
+from app.telemetry_writer import telemetry_writer
+from app.services.vision_agent.layout import floor_layout
+from app.services.vision_agent.pool import vision_pool
+from app.services.vision_agent.tracker import table_tracker
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-async def detect_table_status(image_path: str) -> dict:
-    """Detect table status using OpenCV ROI logic."""
-    try:
-        img = cv2.imread(image_path)
-        if img is None:
-            raise ValueError("Image not loaded")
-
-        height, width = img.shape[:2]
-        roi = img[int(height*0.25):int(height*0.75), int(width*0.25):int(width*0.75)]
-        gray = cv2.cvtColor(roi, cv2.COLOR_BGR2GRAY)
-        brightness = gray.mean()
+def decode_frame(data: bytes) -> np.ndarray:
+    """Decode an encoded image (PNG/JPEG) from memory; np.frombuffer wraps the bytes without copying."""
+    img = cv2.imdecode(np.frombuffer(data, dtype=np.uint8), cv2.IMREAD_COLOR)
+    if img is None:
+        raise ValueError("Image could not be decoded")
+    return img
 
-        threshold = 150
+def classify_tables(img: np.ndarray, camera_id: Optional[str] = None) -> List[Dict]:
+    """Status and confidence for every table the camera covers, from the mean brightness of its ROI."""
+    layout = floor_layout.camera(camera_id)
+    threshold = layout.threshold
+    detections = []
+    for table_id, brightness in zip(layout.table_ids, layout.brightness(img)):
+        if np.isnan(brightness):
+            logger.warning(f"ROI for table {table_id} is empty at {img.shape[1]}x{img.shape[0]}")
+            continue
         status = "detected_empty" if brightness > threshold else "detected_occupied"
-        confidence = min(1.0, abs(brightness - threshold) / 255)
+        confidence = min(1.0, abs(float(brightness) - threshold) / 255)
+        detections.append({"table_id": table_id, "status": status, "confidence": confidence, "brightness": float(brightness)})
+    return detections
+
+def classify_frame(img: np.ndarray) -> Tuple[str, float]:
+    """Status and confidence from the mean brightness of the centered ROI."""
+    detections = classify_tables(img)
+    if not detections:
+        raise ValueError("No table ROI fits the frame")
+    return detections[0]["status"], detections[0]["confidence"]
+
+def analyze_frame(data: bytes, camera_id: Optional[str] = None) -> List[Dict]:
+    """Decode and classify one frame; runs in the vision pool, so it must stay picklable."""
+    return classify_tables(decode_frame(data), camera_id)
+
+async def record_detections(detections: List[Dict], camera_id: Optional[str] = None) -> dict:
+    """
+    Run one frame's detections through the per-table tracker and store what it lets through.
+
+    Only state transitions write a vision_events row and publish
+    table_status_update; a table that keeps its state gets a
+    "heartbeat_<status>" row every VISION_HEARTBEAT_SECONDS and nothing else.
+    Rows go through the group-commit telemetry writer. The returned statuses
+    are the tracked (debounced) ones.
+    """
+    if not detections:
+        raise ValueError("No table ROI of this camera fits the frame")
+    threshold = floor_layout.camera(camera_id).threshold
+    now = datetime.utcnow()
+    tables = []
+    for detection in detections:
+        action = table_tracker.observe(detection["table_id"], detection["brightness"], threshold)
+        status = table_tracker.state(detection["table_id"])
+        if action == "transition":
+            telemetry_writer.append("vision_events", {"table_id": detection["table_id"], "event_type": status, "timestamp": now})
+        elif action == "heartbeat":
+            telemetry_writer.append("vision_events", {"table_id": detection["table_id"], "event_type": f"heartbeat_{status}", "timestamp": now})
+        tables.append({"table_id": detection["table_id"], "status": status, "confidence": detection["confidence"], "changed": action == "transition"})
 
-        # Store in DB
-        with next(get_db()) as db:
-            db.execute(
-                text("INSERT INTO vision_events (table_id, event_type, timestamp) VALUES (:table_id, :status, :ts)"),
-                {"table_id": 1, "status": status, "ts": datetime.utcnow()}  # Assume table_id=1 for MVP
-            )
-            db.commit()
+    # Publish event (await the async call)
+    for table in tables:
+        if table["changed"]:
+            await publish_event("table_status_update", {"table_id": table["table_id"], "status": table["status"]})
 
-        # Publish event (await the async call)
-        await publish_event("table_status_update", {"table_id": 1, "status": status})
+    changed = [(t["table_id"], t["status"]) for t in tables if t["changed"]]
+    if changed:
+        logger.info(f"Transitions {changed} from camera {camera_id}")
+    # The first table's fields stay top-level for single-table clients
+    return {**tables[0], "camera_id": camera_id, "tables": tables}
 
-        logger.info(f"Detected {status} with confidence {confidence}")
-        return {"table_id": 1, "status": status, "confidence": confidence}  # Added table_id
+async def detect_table_status_from_bytes(data: bytes, camera_id: Optional[str] = None, source: Optional[Hashable] = None) -> dict:
+    """
+    Detect the status of every table a camera covers from an uploaded frame, without touching the disk.
+
+    Decoding and classification run in the vision pool; `source` (default:
+    the camera id) identifies the frame source so a saturated pool can
+    coalesce its frames. A coalesced frame is recorded once, by the pool,
+    and every caller gets that result. Raises VisionOverloaded when the
+    frame is dropped.
+    """
+    try:
+        return await vision_pool.run(
+            analyze_frame, data, camera_id,
+            key=source or camera_id,
+            finish=lambda detections: record_detections(detections, camera_id)
+        )
+    except Exception as e:
+        logger.error(f"Detection error: {str(e)}")
+        raise
+
+async def detect_table_status(image_path: str, camera_id: Optional[str] = None) -> dict:
+    """Detect table status using OpenCV ROI logic (for offline tools working on files)."""
+    try:
+        img = cv2.imread(image_path)
+        if img is None:
+            raise ValueError("Image not loaded")
+        result = await record_detections(classify_tables(img, camera_id), camera_id)
+        # Offline tools may exit right after; don't leave rows in the buffer
+        await telemetry_writer.flush()
+        return result
     except Exception as e:
         logger.error(f"Detection error: {str(e)}")
-        raise
\ No newline at end of file
+        raise
@@ -0,0 +1,76 @@
+import asyncio
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class LatestFrame:
+    """
+    Single-slot mailbox between a camera connection's reader and its detector.
+
+    put() never blocks: a frame that arrives while the previous one is still
+    waiting replaces it (and counts as skipped), so when detection falls
+    behind the detector always picks up the newest frame and never works
+    through a backlog.
+    """
+
+    def __init__(self, camera_id: str):
+        self.camera_id = camera_id
+        self._frame: Optional[Tuple[int, bytes, float]] = None
+        self._ready = asyncio.Event()
+        self._closed = False
+        self.received = 0
+        self.processed = 0
+        self.skipped = 0
+
+    def put(self, data: bytes):
+        if self._frame is not None:
+            self.skipped += 1
+        self.received += 1
+        self._frame = (self.received, data, time.monotonic())
+        self._ready.set()
+
+    def close(self):
+        self._closed = True
+        self._ready.set()
+
+    async def get(self) -> Optional[Tuple[int, bytes, float]]:
+        """Newest (sequence number, frame, arrival time), or None once closed and drained."""
+        while self._frame is None:
+            if self._closed:
+                return None
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self._frame = self._frame, None
+        self.processed += 1
+        return frame
+
+    def stats(self) -> Dict:
+        return {"camera_id": self.camera_id, "received": self.received, "processed": self.processed, "skipped": self.skipped}
+
+
+class CameraStreams:
+    """Open stream connections, for /vision/stats."""
+
+    def __init__(self):
+        self._streams: List[LatestFrame] = []
+
+    def open(self, camera_id: str) -> LatestFrame:
+        frames = LatestFrame(camera_id)
+        self._streams.append(frames)
+        logger.info(f"Camera {camera_id} stream opened ({len(self._streams)} open)")
+        return frames
+
+    def close(self, frames: LatestFrame):
+        frames.close()
+        if frames in self._streams:
+            self._streams.remove(frames)
+        logger.info(f"Camera {frames.camera_id} stream closed: {frames.stats()}")
+
+    def stats(self) -> List[Dict]:
+        return [frames.stats() for frames in self._streams]
+
+
+camera_streams = CameraStreams()
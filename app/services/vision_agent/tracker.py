@@ -0,0 +1,107 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Brightness must clear the threshold by this much to switch state
+VISION_HYSTERESIS = float(os.getenv("VISION_HYSTERESIS", "10"))
+# A new state must hold this long before it is committed
+VISION_MIN_DWELL_SECONDS = float(os.getenv("VISION_MIN_DWELL_SECONDS", "5"))
+# Tables with no transition still get a heartbeat row this often
+VISION_HEARTBEAT_SECONDS = float(os.getenv("VISION_HEARTBEAT_SECONDS", "300"))
+
+EMPTY = "detected_empty"
+OCCUPIED = "detected_occupied"
+
+
+class _TableState:
+    def __init__(self, state: str, now: float):
+        self.state = state
+        self.since = now
+        self.candidate: Optional[str] = None
+        self.candidate_since = now
+        self.last_written = now
+        self.suppressed = 0
+
+
+class TableStateTracker:
+    """
+    Debounces per-table detections so only real changes reach the DB and the orchestrator.
+
+    A table is empty above threshold + hysteresis and occupied below
+    threshold - hysteresis; inside the band it keeps its state. A new state
+    becomes a transition only after it has been seen continuously for
+    `min_dwell` seconds. observe() returns "transition", "heartbeat" (no
+    change for `heartbeat` seconds: write a compact row, publish nothing) or
+    None (suppressed).
+    """
+
+    def __init__(self, hysteresis: float = VISION_HYSTERESIS, min_dwell: float = VISION_MIN_DWELL_SECONDS, heartbeat: float = VISION_HEARTBEAT_SECONDS):
+        self.hysteresis = hysteresis
+        self.min_dwell = min_dwell
+        self.heartbeat = heartbeat
+        self._tables: Dict[int, _TableState] = {}
+        self._lock = threading.Lock()
+        self.transitions = 0
+        self.heartbeats = 0
+        self.suppressed = 0
+
+    def observe(self, table_id: int, brightness: float, threshold: float, now: Optional[float] = None) -> Optional[str]:
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            table = self._tables.get(table_id)
+            if table is None:
+                # First sighting: commit the plain threshold decision
+                self._tables[table_id] = _TableState(EMPTY if brightness > threshold else OCCUPIED, now)
+                self.transitions += 1
+                return "transition"
+
+            if brightness > threshold + self.hysteresis:
+                observed = EMPTY
+            elif brightness < threshold - self.hysteresis:
+                observed = OCCUPIED
+            else:
+                observed = table.state
+
+            if observed == table.state:
+                table.candidate = None
+            else:
+                if table.candidate != observed:
+                    table.candidate, table.candidate_since = observed, now
+                if now - table.candidate_since >= self.min_dwell:
+                    table.state, table.since, table.candidate = observed, now, None
+                    table.last_written = now
+                    self.transitions += 1
+                    return "transition"
+
+            if now - table.last_written >= self.heartbeat:
+                table.last_written = now
+                self.heartbeats += 1
+                return "heartbeat"
+            table.suppressed += 1
+            self.suppressed += 1
+            return None
+
+    def state(self, table_id: int) -> Optional[str]:
+        table = self._tables.get(table_id)
+        return table.state if table else None
+
+    def stats(self) -> Dict:
+        return {
+            "hysteresis": self.hysteresis,
+            "min_dwell_seconds": self.min_dwell,
+            "heartbeat_seconds": self.heartbeat,
+            "transitions": self.transitions,
+            "heartbeats": self.heartbeats,
+            "suppressed": self.suppressed,
+            "tables": {
+                table_id: {"state": table.state, "pending": table.candidate, "suppressed": table.suppressed}
+                for table_id, table in sorted(self._tables.items())
+            },
+        }
+
+
+table_tracker = TableStateTracker()
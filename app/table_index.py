@@ -0,0 +1,103 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.sql import text
+
+logger = logging.getLogger(__name__)
+
+# Re-read the tables table at most this often to pick up out-of-process writes (e.g. db/seed.py)
+TABLE_INDEX_REFRESH_SECONDS = float(os.getenv("TABLE_INDEX_REFRESH_SECONDS", "60"))
+
+
+class TableIndex:
+    """
+    In-process view of the tables table (id -> capacity, status).
+
+    The index is the fast path: a claim is a compare-and-set on the dict under a
+    lock, so two coroutines can never both win the same table. The database
+    stays authoritative through a conditional UPDATE (see claim_table).
+    """
+
+    def __init__(self, refresh_seconds: float = TABLE_INDEX_REFRESH_SECONDS):
+        self.refresh_seconds = refresh_seconds
+        self._tables: Dict[int, Dict] = {}
+        self._lock = threading.Lock()
+        self._loaded_at: Optional[float] = None
+
+    async def load(self, db: AsyncSession):
+        rows = (await db.execute(text("SELECT id, capacity, status FROM tables"))).fetchall()
+        with self._lock:
+            self._tables = {row[0]: {"id": row[0], "capacity": row[1], "status": row[2]} for row in rows}
+            self._loaded_at = time.monotonic()
+        logger.info(f"Table index loaded with {len(rows)} tables")
+
+    async def ensure_loaded(self, db: AsyncSession):
+        if self._loaded_at is None or time.monotonic() - self._loaded_at > self.refresh_seconds:
+            await self.load(db)
+
+    async def refresh_one(self, db: AsyncSession, table_id: int):
+        row = (await db.execute(
+            text("SELECT id, capacity, status FROM tables WHERE id = :table_id"),
+            {"table_id": table_id}
+        )).fetchone()
+        with self._lock:
+            if row:
+                self._tables[row[0]] = {"id": row[0], "capacity": row[1], "status": row[2]}
+            else:
+                self._tables.pop(table_id, None)
+
+    def get(self, table_id: int) -> Optional[Dict]:
+        table = self._tables.get(table_id)
+        return dict(table) if table else None
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [dict(self._tables[table_id]) for table_id in sorted(self._tables)]
+
+    def compare_and_set(self, table_id: int, expected: str, status: str) -> bool:
+        with self._lock:
+            table = self._tables.get(table_id)
+            if table is None or table["status"] != expected:
+                return False
+            table["status"] = status
+            return True
+
+    def set_status(self, table_id: int, status: str):
+        with self._lock:
+            if table_id in self._tables:
+                self._tables[table_id]["status"] = status
+
+
+table_index = TableIndex()
+
+async def claim_table(db: AsyncSession, table_id: int, status: str = "occupied") -> bool:
+    """
+    Atomically move an available table to `status` in the index and the session's transaction.
+
+    The caller commits; if it rolls back instead it must call release_table.
+    """
+    await table_index.ensure_loaded(db)
+    if not table_index.compare_and_set(table_id, "available", status):
+        return False
+    try:
+        result = await db.execute(
+            text("UPDATE tables SET status = :status WHERE id = :table_id AND status = 'available'"),
+            {"status": status, "table_id": table_id}
+        )
+    except Exception:
+        # The claim never reached the DB; give the table back before surfacing the error
+        release_table(table_id, status)
+        raise
+    if result.rowcount != 1:
+        # Another process changed the row; the DB wins
+        logger.warning(f"Table {table_id} claim lost to a concurrent writer")
+        await table_index.refresh_one(db, table_id)
+        return False
+    return True
+
+def release_table(table_id: int, status: str = "occupied"):
+    """Undo an index claim whose transaction was rolled back."""
+    table_index.compare_and_set(table_id, status, "available")
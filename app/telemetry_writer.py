@@ -0,0 +1,154 @@
+import asyncio
+import logging
+import os
+import time
+from collections import deque
+from typing import Callable, Dict, List, Optional, Tuple
+from sqlalchemy.sql import text
+from db.connection import AsyncSessionLocal
+from app.latency import latency_summary
+
+logger = logging.getLogger(__name__)
+
+TELEMETRY_BATCH_SIZE = int(os.getenv("TELEMETRY_BATCH_SIZE", "500"))
+TELEMETRY_FLUSH_INTERVAL_MS = int(os.getenv("TELEMETRY_FLUSH_INTERVAL_MS", "200"))
+# Rows beyond this are dropped (oldest first) if the DB cannot keep up
+TELEMETRY_MAX_BUFFER = int(os.getenv("TELEMETRY_MAX_BUFFER", "50000"))
+
+# Append-only tables the writer accepts, with their insert statement
+TELEMETRY_TABLES = {
+    "vision_events": text("INSERT INTO vision_events (table_id, event_type, timestamp) VALUES (:table_id, :event_type, :timestamp)"),
+}
+
+STATS_WINDOW = 1000
+
+
+class TelemetryWriter:
+    """
+    Group-commit writer for append-only tables in the application DB.
+
+    append() only buffers the row; a background task writes everything
+    buffered with one executemany per table and a single commit when
+    `batch_size` rows are waiting or `flush_interval_ms` has passed, so a
+    frame costs no transaction of its own. A failed write puts the batch
+    back at the front of the buffer (still bounded by `max_buffer`) and is
+    retried on the next tick. stop() flushes the remainder; rows buffered
+    when the process dies are lost.
+    """
+
+    def __init__(self, batch_size: int = TELEMETRY_BATCH_SIZE, flush_interval_ms: int = TELEMETRY_FLUSH_INTERVAL_MS,
+                 max_buffer: int = TELEMETRY_MAX_BUFFER, session_factory: Callable = AsyncSessionLocal):
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval_ms / 1000
+        self.max_buffer = max_buffer
+        self.session_factory = session_factory
+        self._buffer: deque = deque()
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self._flush_lock: Optional[asyncio.Lock] = None
+        self._flush_ms = deque(maxlen=STATS_WINDOW)
+        self._wait_ms = deque(maxlen=STATS_WINDOW)
+        self.flushes = 0
+        self.flushed_rows = 0
+        self.dropped = 0
+        self.failed = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def append(self, table: str, row: Dict):
+        """Buffer one row for `table` (one of TELEMETRY_TABLES); starts the writer on first use."""
+        if table not in TELEMETRY_TABLES:
+            raise ValueError(f"Unknown telemetry table: {table}")
+        self.start()
+        if len(self._buffer) >= self.max_buffer:
+            self._buffer.popleft()
+            self.dropped += 1
+        self._buffer.append((table, row, time.monotonic()))
+        if len(self._buffer) >= self.batch_size:
+            self._wake.set()
+
+    async def flush(self) -> int:
+        """Write everything buffered now; returns the number of rows written."""
+        if self._flush_lock is None:
+            self._flush_lock = asyncio.Lock()
+        async with self._flush_lock:
+            if not self._buffer:
+                return 0
+            batch: List[Tuple[str, Dict, float]] = list(self._buffer)
+            self._buffer.clear()
+            rows: Dict[str, List[Dict]] = {}
+            for table, row, _ in batch:
+                rows.setdefault(table, []).append(row)
+            started = time.monotonic()
+            try:
+                async with self.session_factory() as db:
+                    for table, table_rows in rows.items():
+                        await db.execute(TELEMETRY_TABLES[table], table_rows)
+                    await db.commit()
+            except Exception as e:
+                self.failed += 1
+                # Ahead of rows appended meanwhile; over the bound the oldest go, as in append()
+                self._buffer.extendleft(reversed(batch))
+                while len(self._buffer) > self.max_buffer:
+                    self._buffer.popleft()
+                    self.dropped += 1
+                logger.error(f"Telemetry flush of {len(batch)} rows failed, {len(self._buffer)} rows kept for retry: {str(e)}")
+                return 0
+            finished = time.monotonic()
+            self._flush_ms.append((finished - started) * 1000)
+            self._wait_ms.append((finished - batch[0][2]) * 1000)
+            self.flushes += 1
+            self.flushed_rows += len(batch)
+            return len(batch)
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wake.clear()
+            failed = self.failed
+            # A cancelled flush would lose its rows: they have left the buffer but are not committed
+            await asyncio.shield(self.flush())
+            if self.failed != failed:
+                # Retry on the next tick rather than on every append to a full batch
+                await asyncio.sleep(self.flush_interval)
+
+    def start(self):
+        if not self.running:
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+            logger.info(f"Telemetry writer started (batch {self.batch_size}, interval {self.flush_interval * 1000:.0f} ms)")
+
+    async def stop(self):
+        """Stop the background task and write whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+        written = await self.flush()
+        if written:
+            logger.info(f"Telemetry writer flushed {written} rows on shutdown")
+
+    def stats(self) -> Dict:
+        return {
+            "running": self.running,
+            "batch_size": self.batch_size,
+            "flush_interval_ms": self.flush_interval * 1000,
+            "buffered": len(self._buffer),
+            "flushes": self.flushes,
+            "flushed_rows": self.flushed_rows,
+            "avg_batch": round(self.flushed_rows / self.flushes, 2) if self.flushes else None,
+            "dropped": self.dropped,
+            # Failed flush attempts; their rows stay buffered for the retry
+            "failed": self.failed,
+            # Commit time per flush, and how long the oldest row of each batch waited
+            "flush_latency": latency_summary(self._flush_ms),
+            "row_wait": latency_summary(self._wait_ms),
+        }
+
+
+telemetry_writer = TelemetryWriter()
@@ -0,0 +1,94 @@
+"""
+Concurrency benchmark: blocking sync sessions vs. the async session factory.
+
+Fires many parallel "requests" (each one aggregate query, as compute_kpis does)
+at a throwaway SQLite database and reports throughput plus the worst event-loop
+stall seen by a 10 ms ticker. Blocking sessions serialize every request on the
+loop; async sessions let the ticker (i.e. every other endpoint) keep running.
+
+    python -m benchmarks.bench_db_concurrency --requests 200 --orders 5000
+"""
+import argparse
+import asyncio
+import os
+import random
+import sqlite3
+import tempfile
+import time
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.sql import text
+
+QUERY = text("""
+    SELECT COUNT(DISTINCT o.id), COALESCE(SUM(oi.quantity * m.price), 0)
+    FROM orders o
+    LEFT JOIN order_items oi ON o.id = oi.order_id
+    LEFT JOIN menu m ON oi.menu_id = m.id
+    WHERE o.table_id = :table_id
+""")
+
+def build_db(path: str, orders: int):
+    conn = sqlite3.connect(path)
+    with open(os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")) as f:
+        conn.executescript(f.read())
+    conn.executemany(
+        "INSERT INTO menu (name, price, category) VALUES (?, ?, ?)",
+        [(f"item {i}", 2.5 + i, "main") for i in range(20)]
+    )
+    conn.executemany(
+        "INSERT INTO orders (id, table_id, status) VALUES (?, ?, 'paid')",
+        [(i, random.randint(1, 12)) for i in range(1, orders + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO order_items (order_id, menu_id, quantity) VALUES (?, ?, ?)",
+        [(random.randint(1, orders), random.randint(1, 20), random.randint(1, 3)) for _ in range(orders * 3)]
+    )
+    conn.commit()
+    conn.close()
+
+async def ticker(stop: asyncio.Event, stalls: list):
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.01)
+        stalls.append(time.perf_counter() - start - 0.01)
+
+async def run(label: str, handler, requests: int):
+    stop, stalls = asyncio.Event(), []
+    tick = asyncio.create_task(ticker(stop, stalls))
+    start = time.perf_counter()
+    await asyncio.gather(*(handler(random.randint(1, 12)) for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await tick
+    print(f"{label:>6}: {requests / elapsed:8.1f} req/s  wall {elapsed:6.2f}s  max loop stall {max(stalls, default=0) * 1000:7.1f} ms")
+
+async def main(requests: int, orders: int):
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.db")
+        build_db(path, orders)
+
+        SessionLocal = sessionmaker(bind=create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False}))
+        async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}", pool_size=10)
+        AsyncSessionLocal = async_sessionmaker(bind=async_engine)
+
+        async def sync_handler(table_id: int):
+            # What the services did before: a blocking call inside an async def
+            with SessionLocal() as db:
+                return db.execute(QUERY, {"table_id": table_id}).fetchone()
+
+        async def async_handler(table_id: int):
+            async with AsyncSessionLocal() as db:
+                return (await db.execute(QUERY, {"table_id": table_id})).fetchone()
+
+        print(f"{requests} concurrent requests over {orders} orders")
+        await run("sync", sync_handler, requests)
+        await run("async", async_handler, requests)
+        await async_engine.dispose()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--orders", type=int, default=5000)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.orders))
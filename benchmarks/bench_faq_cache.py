@@ -0,0 +1,93 @@
+"""
+FAQ cache benchmark: raw-string keys vs. normalized keys plus the TF-IDF paraphrase index.
+
+Replays a query log (one query per line, or a synthetic log of paraphrased
+restaurant questions with skewed popularity) through cached_query with the
+LLM call replaced by a fixed simulated latency, once keyed on the raw query
+string and once through the normalized/similarity path. Prints hit rate,
+LLM calls and p50/p99 per-query latency for each.
+
+    python -m benchmarks.bench_faq_cache --queries 2000 --llm-ms 800
+    python -m benchmarks.bench_faq_cache --log data/faq_queries.txt
+"""
+import argparse
+import asyncio
+import os
+import time
+import numpy as np
+
+os.environ.setdefault("FAQ_LLM_PROVIDER", "stub")  # run_chain is replaced below anyway
+from app.services.faq_agent import service
+from app.services.faq_agent.cache import FaqCache
+from app.services.faq_agent.similarity import SimilarityIndex
+
+PARAPHRASES = [
+    ["What vegan dishes do you have?", "Do you have vegan food", "vegan options?", "Any vegan meals", "Which dishes are vegan?"],
+    ["What are your opening hours?", "opening hours", "What are the opening hours", "Opening hours please"],
+    ["Do you have gluten-free options?", "gluten free food?", "Any gluten-free dishes", "Gluten free meals please"],
+    ["Can I split the bill?", "can we split the bill", "Split the bill?", "is it possible to split the bill"],
+    ["How do I cancel a reservation?", "cancel reservation", "How can I cancel my reservation?", "cancel a booking"],
+    ["Do you accept credit cards?", "credit cards accepted?", "Can I pay with a credit card", "do you take credit cards"],
+    ["Is there parking?", "parking?", "Do you have parking", "Is there any parking"],
+]
+
+def synthetic_log(n: int, seed: int = 0) -> list:
+    rng = np.random.default_rng(seed)
+    weights = 1 / np.arange(1, len(PARAPHRASES) + 1)
+    groups = rng.choice(len(PARAPHRASES), size=n, p=weights / weights.sum())
+    log = []
+    for i, group in enumerate(groups):
+        # A share of one-off questions that no cache can serve
+        if rng.random() < 0.1:
+            log.append(f"Do you serve dish number {i}?")
+        else:
+            log.append(PARAPHRASES[group][rng.integers(len(PARAPHRASES[group]))])
+    return log
+
+async def replay(log: list, llm_ms: float, similarity: bool) -> dict:
+    cache = FaqCache(max_size=256, ttl=3600)
+    index = SimilarityIndex()
+    service.faq_cache, service.faq_index = cache, index
+
+    async def fake_chain(query: str, policy: str = "") -> str:
+        await asyncio.sleep(llm_ms / 1000)
+        return f"answer to {query}"
+    service.run_chain = fake_chain
+
+    latencies = []
+    for query in log:
+        start = time.perf_counter()
+        if similarity:
+            await service.cached_query(query)
+        else:
+            await cache.get_or_compute(query, lambda query=query: fake_chain(query))
+        latencies.append(time.perf_counter() - start)
+    latencies = np.array(latencies) * 1000
+    return {
+        "llm_calls": cache.misses,
+        "hit_rate": 1 - cache.misses / len(log),
+        "p50_ms": float(np.percentile(latencies, 50)),
+        "p99_ms": float(np.percentile(latencies, 99)),
+        "total_s": float(latencies.sum() / 1000),
+        "paraphrase_matches": index.matches,
+    }
+
+def main(queries: int, log_path: str, llm_ms: float):
+    if log_path:
+        with open(log_path) as f:
+            log = [line.strip() for line in f if line.strip()]
+    else:
+        log = synthetic_log(queries)
+    print(f"{len(log)} queries, {len(set(log))} distinct strings, simulated LLM {llm_ms:.0f} ms")
+    for name, similarity in (("raw key", False), ("normalized + tf-idf", True)):
+        r = asyncio.run(replay(log, llm_ms, similarity))
+        print(f"{name:20s} hit rate {r['hit_rate']:6.1%}  LLM calls {r['llm_calls']:5d}  "
+              f"p50 {r['p50_ms']:8.3f} ms  p99 {r['p99_ms']:8.1f} ms  total {r['total_s']:7.1f} s  paraphrase matches {r['paraphrase_matches']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--log", default=None, help="query log, one query per line")
+    parser.add_argument("--llm-ms", type=float, default=800)
+    args = parser.parse_args()
+    main(args.queries, args.log, args.llm_ms)
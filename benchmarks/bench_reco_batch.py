@@ -0,0 +1,87 @@
+"""
+Batch recommendation benchmark: get_recommendations per order vs. one batch call.
+
+Builds a throwaway SQLite database with order history and a set of open
+(pending) orders, trains a small model next to it, and reports orders/second
+for looping over get_recommendations against one get_recommendations_batch
+call for all open orders.
+
+    python -m benchmarks.bench_reco_batch --history 5000 --open 200
+"""
+import argparse
+import asyncio
+import os
+import pickle
+import random
+import sqlite3
+import tempfile
+import time
+import numpy as np
+from sklearn.linear_model import LogisticRegression
+
+def build_db(path: str, history: int, open_orders: int):
+    conn = sqlite3.connect(path)
+    with open(os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")) as f:
+        conn.executescript(f.read())
+    conn.executemany(
+        "INSERT INTO menu (id, name, price, category) VALUES (?, ?, ?, ?)",
+        [(i, f"item {i}", 2.5 + i, "main") for i in range(1, 41)]
+    )
+    conn.executemany("INSERT INTO inventory (ingredient, quantity, unit) VALUES (?, ?, 'portion')", [(f"item {i}", random.choice((0, 10))) for i in range(1, 41)])
+    total = history + open_orders
+    conn.executemany(
+        "INSERT INTO orders (id, table_id, status) VALUES (?, 1, ?)",
+        [(i, "paid" if i <= history else "pending") for i in range(1, total + 1)]
+    )
+    conn.executemany(
+        "INSERT INTO order_items (order_id, menu_id, quantity) VALUES (?, ?, 1)",
+        [(i, m) for i in range(1, total + 1) for m in random.sample(range(1, 41), random.randint(1, 4))]
+    )
+    conn.commit()
+    conn.close()
+
+def train(path: str):
+    X = np.column_stack([np.random.randint(0, 24, 500), np.random.randint(0, 7, 500), np.random.randint(0, 50, 500)]).astype(float)
+    with open(path, "wb") as f:
+        pickle.dump(LogisticRegression().fit(X, (X[:, 2] > 25).astype(int)), f)
+
+async def run(history: int, open_orders: int):
+    from app.orchestrator import event_bus
+    from app.services.reco_agent.service import get_recommendations, get_recommendations_batch
+
+    event_bus.start()
+    open_ids = list(range(history + 1, history + open_orders + 1))
+    await get_recommendations_batch(order_ids=open_ids[:1])  # build the co-occurrence matrix and load the model
+
+    start = time.perf_counter()
+    for order_id in open_ids:
+        await get_recommendations(order_id)
+    loop_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    results = await get_recommendations_batch(status="pending")
+    batch_time = time.perf_counter() - start
+    await event_bus.stop()
+
+    print(f"{history} historical orders, {len(results)} open orders")
+    print(f"per-order loop: {loop_time * 1000:8.1f} ms   {open_orders / loop_time:8.0f} orders/s")
+    print(f"batch call:     {batch_time * 1000:8.1f} ms   {open_orders / batch_time:8.0f} orders/s")
+
+def main(history: int, open_orders: int):
+    workdir = tempfile.mkdtemp()
+    build_db(os.path.join(workdir, "bench.db"), history, open_orders)
+    train(os.path.join(workdir, "reco_model.pkl"))
+    # The app reads these at import time
+    os.environ["DB_URL"] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    os.environ["RECO_MODEL_PATH"] = os.path.join(workdir, "reco_model.pkl")
+    os.environ["COOCCURRENCE_PATH"] = os.path.join(workdir, "cooccurrence.npz")
+    os.environ["EVENT_JOURNAL_ENABLED"] = "0"
+    os.environ.setdefault("MISTRAL_API_KEY", "unused")
+    asyncio.run(run(history, open_orders))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--history", type=int, default=5000)
+    parser.add_argument("--open", type=int, default=200)
+    args = parser.parse_args()
+    main(args.history, args.open)
@@ -0,0 +1,69 @@
+"""
+Reservation matching benchmark: in-memory ReservationMatcher vs. the SQL scan it replaced.
+
+Loads thousands of pending reservations (random party sizes and times around
+now) and times matching freed tables of random capacity against both the
+matcher and `SELECT ... ORDER BY reservation_time` on SQLite.
+
+    python -m benchmarks.bench_reservation_matcher --pending 5000 --matches 2000
+"""
+import argparse
+import random
+import sqlite3
+import statistics
+import time
+from datetime import datetime, timedelta
+from app.reservation_matcher import ReservationMatcher
+
+def main(pending: int, matches: int):
+    now = datetime(2025, 8, 20, 19, 0)
+    rows = [
+        (i, now + timedelta(minutes=random.randint(-180, 180)), random.randint(1, 8))
+        for i in range(1, pending + 1)
+    ]
+    capacities = [random.choice((2, 4, 4, 6, 8)) for _ in range(matches)]
+
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE reservations (id INTEGER PRIMARY KEY, reservation_time TIMESTAMP, party_size INTEGER, table_id INTEGER)")
+    conn.execute("CREATE INDEX idx_reservations_time ON reservations(reservation_time)")
+    conn.executemany("INSERT INTO reservations (id, reservation_time, party_size) VALUES (?, ?, ?)", rows)
+
+    sql_times = []
+    for capacity in capacities:
+        start = time.perf_counter()
+        row = conn.execute(
+            "SELECT id FROM reservations WHERE table_id IS NULL AND reservation_time <= ? ORDER BY reservation_time LIMIT 1",
+            (now,)
+        ).fetchone()
+        if row:
+            conn.execute("UPDATE reservations SET table_id = 1 WHERE id = ?", (row[0],))
+        sql_times.append(time.perf_counter() - start)
+
+    matcher = ReservationMatcher()
+    start = time.perf_counter()
+    for reservation_id, reservation_time, party_size in rows:
+        matcher.add(reservation_id, reservation_time, party_size)
+    load_time = time.perf_counter() - start
+
+    matcher_times, fits = [], 0
+    for capacity in capacities:
+        start = time.perf_counter()
+        match = matcher.pop_best(capacity, now)
+        matcher_times.append(time.perf_counter() - start)
+        fits += bool(match)
+
+    def report(label, samples):
+        samples = sorted(samples)
+        p99 = samples[int(len(samples) * 0.99) - 1]
+        print(f"{label:>8}: p50 {statistics.median(samples) * 1e6:8.1f} us   p99 {p99 * 1e6:8.1f} us")
+
+    print(f"{pending} pending reservations, {matches} freed tables (matcher load {load_time * 1000:.1f} ms, {fits} matched)")
+    report("sql scan", sql_times)
+    report("matcher", matcher_times)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--pending", type=int, default=5000)
+    parser.add_argument("--matches", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.pending, args.matches)
@@ -0,0 +1,52 @@
+"""
+API startup benchmark: app import time with the lazy FAQ agent vs. creating its LLM eagerly.
+
+Each measurement runs in a fresh interpreter (median of --repeats runs):
+importing app.main, the share of that spent importing the FAQ agent,
+and app.main plus creating the FAQ LLM provider up front, which is what
+every boot paid when the Mistral client was built at import time.
+
+    python -m benchmarks.bench_startup --repeats 5
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+IMPORT_APP = "import time; t = time.perf_counter(); import app.main; print(time.perf_counter() - t)"
+EAGER_FAQ = (
+    "import time; t = time.perf_counter(); import app.main; "
+    "from app.services.faq_agent.service import TOOLS; from app.services.faq_agent.llm import get_llm; "
+    "get_llm(list(TOOLS.values())); print(time.perf_counter() - t)"
+)
+
+def run(code: str, env: dict, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-c", code], env={**os.environ, **env}, capture_output=True, text=True, check=True)
+        samples.append(float(out.stdout.strip().splitlines()[-1]))
+    return statistics.median(samples)
+
+def faq_import_share(repeats: int) -> float:
+    """Cumulative import time of the FAQ agent module inside an app.main import (-X importtime, microseconds)."""
+    samples = []
+    for _ in range(repeats):
+        out = subprocess.run([sys.executable, "-X", "importtime", "-c", "import app.main"], capture_output=True, text=True, check=True)
+        line = next(l for l in out.stderr.splitlines() if l.rstrip().endswith("app.services.faq_agent.service"))
+        samples.append(int(line.split("|")[1]) / 1e6)
+    return statistics.median(samples)
+
+def main(repeats: int):
+    lazy = run(IMPORT_APP, {}, repeats)
+    print(f"import app.main (FAQ LLM created on first query): {lazy * 1000:8.1f} ms")
+    print(f"  of which FAQ agent modules:                     {faq_import_share(repeats) * 1000:8.1f} ms")
+    for provider, env in (("stub", {"FAQ_LLM_PROVIDER": "stub"}), ("mistral", {"FAQ_LLM_PROVIDER": "mistral", "MISTRAL_API_KEY": os.getenv("MISTRAL_API_KEY", "benchmark")})):
+        eager = run(EAGER_FAQ, env, repeats)
+        print(f"import app.main + eager {provider:7s} provider:       {eager * 1000:8.1f} ms (+{(eager - lazy) * 1000:.1f} ms)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeats", type=int, default=5)
+    args = parser.parse_args()
+    main(args.repeats)
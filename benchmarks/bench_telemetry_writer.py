@@ -0,0 +1,67 @@
+"""
+Telemetry write benchmark: one transaction per vision_events row vs. the group-commit writer.
+
+Creates a throwaway WAL SQLite DB, then inserts --rows rows from --producers
+concurrent tasks, first with a session + commit per row (the old vision
+ingest path) and then through TelemetryWriter. Prints rows/second and the
+writer's flush latency and row-wait percentiles.
+
+    python -m benchmarks.bench_telemetry_writer --rows 5000 --producers 8 --batch-size 500 --interval-ms 200
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+from datetime import datetime
+from sqlalchemy.sql import text
+from sqlalchemy.ext.asyncio import async_sessionmaker
+from db.connection import create_async_db_engine
+from app.telemetry_writer import TELEMETRY_TABLES, TelemetryWriter
+
+async def main(rows: int, producers: int, batch_size: int, interval_ms: int):
+    engine = create_async_db_engine(f"sqlite+aiosqlite:///{os.path.join(tempfile.mkdtemp(), 'bench.db')}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE vision_events (id INTEGER PRIMARY KEY AUTOINCREMENT, table_id INTEGER, event_type TEXT NOT NULL, timestamp TIMESTAMP)"))
+    sessions = async_sessionmaker(bind=engine)
+    per_producer = rows // producers
+
+    async def commit_each(worker: int):
+        for _ in range(per_producer):
+            async with sessions() as db:
+                await db.execute(TELEMETRY_TABLES["vision_events"], {"table_id": worker, "event_type": "detected_empty", "timestamp": datetime.utcnow()})
+                await db.commit()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(commit_each(w) for w in range(producers)))
+    single_rps = per_producer * producers / (time.perf_counter() - start)
+
+    writer = TelemetryWriter(batch_size=batch_size, flush_interval_ms=interval_ms, session_factory=sessions)
+
+    async def buffered(worker: int):
+        for i in range(per_producer):
+            writer.append("vision_events", {"table_id": worker, "event_type": "detected_empty", "timestamp": datetime.utcnow()})
+            if i % 50 == 0:
+                await asyncio.sleep(0)  # let the flusher run, as request handlers would
+
+    start = time.perf_counter()
+    await asyncio.gather(*(buffered(w) for w in range(producers)))
+    await writer.stop()
+    group_rps = per_producer * producers / (time.perf_counter() - start)
+    stats = writer.stats()
+    await engine.dispose()
+
+    print(f"{per_producer * producers} rows from {producers} producers")
+    print(f"commit per row: {single_rps:10.1f} rows/s")
+    print(f"group commit:   {group_rps:10.1f} rows/s ({stats['flushes']} flushes, avg batch {stats['avg_batch']})")
+    print(f"flush latency:  {stats['flush_latency']}")
+    print(f"row wait:       {stats['row_wait']}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--producers", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=500)
+    parser.add_argument("--interval-ms", type=int, default=200)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.producers, args.batch_size, args.interval_ms))
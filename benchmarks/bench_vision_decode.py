@@ -0,0 +1,52 @@
+"""
+Vision ingest benchmark: temp file + cv2.imread vs. cv2.imdecode on the upload bytes.
+
+Encodes synthetic camera frames, then measures frames/second for the old
+ingest path (write the upload to data/sample_frames-style temp file, read it
+back with cv2.imread, delete it) and the in-memory one (np.frombuffer +
+cv2.imdecode). Both run the same ROI classification; the DB write is excluded.
+
+    python -m benchmarks.bench_vision_decode --frames 300 --width 1280 --height 720 --format .jpg
+"""
+import argparse
+import os
+import tempfile
+import time
+import cv2
+import numpy as np
+from app.services.vision_agent.service import classify_frame, decode_frame
+
+def main(frames: int, width: int, height: int, fmt: str):
+    rng = np.random.default_rng(0)
+    encoded = []
+    for _ in range(8):
+        img = rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
+        encoded.append(cv2.imencode(fmt, cv2.GaussianBlur(img, (9, 9), 0))[1].tobytes())
+    workdir = tempfile.mkdtemp()
+
+    start = time.perf_counter()
+    for i in range(frames):
+        path = os.path.join(workdir, f"frame{fmt}")
+        with open(path, "wb") as f:
+            f.write(encoded[i % len(encoded)])
+        classify_frame(cv2.imread(path))
+        os.remove(path)
+    file_fps = frames / (time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for i in range(frames):
+        classify_frame(decode_frame(encoded[i % len(encoded)]))
+    memory_fps = frames / (time.perf_counter() - start)
+
+    print(f"{frames} frames {width}x{height} {fmt} (~{len(encoded[0]) // 1024} KiB each)")
+    print(f"temp file + imread: {file_fps:8.1f} fps")
+    print(f"imdecode in memory: {memory_fps:8.1f} fps")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--frames", type=int, default=300)
+    parser.add_argument("--width", type=int, default=1280)
+    parser.add_argument("--height", type=int, default=720)
+    parser.add_argument("--format", default=".jpg", choices=(".jpg", ".png"))
+    args = parser.parse_args()
+    main(args.frames, args.width, args.height, args.format)
@@ -1,16 +1,100 @@
 # db/connection.py
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 import os
 from dotenv import load_dotenv
 
 load_dotenv()
 
 DB_URL = os.getenv("DB_URL", "sqlite:///./restaurant.db")
-engine = create_engine(DB_URL, connect_args={"check_same_thread": False})
+if DB_URL.startswith("postgres://"):
+    # Heroku-style scheme; SQLAlchemy only accepts "postgresql"
+    DB_URL = DB_URL.replace("postgres://", "postgresql://", 1)
+
+# SQLite: WAL lets the order API read while the vision writer commits, and
+# busy_timeout makes writers wait for the lock instead of failing with
+# "database is locked".
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))),
+    "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-65536")),  # negative = KiB, i.e. 64 MiB
+    "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+}
+
+# Postgres: sized pool, connections checked before use and recycled before
+# server-side idle timeouts drop them.
+POSTGRES_POOL = {
+    "pool_size": int(os.getenv("DB_POOL_SIZE", "10")),
+    "max_overflow": int(os.getenv("DB_MAX_OVERFLOW", "20")),
+    "pool_timeout": int(os.getenv("DB_POOL_TIMEOUT", "30")),
+    "pool_recycle": int(os.getenv("DB_POOL_RECYCLE", "1800")),
+    "pool_pre_ping": True,
+}
+
+def backend_of(url: str) -> str:
+    """Backend name for a DB URL, ignoring the driver (e.g. 'postgresql+asyncpg' -> 'postgresql')."""
+    return make_url(url).get_backend_name()
+
+def engine_profile(url: str = DB_URL) -> dict:
+    """The settings create_db_engine applies for this URL; reported by the health endpoint."""
+    backend = backend_of(url)
+    if backend == "sqlite":
+        return {"backend": backend, "pragmas": SQLITE_PRAGMAS}
+    if backend == "postgresql":
+        return {"backend": backend, "pool": POSTGRES_POOL}
+    return {"backend": backend}
+
+def _apply_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    for name, value in SQLITE_PRAGMAS.items():
+        cursor.execute(f"PRAGMA {name}={value}")
+    cursor.close()
+
+def create_db_engine(url: str = DB_URL):
+    """Sync engine tuned for the backend named in the URL scheme."""
+    backend = backend_of(url)
+    if backend == "sqlite":
+        db_engine = create_engine(url, connect_args={"check_same_thread": False})
+        event.listen(db_engine, "connect", _apply_sqlite_pragmas)
+        return db_engine
+    if backend == "postgresql":
+        return create_engine(url, poolclass=QueuePool, **POSTGRES_POOL)
+    return create_engine(url)
+
+def to_async_url(url: str) -> str:
+    """Map a sync DB_URL onto its async driver (aiosqlite / asyncpg)."""
+    if url.startswith("sqlite:"):
+        return url.replace("sqlite:", "sqlite+aiosqlite:", 1)
+    if url.startswith("postgresql:"):
+        return url.replace("postgresql:", "postgresql+asyncpg:", 1)
+    if url.startswith("postgresql+psycopg2:"):
+        return url.replace("postgresql+psycopg2:", "postgresql+asyncpg:", 1)
+    return url
+
+def create_async_db_engine(url: str):
+    """Async counterpart of create_db_engine (the async pool class is picked by SQLAlchemy)."""
+    backend = backend_of(url)
+    if backend == "sqlite":
+        db_engine = create_async_engine(url)
+        event.listen(db_engine.sync_engine, "connect", _apply_sqlite_pragmas)
+        return db_engine
+    if backend == "postgresql":
+        return create_async_engine(url, **POSTGRES_POOL)
+    return create_async_engine(url)
+
+engine = create_db_engine(DB_URL)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DB_URL = os.getenv("ASYNC_DB_URL", to_async_url(DB_URL))
+async_engine = create_async_db_engine(ASYNC_DB_URL)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 def get_db():
     """
     Dependency to get a new DB session.
@@ -21,3 +105,11 @@ def get_db():
         yield db
     finally:
         db.close()
+
+async def get_async_db():
+    """
+    Dependency to get a new async DB session.
+    Use this from async endpoints and services so queries don't block the event loop.
+    """
+    async with AsyncSessionLocal() as db:
+        yield db
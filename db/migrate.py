@@ -0,0 +1,40 @@
+# db/migrate.py
+import os
+import sqlite3
+
+DB_FILE = "restaurant.db"
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "schema.sql")
+
+# Columns added to tables after their first release: (table, column, definition).
+# schema.sql creates missing tables; these bring existing ones up to date.
+COLUMN_MIGRATIONS = [
+    ("reservations", "party_size", "INTEGER NOT NULL DEFAULT 2"),
+    ("analytics_daily", "paid_orders", "INTEGER DEFAULT 0"),
+    ("analytics_daily", "finalized_at", "TIMESTAMP"),
+]
+
+def columns_of(conn: sqlite3.Connection, table: str) -> set:
+    """Column names of `table`; empty if the table does not exist."""
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+def migrate(db_file: str = DB_FILE) -> list:
+    """Create missing tables and add missing columns; safe to run on every setup. Returns the columns added."""
+    conn = sqlite3.connect(db_file)
+    added = []
+    try:
+        # Columns first: schema.sql may index them
+        for table, column, definition in COLUMN_MIGRATIONS:
+            existing = columns_of(conn, table)
+            if existing and column not in existing:
+                conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {definition}")
+                added.append(f"{table}.{column}")
+        with open(SCHEMA_PATH) as f:
+            conn.executescript(f.read())
+        conn.commit()
+    finally:
+        conn.close()
+    print(f"Database schema up to date ({', '.join(added) or 'no columns'} added).")
+    return added
+
+if __name__ == "__main__":
+    migrate()
@@ -26,11 +26,13 @@ CREATE TABLE IF NOT EXISTS reservations (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     customer_name TEXT NOT NULL,
     reservation_time TIMESTAMP NOT NULL,
+    party_size INTEGER NOT NULL DEFAULT 2,
     table_id INTEGER,
     FOREIGN KEY (table_id) REFERENCES tables (id)
 );
 
 CREATE INDEX IF NOT EXISTS idx_reservations_time ON reservations(reservation_time);
+-- Existing databases get party_size from db/migrate.py
 
 -- ORDERS
 CREATE TABLE IF NOT EXISTS orders (
@@ -44,6 +46,7 @@ CREATE TABLE IF NOT EXISTS orders (
 );
 
 CREATE INDEX IF NOT EXISTS idx_orders_status ON orders(status);
+CREATE INDEX IF NOT EXISTS idx_orders_created_at ON orders(created_at);
 
 -- ORDER ITEMS
 CREATE TABLE IF NOT EXISTS order_items (
@@ -55,6 +58,8 @@ CREATE TABLE IF NOT EXISTS order_items (
     FOREIGN KEY (menu_id) REFERENCES menu (id)
 );
 
+CREATE INDEX IF NOT EXISTS idx_order_items_order ON order_items(order_id);
+
 -- INVENTORY
 CREATE TABLE IF NOT EXISTS inventory (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -70,7 +75,7 @@ CREATE INDEX IF NOT EXISTS idx_inventory_ingredient ON inventory(ingredient);
 CREATE TABLE IF NOT EXISTS vision_events (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     table_id INTEGER,
-    event_type TEXT NOT NULL,       -- detected_empty, detected_occupied
+    event_type TEXT NOT NULL,       -- detected_empty, detected_occupied (transitions), heartbeat_detected_*
     timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
     FOREIGN KEY (table_id) REFERENCES tables (id)
 );
@@ -82,9 +87,31 @@ CREATE TABLE IF NOT EXISTS analytics_daily (
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     date DATE NOT NULL,
     total_orders INTEGER DEFAULT 0,
-    total_revenue REAL DEFAULT 0.0,
+    total_revenue REAL DEFAULT 0.0,  -- sum of ticket sizes
+    paid_orders INTEGER DEFAULT 0,
     popular_item_id INTEGER,
+    finalized_at TIMESTAMP,          -- set once a closed day is recomputed from orders
     FOREIGN KEY (popular_item_id) REFERENCES menu (id)
 );
 
 CREATE UNIQUE INDEX IF NOT EXISTS idx_analytics_date ON analytics_daily(date);
+-- Existing databases get paid_orders and finalized_at from db/migrate.py
+
+-- ANALYTICS DAILY ITEMS (per-item quantities for each analytics_daily row)
+CREATE TABLE IF NOT EXISTS analytics_daily_items (
+    date DATE NOT NULL,
+    menu_id INTEGER NOT NULL,
+    quantity INTEGER DEFAULT 0,
+    PRIMARY KEY (date, menu_id),
+    FOREIGN KEY (menu_id) REFERENCES menu (id)
+);
+
+-- ANALYTICS ORDER STATE (orders already counted in the rollup, so order events apply once)
+CREATE TABLE IF NOT EXISTS analytics_order_state (
+    order_id INTEGER PRIMARY KEY,
+    date DATE NOT NULL,
+    paid INTEGER NOT NULL DEFAULT 0,
+    FOREIGN KEY (order_id) REFERENCES orders (id)
+);
+
+CREATE INDEX IF NOT EXISTS idx_analytics_order_state_date ON analytics_order_state(date);
@@ -1,6 +1,11 @@
 # db/seed.py
 import sqlite3
 from datetime import datetime, timedelta
+try:
+    from db.migrate import migrate
+except ModuleNotFoundError:
+    # Run as a script: python db/seed.py
+    from migrate import migrate
 
 DB_FILE = "restaurant.db"
 
@@ -43,12 +48,12 @@ def seed():
     # Insert reservations
     now = datetime.now()
     reservations = [
-        ("Alice Johnson", now + timedelta(hours=1), 3),
-        ("Bob Smith", now + timedelta(hours=2), 2),
+        ("Alice Johnson", now + timedelta(hours=1), 4, 3),
+        ("Bob Smith", now + timedelta(hours=2), 2, 2),
     ]
     cur.executemany("""
-        INSERT INTO reservations (customer_name, reservation_time, table_id)
-        VALUES (?, ?, ?)
+        INSERT INTO reservations (customer_name, reservation_time, party_size, table_id)
+        VALUES (?, ?, ?, ?)
     """, reservations)
 
     # Insert orders
@@ -100,4 +105,5 @@ def seed():
     print("Database seeded with sample data.")
 
 if __name__ == "__main__":
+    migrate(DB_FILE)
     seed()
@@ -0,0 +1,41 @@
+from datetime import date
+from app.services.analytics_agent.cache import KpiCache
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_closed_entries_persist_and_today_expires():
+    """Closed periods never expire; entries covering today do after the TTL."""
+    cache = KpiCache(max_size=2, ttl=0)
+    cache.put(("2025-08-18", "daily"), {"total_orders": 3}, date(2025, 8, 18), date(2025, 8, 19), closed=True, generation=0)
+    cache.put(("2025-08-20", "daily"), {"total_orders": 1}, date(2025, 8, 20), date(2025, 8, 21), closed=False, generation=0)
+    assert cache.get(("2025-08-18", "daily")) == {"total_orders": 3}
+    assert cache.get(("2025-08-20", "daily")) is None
+    logger.info(f"Test KPI cache stats: {cache.stats()}")
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_invalidation_and_bounds():
+    """Order events drop entries covering their day; stale generations are not stored; LRU keeps max_size."""
+    cache = KpiCache(max_size=2, ttl=60)
+    cache.put(("2025-08-18", "weekly"), {"total_orders": 9}, date(2025, 8, 18), date(2025, 8, 25), closed=True, generation=0)
+    cache.put(("2025-08-25", "daily"), {"total_orders": 1}, date(2025, 8, 25), date(2025, 8, 26), closed=True, generation=0)
+    assert cache.invalidate_day(date(2025, 8, 20)) == 1
+    assert cache.get(("2025-08-18", "weekly")) is None
+    assert cache.get(("2025-08-25", "daily")) is not None
+
+    cache.put(("2025-08-18", "weekly"), {"total_orders": 9}, date(2025, 8, 18), date(2025, 8, 25), closed=True, generation=0)
+    assert cache.get(("2025-08-18", "weekly")) is None  # computed before the invalidation
+    cache.put(("2025-08-26", "daily"), {"total_orders": 2}, date(2025, 8, 26), date(2025, 8, 27), closed=True, generation=0)
+    assert cache.get(("2025-08-26", "daily")) == {"total_orders": 2}  # invalidated day is outside its range
+
+    generation = cache.generation
+    cache.clear()
+    cache.put(("2025-08-26", "daily"), {"total_orders": 2}, date(2025, 8, 26), date(2025, 8, 27), closed=True, generation=generation)
+    assert cache.get(("2025-08-26", "daily")) is None  # computed before clear()
+
+    for day in (1, 2, 3):
+        cache.put((f"2025-07-0{day}", "daily"), {}, date(2025, 7, day), date(2025, 7, day + 1), closed=True, generation=cache.generation)
+    assert cache.stats()["size"] == 2
+    assert cache.get(("2025-07-01", "daily")) is None
@@ -0,0 +1,94 @@
+import os
+import sqlite3
+from datetime import date, datetime, timedelta
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.sql import text
+from app.menu_catalog import menu_catalog
+from app.services.analytics_agent import rollup
+from app.services.analytics_agent.rollup import read_days, recompute
+from app.services.analytics_agent.service import compute_live
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")
+
+@pytest.mark.asyncio
+async def test_rollup_matches_live_query(tmp_path):
+    """Finalized rollup rows give the same totals as the live query over the same days."""
+    path = tmp_path / "analytics.db"
+    conn = sqlite3.connect(path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    conn.executemany("INSERT INTO menu (id, name, price) VALUES (?, ?, ?)", [(1, "Pizza", 8.5), (2, "Lemonade", 3.5)])
+    conn.executemany(
+        "INSERT INTO orders (id, status, created_at) VALUES (?, ?, ?)",
+        [(1, "paid", "2025-08-18 12:00:00"), (2, "pending", "2025-08-18 23:59:59.5"), (3, "paid", "2025-08-19 00:00:00"), (4, "paid", "2025-08-20 08:00:00")]
+    )
+    conn.executemany("INSERT INTO order_items (order_id, menu_id, quantity) VALUES (?, ?, ?)", [(1, 1, 2), (1, 2, 1), (2, 2, 3), (3, 1, 1)])
+    conn.commit()
+    conn.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    menu_catalog.invalidate()
+    async with async_sessionmaker(bind=engine)() as db:
+        await recompute(db, date(2025, 8, 17), date(2025, 8, 20))
+        rows = (await db.execute(text("SELECT date, total_orders, total_revenue, paid_orders, popular_item_id FROM analytics_daily ORDER BY date"))).fetchall()
+        logger.info(f"Test rollup rows: {rows}")
+        assert [tuple(row) for row in rows] == [
+            ("2025-08-17", 0, 0.0, 0, None),
+            ("2025-08-18", 2, 31.0, 1, 2),
+            ("2025-08-19", 1, 8.5, 1, 1),
+        ]
+
+        orders, revenue, paid, quantities = await read_days(db, date(2025, 8, 18), date(2025, 8, 20))
+        live_orders, live_paid, live_quantities = await compute_live(db, datetime(2025, 8, 18), datetime(2025, 8, 18) + timedelta(days=2))
+    await engine.dispose()
+    assert (orders, revenue, paid, quantities) == (3, 39.5, 2, {1: 3, 2: 4})
+    assert (live_orders, live_paid, live_quantities) == (orders, paid, quantities)
+
+@pytest.mark.asyncio
+async def test_recovered_events_do_not_recount_finalized_day(tmp_path, monkeypatch):
+    """Journaled order events recovered after a day was finalized leave its totals alone; a new order still counts once."""
+    path = tmp_path / "analytics.db"
+    conn = sqlite3.connect(path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    conn.executemany("INSERT INTO menu (id, name, price) VALUES (?, ?, ?)", [(1, "Pizza", 8.5), (2, "Lemonade", 3.5)])
+    conn.executemany("INSERT INTO orders (id, status, created_at) VALUES (?, ?, ?)", [(1, "paid", "2025-08-18 12:00:00"), (2, "pending", "2025-08-18 13:00:00")])
+    conn.executemany("INSERT INTO order_items (order_id, menu_id, quantity) VALUES (?, ?, ?)", [(1, 1, 2), (2, 2, 1)])
+    conn.commit()
+    conn.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    session = async_sessionmaker(bind=engine)
+    monkeypatch.setattr(rollup, "AsyncSessionLocal", session)
+    menu_catalog.invalidate()
+    async with session() as db:
+        await recompute(db, date(2025, 8, 18), date(2025, 8, 19))
+        before = await read_days(db, date(2025, 8, 18), date(2025, 8, 19))
+
+    # The journal still holds both events (offset not advanced before the crash)
+    await rollup.apply_order_created({"order_id": 1, "status": "paid", "created_at": "2025-08-18T12:00:00", "items": [{"menu_id": 1, "quantity": 2}]})
+    await rollup.apply_order_created({"order_id": 2, "status": "pending", "created_at": "2025-08-18T13:00:00", "items": [{"menu_id": 2, "quantity": 1}]})
+    await rollup.apply_order_updated({"order_id": 1, "status": "paid", "previous_status": "pending", "created_at": "2025-08-18T12:00:00"})
+    async with session() as db:
+        after_recovery = await read_days(db, date(2025, 8, 18), date(2025, 8, 19))
+
+    # A back-filled order and its payment are applied exactly once
+    backfill = {"order_id": 3, "status": "pending", "created_at": "2025-08-18T14:00:00", "items": [{"menu_id": 2, "quantity": 2}]}
+    await rollup.apply_order_created(backfill)
+    await rollup.apply_order_created(backfill)
+    paid = {"order_id": 3, "status": "paid", "previous_status": "pending", "created_at": "2025-08-18T14:00:00"}
+    await rollup.apply_order_updated(paid)
+    await rollup.apply_order_updated(paid)
+    async with session() as db:
+        after_backfill = await read_days(db, date(2025, 8, 18), date(2025, 8, 19))
+    await engine.dispose()
+    logger.info(f"Test rollup totals: {before} -> {after_recovery} -> {after_backfill}")
+    assert before == (2, 20.5, 1, {1: 2, 2: 1})
+    assert after_recovery == before
+    assert after_backfill == (3, 27.5, 2, {1: 2, 2: 3})
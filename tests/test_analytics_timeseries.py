@@ -0,0 +1,44 @@
+import os
+import sqlite3
+from datetime import datetime
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from app.menu_catalog import menu_catalog
+from app.services.analytics_agent.timeseries import compute_timeseries
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")
+
+@pytest.mark.asyncio
+async def test_timeseries_buckets(tmp_path):
+    """Orders, covers (party size or 1), revenue and item quantities land in the right 15-minute buckets."""
+    path = tmp_path / "analytics.db"
+    conn = sqlite3.connect(path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    conn.executemany("INSERT INTO menu (id, name, price) VALUES (?, ?, ?)", [(1, "Pizza", 8.5), (2, "Lemonade", 3.5)])
+    conn.execute("INSERT INTO reservations (id, customer_name, reservation_time, party_size) VALUES (1, 'Ana', '2025-08-20 19:00:00', 4)")
+    conn.executemany(
+        "INSERT INTO orders (id, reservation_id, created_at) VALUES (?, ?, ?)",
+        [(1, 1, "2025-08-20 19:05:00"), (2, None, "2025-08-20 19:14:59.9"), (3, None, "2025-08-20 19:40:00"), (4, None, "2025-08-20 20:00:00")]
+    )
+    conn.executemany("INSERT INTO order_items (order_id, menu_id, quantity) VALUES (?, ?, ?)", [(1, 1, 2), (1, 2, 1), (3, 2, 2), (4, 1, 1)])
+    conn.commit()
+    conn.close()
+
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    menu_catalog.invalidate()
+    async with async_sessionmaker(bind=engine)() as db:
+        result = await compute_timeseries(db, datetime(2025, 8, 20, 19), datetime(2025, 8, 20, 20), 15)
+    await engine.dispose()
+    logger.info(f"Test timeseries: {result}")
+
+    assert result["buckets"] == ["2025-08-20T19:00:00", "2025-08-20T19:15:00", "2025-08-20T19:30:00", "2025-08-20T19:45:00"]
+    assert result["orders"] == [2, 0, 1, 0]
+    assert result["covers"] == [5, 0, 1, 0]
+    assert result["revenue"] == [20.5, 0.0, 7.0, 0.0]
+    assert [(s["menu_id"], s["quantity"]) for s in result["items"]] == [(1, [2, 0, 0, 0]), (2, [1, 0, 2, 0])]
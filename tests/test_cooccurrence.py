@@ -0,0 +1,90 @@
+import pytest
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.sql import text
+from app.services.reco_agent.cooccurrence import CooccurrenceStore
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.mark.asyncio
+async def test_build_update_and_snapshot(tmp_path):
+    """Counts match the order history, grow with new orders and survive a snapshot round-trip."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reco.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY)"))
+        await conn.execute(text("CREATE TABLE order_items (order_id INTEGER, menu_id INTEGER, quantity INTEGER)"))
+        await conn.execute(text("INSERT INTO orders (id) VALUES (1), (2), (3)"))
+        await conn.execute(text("INSERT INTO order_items VALUES (1, 1, 1), (1, 6, 2), (2, 1, 1), (2, 6, 1), (2, 8, 1), (3, 2, 1)"))
+    store = CooccurrenceStore(path=str(tmp_path / "cooccurrence.npz"), snapshot_every=1)
+    async with async_sessionmaker(bind=engine)() as db:
+        await store.ensure_ready(db)
+    await engine.dispose()
+
+    candidate_ids, scores = store.candidates([1])
+    logger.info(f"Test cooccurrence candidates: {list(zip(candidate_ids, scores))}")
+    assert dict(zip(candidate_ids.tolist(), scores.tolist())) == {6: 2, 8: 1}
+
+    assert not store.add_order(2, [1, 2])  # already counted by the build
+    assert store.add_order(4, [1, 2, 9])  # new menu id grows the matrix; snapshot due
+    assert dict(zip(*[a.tolist() for a in store.candidates([1, 6])])) == {2: 1, 8: 2, 9: 1}
+    await store.snapshot()
+
+    restored = CooccurrenceStore(path=store.path)
+    assert restored.load()
+    assert restored.last_order_id == 4
+    assert (restored.matrix == store.matrix).all()
+
+@pytest.mark.asyncio
+async def test_out_of_order_orders_survive_restart(tmp_path):
+    """A lower-id order still queued when a snapshot is taken is counted after a restart, and no order is counted twice."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reco.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY)"))
+        await conn.execute(text("CREATE TABLE order_items (order_id INTEGER, menu_id INTEGER, quantity INTEGER)"))
+        await conn.execute(text("INSERT INTO orders (id) VALUES (1)"))
+        await conn.execute(text("INSERT INTO order_items VALUES (1, 1, 1), (1, 6, 1)"))
+    store = CooccurrenceStore(path=str(tmp_path / "cooccurrence.npz"), snapshot_every=100)
+    async with async_sessionmaker(bind=engine)() as db:
+        await store.ensure_ready(db)
+
+    # Orders 2 and 3 are committed; order 3's event is handled first
+    async with engine.begin() as conn:
+        await conn.execute(text("INSERT INTO orders (id) VALUES (2), (3)"))
+        await conn.execute(text("INSERT INTO order_items VALUES (2, 1, 1), (2, 8, 1), (3, 1, 1), (3, 6, 1)"))
+    store.add_order(3, [1, 6])
+    assert not store.add_order(3, [1, 6])  # replayed duplicate
+    assert (store.last_order_id, store.applied_ids) == (1, {3})
+    await store.snapshot()
+
+    restored = CooccurrenceStore(path=store.path)
+    async with async_sessionmaker(bind=engine)() as db:
+        await restored.ensure_ready(db)
+    await engine.dispose()
+    counts = dict(zip(*[a.tolist() for a in restored.candidates([1])]))
+    logger.info(f"Test cooccurrence after restart: {counts}")
+    assert counts == {6: 2, 8: 1}
+    assert (restored.last_order_id, restored.applied_ids) == (3, set())
+    assert not restored.add_order(2, [1, 8])
+
+@pytest.mark.asyncio
+async def test_itemless_orders_advance_the_low_water_mark(tmp_path):
+    """Orders without items (seated-table orders) are recorded, so they do not hold the mark below later orders."""
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'reco.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY)"))
+        await conn.execute(text("CREATE TABLE order_items (order_id INTEGER, menu_id INTEGER, quantity INTEGER)"))
+        await conn.execute(text("INSERT INTO orders (id) VALUES (1)"))
+        await conn.execute(text("INSERT INTO order_items VALUES (1, 1, 1), (1, 6, 1)"))
+    store = CooccurrenceStore(path=str(tmp_path / "cooccurrence.npz"), snapshot_every=1)
+    async with async_sessionmaker(bind=engine)() as db:
+        await store.ensure_ready(db)
+    await engine.dispose()
+
+    assert store.add_order(3, [1, 8])
+    assert not store.add_order(2, [])  # nothing to count, no snapshot due
+    assert not store.add_order(2, [])
+    logger.info(f"Test cooccurrence mark: {store.last_order_id}, {store.applied_ids}")
+    assert (store.last_order_id, store.applied_ids) == (3, set())
+    assert dict(zip(*[a.tolist() for a in store.candidates([1])])) == {6: 1, 8: 1}
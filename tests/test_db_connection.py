@@ -0,0 +1,126 @@
+import json
+import os
+import sqlite3
+import subprocess
+import sys
+import pytest
+from sqlalchemy.sql import text
+import db.connection as connection
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROOT = os.path.join(os.path.dirname(__file__), "..")
+
+@pytest.mark.asyncio
+async def test_sqlite_engines_apply_pragmas(tmp_path):
+    """Every new SQLite connection, sync or async, runs with WAL, NORMAL sync, the busy timeout and cache size."""
+    path = tmp_path / "pragmas.db"
+    expected = {"journal_mode": "wal", "synchronous": 1, "busy_timeout": connection.SQLITE_PRAGMAS["busy_timeout"],
+                "cache_size": connection.SQLITE_PRAGMAS["cache_size"]}
+
+    sync_engine = connection.create_db_engine(f"sqlite:///{path}")
+    with sync_engine.connect() as conn:
+        sync_pragmas = {name: conn.execute(text(f"PRAGMA {name}")).scalar() for name in expected}
+    sync_engine.dispose()
+
+    async_engine = connection.create_async_db_engine(f"sqlite+aiosqlite:///{path}")
+    async with async_engine.connect() as conn:
+        async_pragmas = {name: (await conn.execute(text(f"PRAGMA {name}"))).scalar() for name in expected}
+    await async_engine.dispose()
+    logger.info(f"Test SQLite pragmas: {async_pragmas}")
+    assert sync_pragmas == async_pragmas == expected
+
+def test_postgres_engines_get_pool_args(monkeypatch):
+    """Postgres engines are created with the POSTGRES_POOL settings (QueuePool for the sync engine)."""
+    calls = {}
+    monkeypatch.setattr(connection, "create_engine", lambda url, **kwargs: calls.setdefault("sync", (url, kwargs)))
+    monkeypatch.setattr(connection, "create_async_engine", lambda url, **kwargs: calls.setdefault("async", (url, kwargs)))
+
+    connection.create_db_engine("postgresql://app@db/restaurant")
+    connection.create_async_db_engine(connection.to_async_url("postgresql://app@db/restaurant"))
+    logger.info(f"Test Postgres engine args: {calls}")
+    sync_url, sync_kwargs = calls["sync"]
+    async_url, async_kwargs = calls["async"]
+    assert sync_kwargs.pop("poolclass") is connection.QueuePool
+    assert sync_kwargs == async_kwargs == connection.POSTGRES_POOL
+    assert async_url == "postgresql+asyncpg://app@db/restaurant"
+    assert connection.POSTGRES_POOL["pool_pre_ping"] is True
+
+@pytest.mark.parametrize("url, backend", [
+    ("sqlite:///./restaurant.db", "sqlite"),
+    ("sqlite+aiosqlite:///./restaurant.db", "sqlite"),
+    ("postgresql://app@db/restaurant", "postgresql"),
+    ("postgresql+asyncpg://app@db/restaurant", "postgresql"),
+    ("postgresql+psycopg2://app@db/restaurant", "postgresql"),
+    ("mysql://app@db/restaurant", "mysql"),
+])
+def test_engine_profile_per_backend(url, backend):
+    """SQLite gets pragmas and no pool sizing, Postgres (any driver) the sized pool, other backends neither."""
+    profile = connection.engine_profile(url)
+    assert profile["backend"] == backend
+    assert ("pragmas" in profile) == (backend == "sqlite")
+    assert ("pool" in profile) == (backend == "postgresql")
+    if backend == "postgresql":
+        assert profile["pool"] is connection.POSTGRES_POOL
+
+def test_pool_sizing_from_environment():
+    """DB_POOL_* variables size the Postgres pool; they do not change the SQLite profile."""
+    env = {**os.environ, "DB_POOL_SIZE": "4", "DB_MAX_OVERFLOW": "2", "DB_POOL_TIMEOUT": "5", "DB_POOL_RECYCLE": "60", "DB_URL": "sqlite:///:memory:"}
+    script = (
+        "import json; from db.connection import engine_profile; "
+        "print(json.dumps([engine_profile('postgresql+asyncpg://app@db/restaurant'), engine_profile('sqlite:///x.db')]))"
+    )
+    # Pool settings are read at import, so check them in a fresh interpreter
+    output = subprocess.run([sys.executable, "-c", script], env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    postgres, sqlite = json.loads(output.strip().splitlines()[-1])
+    logger.info(f"Test pool sizing from env: {postgres}")
+    assert postgres["pool"] == {"pool_size": 4, "max_overflow": 2, "pool_timeout": 5, "pool_recycle": 60, "pool_pre_ping": True}
+    assert "pool" not in sqlite
+
+@pytest.mark.parametrize("url, async_url", [
+    ("sqlite:///./restaurant.db", "sqlite+aiosqlite:///./restaurant.db"),
+    ("sqlite:///:memory:", "sqlite+aiosqlite:///:memory:"),
+    ("postgresql://app@db/restaurant", "postgresql+asyncpg://app@db/restaurant"),
+    ("postgresql+psycopg2://app@db/restaurant", "postgresql+asyncpg://app@db/restaurant"),
+    ("sqlite+aiosqlite:///./restaurant.db", "sqlite+aiosqlite:///./restaurant.db"),
+    ("postgresql+asyncpg://app@db/restaurant", "postgresql+asyncpg://app@db/restaurant"),
+])
+def test_to_async_url(url, async_url):
+    """Sync URLs map onto aiosqlite/asyncpg; URLs that already name an async driver are kept."""
+    assert connection.to_async_url(url) == async_url
+
+def test_get_async_db_yields_working_session(tmp_path):
+    """With DB_URL on a SQLite file, get_async_db yields an AsyncSession the services can query and commit with."""
+    path = tmp_path / "async.db"
+    conn = sqlite3.connect(path)
+    with open(os.path.join(ROOT, "db", "schema.sql")) as f:
+        conn.executescript(f.read())
+    conn.execute("INSERT INTO tables (id, table_number, capacity, status) VALUES (1, 1, 4, 'available')")
+    conn.commit()
+    conn.close()
+    script = (
+        "import asyncio, json\n"
+        "from sqlalchemy.ext.asyncio import AsyncSession\n"
+        "from sqlalchemy.sql import text\n"
+        "from db.connection import ASYNC_DB_URL, get_async_db\n"
+        "from app.services.order_agent.service import find_missing_ids\n"
+        "async def main():\n"
+        "    async for db in get_async_db():\n"
+        "        missing = await find_missing_ids(db, 'tables', {1, 2})\n"
+        "        await db.execute(text(\"UPDATE tables SET status = 'occupied' WHERE id = 1\"))\n"
+        "        await db.commit()\n"
+        "        return {'url': ASYNC_DB_URL, 'session': isinstance(db, AsyncSession), 'missing': sorted(missing)}\n"
+        "print(json.dumps(asyncio.run(main())))\n"
+    )
+    env = {**os.environ, "DB_URL": f"sqlite:///{path}"}
+    # The engine and session factory are built from DB_URL at import, so use a fresh interpreter
+    output = subprocess.run([sys.executable, "-c", script], env=env, cwd=ROOT, capture_output=True, text=True, check=True).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    logger.info(f"Test get_async_db: {result}")
+    assert result == {"url": f"sqlite+aiosqlite:///{path}", "session": True, "missing": [2]}
+    conn = sqlite3.connect(path)
+    assert conn.execute("SELECT status FROM tables WHERE id = 1").fetchone() == ("occupied",)
+    conn.close()
@@ -0,0 +1,98 @@
+import pytest
+from app.event_journal import EventJournal
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _event(seq_hint, ts):
+    return {"type": "table_status_update", "payload": {"table_id": seq_hint, "status": "detected_empty"}, "timestamp": ts}
+
+@pytest.mark.asyncio
+async def test_journal_resumes_unprocessed_events(tmp_path):
+    """Only events past the committed consumer offset are recovered after a restart."""
+    path = str(tmp_path / "journal.db")
+    journal = EventJournal(path=path)
+    journal.open()
+    events = [_event(i, f"2025-08-20T18:00:0{i}") for i in range(4)]
+    for event in events:
+        journal.append(event)
+    journal.ack(events[0])
+    journal.ack(events[2])  # out of order; offset must stay behind events[1]
+    await journal.stop()
+
+    journal = EventJournal(path=path)
+    journal.open()
+    pending = journal.recover()
+    logger.info(f"Test journal recover: {pending}")
+    assert [e["seq"] for e in pending] == [2, 3, 4]
+    assert pending[0]["payload"]["table_id"] == 1
+
+    window = journal.read_range("2025-08-20T18:00:01", "2025-08-20T18:00:03")
+    assert [e["seq"] for e in window] == [2, 3]
+
+    assert journal.append(_event(9, "2025-08-20T18:00:09")) == 5
+    await journal.stop()
+
+@pytest.mark.asyncio
+async def test_journal_is_noop_until_opened(tmp_path):
+    """Publishing before the orchestrator starts must not buffer without bound."""
+    journal = EventJournal(path=str(tmp_path / "journal.db"))
+    assert journal.append(_event(1, "2025-08-20T18:00:00")) is None
+    assert journal.stats()["buffered"] == 0
+
+@pytest.mark.asyncio
+async def test_journal_keeps_rows_when_a_write_fails(tmp_path):
+    """A failed group commit puts its rows back in order and the next flush writes them."""
+    path = str(tmp_path / "journal.db")
+    journal = EventJournal(path=path)
+    journal.open()
+    journal.append(_event(1, "2025-08-20T18:00:01"))
+    journal.append(_event(2, "2025-08-20T18:00:02"))
+
+    write = journal._write
+    def failing_write(rows, offset):
+        raise OSError("disk full")
+    journal._write = failing_write
+    with pytest.raises(OSError):
+        await journal.flush()
+    journal.append(_event(3, "2025-08-20T18:00:03"))
+    assert [row[0] for row in journal._buffer] == [1, 2, 3]
+    assert journal.stats()["failed_flushes"] == 1
+
+    journal._write = write
+    await journal.stop()
+    journal = EventJournal(path=path)
+    journal.open()
+    pending = journal.recover()
+    logger.info(f"Test journal after failed write: {pending}")
+    assert [e["seq"] for e in pending] == [1, 2, 3]
+    await journal.stop()
+
+@pytest.mark.asyncio
+async def test_replay_window_with_timezone_aware_bounds(tmp_path, monkeypatch):
+    """Aware since/until are converted to naive UTC before comparing with journal timestamps."""
+    from datetime import datetime, timedelta, timezone
+    import app.orchestrator as orchestrator
+
+    journal = EventJournal(path=str(tmp_path / "journal.db"))
+    journal.open()
+    for i in range(4):
+        journal.append(_event(i, f"2025-08-20T1{6 + i}:00:00"))
+    await journal.flush()
+    replayed = []
+
+    class Bus:
+        async def publish(self, event):
+            replayed.append(event)
+
+    monkeypatch.setattr(orchestrator, "event_journal", journal)
+    monkeypatch.setattr(orchestrator, "event_bus", Bus())
+    cest = timezone(timedelta(hours=2))
+    count = await orchestrator.replay_events(datetime(2025, 8, 20, 19, 0, tzinfo=cest), datetime(2025, 8, 20, 21, 0, tzinfo=cest))
+    logger.info(f"Test replay window: {replayed}")
+    assert count == 2
+    assert [e["timestamp"] for e in replayed] == ["2025-08-20T17:00:00", "2025-08-20T18:00:00"]
+    assert all(e["replayed"] for e in replayed)
+    await journal.stop()
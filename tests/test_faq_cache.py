@@ -0,0 +1,92 @@
+import asyncio
+import pytest
+from app.services.faq_agent.cache import FaqCache
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_queries_share_one_call():
+    """Ten concurrent misses for one query make a single LLM call; later lookups are hits."""
+    cache = FaqCache(max_size=10, ttl=60)
+    calls = []
+
+    async def llm():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return "We open at 9 AM."
+
+    answers = await asyncio.gather(*(cache.get_or_compute("hours?", llm) for _ in range(10)))
+    assert answers == ["We open at 9 AM."] * 10
+    assert len(calls) == 1
+    assert await cache.get_or_compute("hours?", llm) == "We open at 9 AM."
+
+    stats = cache.stats()
+    logger.info(f"Test FAQ cache stats: {stats}")
+    assert (stats["misses"], stats["coalesced"], stats["hits"]) == (1, 9, 1)
+    assert stats["hit_rate"] == round(10 / 11, 4)
+    assert stats["llm_latency"]["p50_ms"] >= 50
+
+@pytest.mark.asyncio
+async def test_ttl_size_errors_and_invalidation():
+    """Entries expire, the LRU bound holds, failures are not cached and clear() discards in-flight results."""
+    cache = FaqCache(max_size=2, ttl=0.05)
+
+    async def answer(text):
+        return text
+
+    await cache.get_or_compute("a", lambda: answer("A"))
+    await asyncio.sleep(0.06)
+    assert cache.get("a") is None
+
+    cache.ttl = 60
+    for key in ("a", "b", "c"):
+        await cache.get_or_compute(key, lambda key=key: answer(key.upper()))
+    assert cache.get("a") is None and cache.get("c") == "C"
+
+    async def failing():
+        raise RuntimeError("LLM down")
+    with pytest.raises(RuntimeError):
+        await cache.get_or_compute("d", failing)
+    assert cache.get("d") is None and cache.stats()["errors"] == 1
+
+    async def slow():
+        await asyncio.sleep(0.02)
+        return "old menu"
+    task = asyncio.create_task(cache.get_or_compute("e", slow))
+    await asyncio.sleep(0)
+    cache.clear("menu updated")
+    assert await task == "old menu"
+    assert cache.get("e") is None and cache.get("c") is None
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_and_clear_in_flight():
+    """Cancelling the first caller does not cancel coalesced ones; after clear() a new caller does not join the stale call."""
+    cache = FaqCache(max_size=10, ttl=60)
+    calls = []
+
+    async def llm():
+        calls.append(1)
+        call = len(calls)
+        await asyncio.sleep(0.02)
+        return f"answer {call}"
+
+    first = asyncio.create_task(cache.get_or_compute("hours?", llm))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(cache.get_or_compute("hours?", llm))
+    await asyncio.sleep(0)
+    first.cancel()
+    assert await second == "answer 1"
+    assert first.cancelled()
+    assert cache.get("hours?") == "answer 1"
+
+    stale = asyncio.create_task(cache.get_or_compute("menu?", llm))
+    await asyncio.sleep(0)
+    cache.clear("menu updated")
+    fresh = await cache.get_or_compute("menu?", llm)
+    logger.info(f"Test FAQ cache after clear: stale={await stale} fresh={fresh}")
+    assert (await stale, fresh) == ("answer 2", "answer 3")
+    assert cache.get("menu?") == "answer 3"
+    assert cache.stats()["in_flight"] == 0
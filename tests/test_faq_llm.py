@@ -0,0 +1,57 @@
+import asyncio
+import pytest
+from app.services.faq_agent import llm as faq_llm
+from app.services.faq_agent import service
+from app.services.faq_agent.cache import FaqCache
+from app.services.faq_agent.similarity import SimilarityIndex
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.fixture
+def stub_llm(monkeypatch):
+    """Fresh stub provider, cache and similarity index for the FAQ service."""
+    faq_llm.reset_llm()
+    monkeypatch.setattr(faq_llm, "FAQ_LLM_PROVIDER", "stub")
+    monkeypatch.setattr(faq_llm, "FAQ_STUB_LATENCY_MS", 30)
+    monkeypatch.setattr(service, "faq_cache", FaqCache(max_size=10, ttl=60))
+    monkeypatch.setattr(service, "faq_index", SimilarityIndex())
+    yield
+    faq_llm.reset_llm()
+
+def test_provider_is_created_lazily_and_validated():
+    """No provider exists until requested, and unknown providers are rejected."""
+    faq_llm.reset_llm()
+    assert faq_llm._llm is None
+    with pytest.raises(ValueError):
+        faq_llm.get_llm([], provider="openai")
+    stub = faq_llm.get_llm([], provider="stub")
+    assert isinstance(stub, faq_llm.StubLLM) and faq_llm.get_llm([]) is stub
+    faq_llm.reset_llm()
+
+@pytest.mark.asyncio
+async def test_full_faq_path_offline(stub_llm):
+    """cached_query runs end to end on the stub backend: simulated latency, then cached and coalesced."""
+    answers = await asyncio.gather(*(service.cached_query("When do you open?") for _ in range(5)))
+    llm = faq_llm.get_llm([])
+    logger.info(f"Test stub answers: {answers[0]}")
+    assert answers == ["[stub] Answer to: When do you open?"] * 5
+    assert llm.calls == 1
+    assert await service.cached_query("when do you OPEN") == answers[0]
+    assert llm.calls == 1
+    assert service.faq_cache.stats()["llm_latency"]["p50_ms"] >= 30
+
+@pytest.mark.asyncio
+async def test_paraphrased_list_question_hits_the_cache(stub_llm):
+    """'What vegan dishes do you have?' and 'do you have vegan food' share one answer; how/why questions do not."""
+    first = await service.cached_query("What vegan dishes do you have?")
+    assert await service.cached_query("do you have vegan food") == first
+    llm = faq_llm.get_llm([])
+    assert llm.calls == 1
+
+    await service.cached_query("How do I cancel my reservation?")
+    await service.cached_query("Why did you cancel my reservation?")
+    logger.info(f"Test FAQ cache after paraphrases: {service.faq_cache.stats()}")
+    assert llm.calls == 3
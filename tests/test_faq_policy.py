@@ -0,0 +1,36 @@
+import os
+from app.services.faq_agent.cache import faq_cache
+from app.services.faq_agent.policy import PolicyStore
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_policy_is_resident_until_the_file_changes(tmp_path):
+    """The text is read once; an edit (or reload) swaps it in, bumps the version and clears FAQ answers."""
+    path = tmp_path / "policy.txt"
+    path.write_text("Open 9 AM to 10 PM.")
+    store = PolicyStore(str(path), check_seconds=3600)
+    policy = store.get()
+    assert policy == "Open 9 AM to 10 PM." and store.version == 1
+    assert store.get() is policy
+
+    faq_cache.put("hour", "9 to 10", faq_cache.generation)
+    path.write_text("Open 8 AM to 11 PM.")
+    os.utime(path, ns=(0, 10 ** 18))
+    assert store.get() is policy  # not re-checked within the interval
+
+    store.check_seconds = 0
+    assert store.get() == "Open 8 AM to 11 PM." and store.version == 2
+    assert faq_cache.get("hour") is None
+
+    assert store.reload() == 3
+    logger.info(f"Test policy status: {store.status()}")
+    assert store.status()["mtime_ns"] == 10 ** 18
+
+def test_missing_policy_file_gives_empty_policy(tmp_path):
+    """No policy file means an empty policy rather than a failed FAQ query."""
+    store = PolicyStore(str(tmp_path / "missing.txt"), check_seconds=0)
+    assert store.get() == "" and store.get() == ""
+    assert store.version == 1
@@ -0,0 +1,47 @@
+from app.services.faq_agent.similarity import SimilarityIndex, normalize
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_normalize_collapses_paraphrases():
+    """Case, punctuation, stopwords, plurals and synonyms are normalized away; meaningful words stay."""
+    assert normalize("What vegan dishes do you have?") == normalize("Do you have vegan food") == "vegan dish"
+    assert normalize("Which dishes are vegan?") == "dish vegan"
+    assert normalize("What?") == "what"
+    assert normalize("Any gluten-free options?") == "gluten free dish"
+    assert normalize("Can I split the bill?") == "can split bill"
+    assert normalize("Is there no parking?") == "no parking"
+
+def test_question_words_and_modals_are_kept():
+    """Questions that differ only in their question word or modal get different keys and do not match."""
+    pairs = [
+        ("How do I cancel my reservation?", "Why did you cancel my reservation?"),
+        ("Is the kitchen open?", "When is the kitchen open?"),
+        ("Can I bring my dog?", "Must I bring my dog?"),
+    ]
+    index = SimilarityIndex(threshold=0.9)
+    for first, second in pairs:
+        assert normalize(first) != normalize(second)
+        index.add(normalize(first))
+    for first, second in pairs:
+        logger.info(f"Test similarity: '{normalize(second)}' vs '{normalize(first)}'")
+        assert index.match(normalize(second)) is None
+
+def test_similarity_index_threshold():
+    """Reordered or restated questions match; a different name or an extra constraint does not."""
+    index = SimilarityIndex(threshold=0.9, max_size=3)
+    for key in ("vegan dish", "check reservation alice", "gluten free dish"):
+        index.add(key)
+    assert index.match("vegan dish 2") is None
+
+    assert index.match("dish vegan") == "vegan dish"
+    assert index.match("check reservation bob") is None
+    assert index.match("vegan gluten free dish") is None
+
+    index.add("split bill")
+    assert index.match("vegan dish") is None  # oldest entry evicted
+    stats = index.stats()
+    logger.info(f"Test similarity stats: {stats}")
+    assert stats["size"] == 3 and stats["matches"] == 1 and stats["lookups"] == 5
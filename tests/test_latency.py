@@ -0,0 +1,14 @@
+from app.latency import latency_summary
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_latency_summary_scales_and_ranks():
+    """Samples in seconds are reported in ms with nearest-rank percentiles; an empty window has no figures."""
+    summary = latency_summary([i / 1000 for i in range(1, 101)], scale=1000, percentiles=(50, 95))
+    logger.info(f"Test latency summary: {summary}")
+    assert summary == {"count": 100, "avg_ms": 50.5, "p50_ms": 51.0, "p95_ms": 96.0, "max_ms": 100.0}
+    assert latency_summary([2.5, 0.5, 1.0]) == {"count": 3, "avg_ms": 1.333, "p50_ms": 1.0, "p99_ms": 2.5, "max_ms": 2.5}
+    assert latency_summary([]) == {"count": 0, "avg_ms": None, "p50_ms": None, "p99_ms": None, "max_ms": None}
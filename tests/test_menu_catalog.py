@@ -0,0 +1,30 @@
+from app.menu_catalog import MenuCatalog, MenuSnapshot
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+ROWS = [
+    (1, "Margherita Pizza", "Classic cheese and tomato pizza", 8.5, "main", 0, 1),
+    (2, "Vegan Burger", "Plant-based patty", 10.0, "main", 1, 1),
+    (6, "Lemonade", "Freshly squeezed lemon juice", 3.5, "drink", 1, 1),
+]
+
+def test_snapshot_indexes_and_search():
+    """Price/name maps and the search semantics the FAQ tool relied on."""
+    snapshot = MenuSnapshot(1, ROWS)
+    assert snapshot.prices[2] == 10.0
+    assert snapshot.by_category["main"] == {1, 2}
+    assert snapshot.vegan == {2, 6}
+    assert [r["name"] for r in snapshot.search("Vegan dishes?")] == ["Vegan Burger", "Lemonade"]
+    assert [r["name"] for r in snapshot.search("DRINK")] == ["Lemonade"]
+    assert [r["name"] for r in snapshot.search("pizza")] == ["Margherita Pizza"]
+
+def test_invalidate_is_idempotent_per_version():
+    """Replaying a menu_updated event never moves the version backwards."""
+    catalog = MenuCatalog()
+    assert catalog.invalidate() == 2
+    assert catalog.invalidate(2) == 2
+    assert catalog.invalidate(1) == 2
+    assert catalog.invalidate(5) == 5
@@ -0,0 +1,38 @@
+import sqlite3
+from db.migrate import columns_of, migrate
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_migrate_upgrades_old_database_idempotently(tmp_path):
+    """Missing columns are added once, missing tables created, and existing rows kept."""
+    path = str(tmp_path / "old.db")
+    conn = sqlite3.connect(path)
+    conn.executescript("""
+        CREATE TABLE reservations (id INTEGER PRIMARY KEY AUTOINCREMENT, customer_name TEXT NOT NULL, reservation_time TIMESTAMP NOT NULL, table_id INTEGER);
+        CREATE TABLE analytics_daily (id INTEGER PRIMARY KEY AUTOINCREMENT, date DATE NOT NULL, total_orders INTEGER DEFAULT 0, total_revenue REAL DEFAULT 0.0, popular_item_id INTEGER);
+        INSERT INTO reservations (customer_name, reservation_time) VALUES ('Alice', '2025-08-20 19:00:00');
+    """)
+    conn.commit()
+    conn.close()
+
+    added = migrate(path)
+    logger.info(f"Test migrate added: {added}")
+    assert added == ["reservations.party_size", "analytics_daily.paid_orders", "analytics_daily.finalized_at"]
+    assert migrate(path) == []
+
+    conn = sqlite3.connect(path)
+    assert {"party_size", "table_id"} <= columns_of(conn, "reservations")
+    assert conn.execute("SELECT customer_name, party_size FROM reservations").fetchall() == [("Alice", 2)]
+    assert columns_of(conn, "analytics_order_state") == {"order_id", "date", "paid"}
+    conn.close()
+
+def test_migrate_creates_fresh_database(tmp_path):
+    """On an empty file the schema is created and no ALTER is needed."""
+    path = str(tmp_path / "fresh.db")
+    assert migrate(path) == []
+    conn = sqlite3.connect(path)
+    assert "party_size" in columns_of(conn, "reservations")
+    conn.close()
@@ -0,0 +1,116 @@
+import os
+import sqlite3
+import pytest
+import pytest_asyncio
+from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.sql import text
+from app.main import app
+from app.menu_catalog import menu_catalog
+from app.services.order_agent import service
+from db.connection import get_async_db
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "..", "db", "schema.sql")
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path, monkeypatch):
+    path = tmp_path / "orders.db"
+    conn = sqlite3.connect(path)
+    with open(SCHEMA_PATH) as f:
+        conn.executescript(f.read())
+    conn.executemany("INSERT INTO menu (id, name, price) VALUES (?, ?, ?)", [(1, "Pizza", 8.5), (6, "Lemonade", 3.5)])
+    conn.executemany("INSERT INTO tables (id, table_number, capacity, status) VALUES (?, ?, ?, ?)", [(1, 1, 4, "available"), (2, 2, 2, "occupied")])
+    conn.commit()
+    conn.close()
+    engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    menu_catalog.invalidate()
+    events = []
+    async def publish_event(event_type, payload):
+        events.append((event_type, payload))
+    monkeypatch.setattr(service, "publish_event", publish_event)
+    sessions = async_sessionmaker(bind=engine, expire_on_commit=False)
+    sessions.events = events
+    yield sessions
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_find_missing_ids(session_factory):
+    """Only ids without a row come back; menu ids known to the catalog skip the DB lookup."""
+    async with session_factory() as db:
+        assert await service.find_missing_ids(db, "tables", set()) == set()
+        assert await service.find_missing_ids(db, "tables", {1, 2, 3, 99}) == {3, 99}
+        assert await service.find_missing_menu_ids(db, {1, 6, 7}) == {7}
+        # Added after the catalog was loaded: found by the DB fallback
+        await db.execute(text("INSERT INTO menu (id, name, price) VALUES (7, 'Tiramisu', 6.0)"))
+        await db.commit()
+        assert await service.find_missing_menu_ids(db, {1, 6, 7}) == set()
+
+@pytest.mark.asyncio
+async def test_bulk_mixed_payload_across_batches(session_factory):
+    """Invalid orders fail individually, valid ones are created across batch boundaries in input order."""
+    orders = [
+        {"table_id": 1, "items": [{"menu_id": 1, "quantity": 2}], "created_at": None},
+        {"table_id": 1, "items": [{"menu_id": 99, "quantity": 1}]},
+        {"table_id": 2, "items": [{"menu_id": 6, "quantity": 1}], "status": "paid"},
+        {"table_id": 42, "items": [{"menu_id": 1, "quantity": 1}]},
+        {"table_id": 1, "items": [{"menu_id": 1, "quantity": 0}]},
+        {"table_id": 2, "items": [{"menu_id": 6, "quantity": 3}], "status": "lost"},
+        {"table_id": 1, "items": [{"menu_id": 6, "quantity": 1}]},
+    ]
+    async with session_factory() as db:
+        results = await service.create_orders_bulk(db, orders, batch_size=2)
+        rows = (await db.execute(text("SELECT id, table_id, status FROM orders ORDER BY id"))).fetchall()
+        items = (await db.execute(text("SELECT COUNT(*) FROM order_items"))).scalar()
+    logger.info(f"Test bulk results: {results}")
+    assert [r["status"] for r in results] == ["created", "failed", "created", "failed", "failed", "failed", "created"]
+    assert "99" in results[1]["error"] and "42" in results[3]["error"]
+    assert "quantity" in results[4]["error"] and "status" in results[5]["error"]
+    assert [r["order_id"] for r in results if r["order_id"]] == [row[0] for row in rows]
+    assert [tuple(row[1:]) for row in rows] == [(1, "pending"), (2, "paid"), (1, "pending")]
+    assert items == 3
+    assert [payload["order_id"] for _, payload in session_factory.events] == [row[0] for row in rows]
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_stores_naive_utc(session_factory):
+    """The endpoint reports per-order results, and timezone-aware created_at is stored as naive UTC."""
+    async def override_db():
+        async with session_factory() as db:
+            yield db
+    app.dependency_overrides[get_async_db] = override_db
+    try:
+        response = TestClient(app).post("/api/orders/bulk", json={
+            "orders": [
+                {"table_id": 1, "items": [{"menu_id": 1, "quantity": 1}], "created_at": "2025-08-18T23:30:00-02:00"},
+                {"table_id": 1, "items": [{"menu_id": 5, "quantity": 1}]},
+                {"table_id": 2, "items": [{"menu_id": 6}], "created_at": "2025-08-18T12:00:00"},
+            ],
+            "batch_size": 1,
+        })
+    finally:
+        app.dependency_overrides.pop(get_async_db)
+    body = response.json()
+    logger.info(f"Test bulk endpoint: {body}")
+    assert response.status_code == 200
+    assert (body["created"], body["failed"]) == (2, 1)
+    assert [r["status"] for r in body["results"]] == ["created", "failed", "created"]
+    async with session_factory() as db:
+        stored = (await db.execute(text("SELECT created_at FROM orders ORDER BY id"))).scalars().all()
+    assert [str(value)[:19] for value in stored] == ["2025-08-19 01:30:00", "2025-08-18 12:00:00"]
+    assert session_factory.events[0][1]["created_at"] == "2025-08-19T01:30:00"
+
+@pytest.mark.asyncio
+async def test_order_updated_carries_table_id(session_factory):
+    """order_updated is routed by table_id like order_created, so the status change follows the creation."""
+    async with session_factory() as db:
+        created = await service.create_orders_bulk(db, [{"table_id": 2, "items": [{"menu_id": 1, "quantity": 1}]}])
+        await service.update_order_status(db, created[0]["order_id"], "paid")
+    logger.info(f"Test order events: {session_factory.events}")
+    (_, created_payload), (event_type, updated_payload) = session_factory.events
+    assert event_type == "order_updated"
+    assert updated_payload["table_id"] == created_payload["table_id"] == 2
+    assert (updated_payload["status"], updated_payload["previous_status"]) == ("paid", "pending")
@@ -0,0 +1,67 @@
+import os
+import pickle
+import numpy as np
+import pytest
+from sklearn.linear_model import LogisticRegression
+from app.menu_catalog import MenuSnapshot
+from app.services.reco_agent.model_store import ModelStore
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.sql import text
+from app.services.reco_agent.service import fetch_order_items, rank_candidates, score_candidates
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def _train(coef_sign: float) -> LogisticRegression:
+    X = np.array([[12, 2, c] for c in range(10)], dtype=float)
+    y = (X[:, 2] * coef_sign > 4.5 * coef_sign).astype(int)
+    return LogisticRegression().fit(X, y)
+
+def test_model_store_reloads_on_change(tmp_path):
+    """The model is unpickled once and swapped when the artifact is replaced."""
+    path = tmp_path / "reco_model.pkl"
+    path.write_bytes(pickle.dumps(_train(1)))
+    store = ModelStore(path=str(path), check_seconds=0)
+    first = store.get()
+    assert store.get() is first
+    assert store.loads == 1
+
+    path.write_bytes(pickle.dumps(_train(-1)))
+    os.utime(path, ns=(0, os.stat(path).st_mtime_ns + 1_000_000))
+    assert store.get() is not first
+    assert store.loads == 2
+
+    with pytest.raises(ValueError):
+        ModelStore(path=str(tmp_path / "missing.pkl")).get()
+
+def test_vectorized_scoring_matches_per_candidate():
+    """One predict_proba over the stacked matrix gives the per-candidate scores; low stock is suppressed."""
+    model = _train(1)
+    candidate_ids = np.array([6, 7, 8, 9])
+    co_counts = np.array([9, 1, 7, 8])
+    uplift = score_candidates(model, candidate_ids, co_counts, 12, 2)
+    expected = [model.predict_proba(np.array([[12, 2, c]], dtype=float))[0][1] for c in co_counts]
+    assert np.allclose(uplift, expected)
+
+    catalog = MenuSnapshot(1, [(i, f"Item {i}", None, 1.0, "main", False, False) for i in range(6, 10)])
+    result = rank_candidates(candidate_ids, uplift, catalog, {"Item 6": 0, "Item 7": 5})
+    logger.info(f"Test rank_candidates: {result}")
+    assert [s["item_id"] for s in result] == [9, 8, 7]
+
+@pytest.mark.asyncio
+async def test_fetch_order_items_by_ids_and_status():
+    """One query returns every order's items; orders without items still get an entry."""
+    engine = create_async_engine("sqlite+aiosqlite://")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE orders (id INTEGER PRIMARY KEY, status TEXT)"))
+        await conn.execute(text("CREATE TABLE order_items (order_id INTEGER, menu_id INTEGER)"))
+        await conn.execute(text("INSERT INTO orders VALUES (1, 'pending'), (2, 'paid'), (3, 'pending')"))
+        await conn.execute(text("INSERT INTO order_items VALUES (1, 1), (1, 6), (2, 2)"))
+    async with async_sessionmaker(bind=engine)() as db:
+        by_ids = await fetch_order_items(db, order_ids=[1, 2, 9])
+        by_status = await fetch_order_items(db, status="pending")
+    await engine.dispose()
+    assert by_ids == {1: [1, 6], 2: [2], 9: []}
+    assert by_status == {1: [1, 6], 3: []}
@@ -0,0 +1,36 @@
+from datetime import datetime, timedelta
+from app.reservation_matcher import ReservationMatcher
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+NOW = datetime(2025, 8, 20, 19, 0)
+
+def test_pop_best_prefers_due_then_best_fit():
+    """Due reservations beat early ones; within a group the fullest fit wins, then the earliest."""
+    matcher = ReservationMatcher(early_seat_minutes=15)
+    matcher.add(1, NOW - timedelta(minutes=20), 2)
+    matcher.add(2, NOW - timedelta(minutes=5), 4)
+    matcher.add(3, NOW - timedelta(minutes=10), 4)
+    matcher.add(4, NOW + timedelta(minutes=10), 6)
+    matcher.add(5, NOW - timedelta(minutes=30), 8)  # never fits a 6-top
+
+    picks = [matcher.pop_best(6, NOW) for _ in range(4)]
+    logger.info(f"Test pop_best: {picks}")
+    assert [p[0] for p in picks[:3]] == [3, 2, 1]
+    assert picks[3][0] == 4  # early seat once nobody due fits
+    assert matcher.pop_best(6, NOW) is None
+    assert len(matcher) == 1
+
+def test_removed_and_restored_reservations():
+    """Lazy removal skips seated reservations; a failed seating can be put back."""
+    matcher = ReservationMatcher()
+    matcher.add(1, NOW - timedelta(minutes=5), 2)
+    matcher.add(2, NOW - timedelta(minutes=1), 2)
+    matcher.remove(1)
+    match = matcher.pop_best(2, NOW)
+    assert match[0] == 2
+    matcher.add(*match)
+    assert matcher.pop_best(4, NOW)[0] == 2
@@ -0,0 +1,70 @@
+import asyncio
+import pytest
+import pytest_asyncio
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
+from sqlalchemy.sql import text
+from app.table_index import TableIndex
+import app.table_index as table_index_module
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest_asyncio.fixture
+async def session_factory(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'tables.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE tables (id INTEGER PRIMARY KEY, capacity INTEGER, status TEXT)"))
+        await conn.execute(text("INSERT INTO tables (id, capacity, status) VALUES (1, 4, 'available'), (2, 2, 'occupied')"))
+    yield async_sessionmaker(bind=engine, expire_on_commit=False)
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_concurrent_claims_single_winner(session_factory, monkeypatch):
+    """Two racing claims on one table: exactly one wins, in the index and in the DB."""
+    monkeypatch.setattr(table_index_module, "table_index", TableIndex())
+
+    async def claim():
+        async with session_factory() as db:
+            won = await table_index_module.claim_table(db, 1)
+            await db.commit()
+            return won
+
+    results = await asyncio.gather(claim(), claim())
+    logger.info(f"Test concurrent claims: {results}")
+    assert sorted(results) == [False, True]
+    assert table_index_module.table_index.get(1)["status"] == "occupied"
+    async with session_factory() as db:
+        assert (await db.execute(text("SELECT status FROM tables WHERE id = 1"))).scalar() == "occupied"
+        assert not await table_index_module.claim_table(db, 2)
+        assert not await table_index_module.claim_table(db, 99)
+
+@pytest.mark.asyncio
+async def test_claim_defers_to_db(session_factory, monkeypatch):
+    """A stale index entry is corrected when the conditional UPDATE matches nothing."""
+    monkeypatch.setattr(table_index_module, "table_index", TableIndex())
+    async with session_factory() as db:
+        await table_index_module.table_index.load(db)
+        await db.execute(text("UPDATE tables SET status = 'reserved' WHERE id = 1"))
+        await db.commit()
+        assert not await table_index_module.claim_table(db, 1)
+        assert table_index_module.table_index.get(1)["status"] == "reserved"
+
+@pytest.mark.asyncio
+async def test_failed_claim_releases_table(session_factory, monkeypatch):
+    """If the conditional UPDATE raises, the table is available again in the index and the error surfaces."""
+    monkeypatch.setattr(table_index_module, "table_index", TableIndex())
+    async with session_factory() as db:
+        await table_index_module.table_index.load(db)
+        execute = db.execute
+        async def failing_execute(statement, *args, **kwargs):
+            if "UPDATE tables" in str(statement):
+                raise ConnectionError("connection reset")
+            return await execute(statement, *args, **kwargs)
+        monkeypatch.setattr(db, "execute", failing_execute)
+        with pytest.raises(ConnectionError):
+            await table_index_module.claim_table(db, 1)
+        assert table_index_module.table_index.get(1)["status"] == "available"
+        monkeypatch.setattr(db, "execute", execute)
+        assert await table_index_module.claim_table(db, 1)
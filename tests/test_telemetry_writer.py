@@ -0,0 +1,96 @@
+import asyncio
+from datetime import datetime
+import pytest
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.sql import text
+from app.telemetry_writer import TelemetryWriter
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+async def make_sessions(tmp_path):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'telemetry.db'}")
+    async with engine.begin() as conn:
+        await conn.execute(text("CREATE TABLE vision_events (id INTEGER PRIMARY KEY, table_id INTEGER, event_type TEXT, timestamp TIMESTAMP)"))
+    return engine, async_sessionmaker(bind=engine)
+
+async def count_rows(engine) -> int:
+    async with engine.connect() as conn:
+        return (await conn.execute(text("SELECT COUNT(*) FROM vision_events"))).scalar()
+
+def row(table_id: int) -> dict:
+    return {"table_id": table_id, "event_type": "detected_empty", "timestamp": datetime.utcnow()}
+
+@pytest.mark.asyncio
+async def test_rows_flush_in_batches_and_on_stop(tmp_path):
+    """A full batch is written right away, a partial one after the interval, and the rest on stop()."""
+    engine, sessions = await make_sessions(tmp_path)
+    writer = TelemetryWriter(batch_size=10, flush_interval_ms=100, session_factory=sessions)
+
+    for i in range(10):
+        writer.append("vision_events", row(i))
+    await asyncio.sleep(0.05)
+    assert await count_rows(engine) == 10
+
+    for i in range(3):
+        writer.append("vision_events", row(i))
+    assert await count_rows(engine) == 10
+    await asyncio.sleep(0.2)
+    assert await count_rows(engine) == 13
+
+    writer.append("vision_events", row(99))
+    await writer.stop()
+    stats = writer.stats()
+    logger.info(f"Test telemetry stats: {stats}")
+    assert await count_rows(engine) == 14
+    assert stats["flushes"] == 3 and stats["flushed_rows"] == 14
+    assert stats["flush_latency"]["count"] == 3
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_buffer_bound_and_unknown_table(tmp_path):
+    """Only registered tables are accepted, and a full buffer drops its oldest rows."""
+    engine, sessions = await make_sessions(tmp_path)
+    writer = TelemetryWriter(batch_size=100, flush_interval_ms=10000, max_buffer=5, session_factory=sessions)
+    with pytest.raises(ValueError):
+        writer.append("orders", row(1))
+    for i in range(8):
+        writer.append("vision_events", row(i))
+    await writer.stop()
+    async with engine.connect() as conn:
+        table_ids = (await conn.execute(text("SELECT table_id FROM vision_events ORDER BY id"))).scalars().all()
+    assert table_ids == [3, 4, 5, 6, 7]
+    assert writer.stats()["dropped"] == 3
+    await engine.dispose()
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_batch(tmp_path):
+    """A failed write keeps its rows at the front of the buffer, bounded by max_buffer, and the retry writes them in order."""
+    engine, sessions = await make_sessions(tmp_path)
+    healthy = True
+
+    def session_factory():
+        if not healthy:
+            raise ConnectionError("database unavailable")
+        return sessions()
+
+    writer = TelemetryWriter(batch_size=100, flush_interval_ms=10000, max_buffer=5, session_factory=session_factory)
+    for i in range(4):
+        writer.append("vision_events", row(i))
+    healthy = False
+    assert await writer.flush() == 0
+    for i in range(4, 7):
+        writer.append("vision_events", row(i))
+    stats = writer.stats()
+    assert (stats["buffered"], stats["failed"], stats["dropped"]) == (5, 1, 2)
+
+    healthy = True
+    assert await writer.flush() == 5
+    await writer.stop()
+    async with engine.connect() as conn:
+        table_ids = (await conn.execute(text("SELECT table_id FROM vision_events ORDER BY id"))).scalars().all()
+    logger.info(f"Test telemetry after failed flush: {table_ids}")
+    assert table_ids == [2, 3, 4, 5, 6]
+    await engine.dispose()
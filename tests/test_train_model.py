@@ -0,0 +1,32 @@
+import numpy as np
+from app.services.reco_agent.train_model import add_counts, chunk_examples, time_features
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_time_features_match_serving():
+    """Hour and weekday use datetime.weekday() numbering, as get_recommendations does."""
+    hours, weekdays = time_features(np.array(["2025-08-20 19:05:00", "2025-08-24 07:00:00.5"]))
+    assert hours.tolist() == [19, 7]
+    assert weekdays.tolist() == [2, 6]
+
+def test_chunk_examples_use_prior_counts():
+    """Positives get leave-one-out co_counts from earlier orders; sampled negatives are never in the order."""
+    counts = np.zeros((5, 5))
+    add_counts(counts, np.array([1, 1, 2, 2]), np.array([1, 2, 1, 3]))
+    order_ids = np.array([3, 3, 4])
+    menu_ids = np.array([1, 2, 4])
+    created_at = np.array(["2025-08-20 12:00:00"] * 3)
+    X, y = chunk_examples(order_ids, menu_ids, created_at, counts, np.array([1, 2, 3, 4]), np.random.default_rng(0), negatives=4)
+    logger.info(f"Test chunk_examples: {X.tolist()} {y.tolist()}")
+
+    positives = X[y == 1]
+    assert len(positives) == 2  # order 4 has a single item
+    assert sorted(positives[:, 2].tolist()) == [1, 1]  # items 1 and 2 were ordered together once
+    assert (X[:, :2] == [12, 2]).all()
+    negatives = X[y == 0]
+    assert len(negatives) <= 8
+    # The only menu items outside order 3 are 3 (co-occurred once with item 1) and 4 (never)
+    assert set(negatives[:, 2].tolist()) <= {0, 1}
@@ -0,0 +1,26 @@
+import cv2
+import numpy as np
+import pytest
+from app.services.vision_agent.service import classify_frame, decode_frame
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_decode_from_bytes_matches_file(tmp_path):
+    """imdecode on the upload bytes gives the same pixels and status as writing the file and imread-ing it."""
+    frame = np.full((120, 160, 3), 40, dtype=np.uint8)
+    frame[:, :80] = 230
+    data = cv2.imencode(".png", frame)[1].tobytes()
+    path = tmp_path / "frame.png"
+    path.write_bytes(data)
+
+    decoded = decode_frame(data)
+    assert np.array_equal(decoded, cv2.imread(str(path)))
+    status, confidence = classify_frame(decoded)
+    logger.info(f"Test classify_frame: {status} {confidence}")
+    assert status == "detected_occupied"
+
+    with pytest.raises(ValueError):
+        decode_frame(b"not an image")
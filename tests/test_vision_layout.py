@@ -0,0 +1,43 @@
+import cv2
+import numpy as np
+import pytest
+from app.services.vision_agent import service as vision_service
+from app.services.vision_agent.layout import CameraLayout, FloorLayout
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_batched_roi_means_match_slices():
+    """One bincount over the label map gives each table's ROI mean, for rects and polygons alike."""
+    layout = CameraLayout("ceiling-1", {"tables": [
+        {"table_id": 1, "rect": [0.0, 0.0, 0.5, 0.5]},
+        {"table_id": 2, "rect": [0.5, 0.0, 1.0, 0.5]},
+        {"table_id": 3, "polygon": [[0.0, 0.5], [0.5, 0.5], [0.5, 1.0], [0.0, 1.0]]},
+    ]})
+    frame = np.random.default_rng(0).integers(0, 256, (120, 160, 3), dtype=np.uint8)
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY).astype(np.float64)
+
+    means = layout.brightness(frame)
+    logger.info(f"Test ROI means: {means}")
+    assert np.allclose(means[:2], [gray[:60, :80].mean(), gray[:60, 80:].mean()])
+    # fillPoly includes the polygon's boundary pixels
+    assert np.isclose(means[2], gray[60:, :81].mean())
+    assert layout.labels(120, 160) is layout.labels(120, 160)
+
+def test_unknown_camera_warns_once(caplog):
+    """An unknown camera id falls back to the default ROI and is logged once, not per frame."""
+    layout = FloorLayout(path="does-not-exist.json")
+    with caplog.at_level(logging.WARNING):
+        for _ in range(3):
+            assert layout.camera("patio-9").camera_id is None
+        layout.camera("patio-10")
+    warnings = [r.getMessage() for r in caplog.records if "not in the floor layout" in r.getMessage()]
+    assert len(warnings) == 2
+
+def test_classify_frame_without_detections_raises_value_error(monkeypatch):
+    """A frame with no usable ROI is a ValueError (a 400), not an IndexError."""
+    monkeypatch.setattr(vision_service, "classify_tables", lambda img, camera_id=None: [])
+    with pytest.raises(ValueError):
+        vision_service.classify_frame(np.zeros((10, 10, 3), dtype=np.uint8))
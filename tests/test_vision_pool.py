@@ -0,0 +1,80 @@
+import asyncio
+import threading
+import pytest
+from app.services.vision_agent.pool import VisionOverloaded, VisionPool
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.mark.asyncio
+async def test_pool_drops_and_coalesces_when_saturated():
+    """With the worker busy, a camera's waiting frame is replaced by its newer one and extra sources are dropped."""
+    release = threading.Event()
+    seen = []
+
+    def work(frame):
+        release.wait(5)
+        seen.append(frame)
+        return frame
+
+    pool = VisionPool(kind="thread", workers=1, max_pending=1, overflow_policy="coalesce")
+    busy = asyncio.create_task(pool.run(work, "cam1-f1", key="cam1"))
+    await asyncio.sleep(0.05)
+    older = asyncio.create_task(pool.run(work, "cam2-f1", key="cam2"))
+    await asyncio.sleep(0.05)
+    newer = asyncio.create_task(pool.run(work, "cam2-f2", key="cam2"))
+    await asyncio.sleep(0.05)
+    with pytest.raises(VisionOverloaded):
+        await pool.run(work, "cam3-f1", key="cam3")
+
+    release.set()
+    results = await asyncio.gather(busy, older, newer)
+    pool.shutdown()
+    stats = pool.stats()
+    logger.info(f"Test vision pool stats: {stats}")
+    assert results == ["cam1-f1", "cam2-f2", "cam2-f2"]
+    assert seen == ["cam1-f1", "cam2-f2"]
+    assert (stats["completed"], stats["dropped"], stats["coalesced"]) == (2, 1, 1)
+    assert stats["queue_wait"]["count"] == 2 and stats["compute"]["max_ms"] > 0
+
+@pytest.mark.asyncio
+async def test_coalesced_frame_finishes_once_and_survives_cancellation():
+    """The finish step runs once per job; cancelling the first caller leaves the coalesced one its result."""
+    release = threading.Event()
+    recorded = []
+
+    def work(frame):
+        release.wait(5)
+        return frame
+
+    async def record(frame):
+        recorded.append(frame)
+        return f"recorded {frame}"
+
+    pool = VisionPool(kind="thread", workers=1, max_pending=2, overflow_policy="coalesce")
+    busy = asyncio.create_task(pool.run(work, "cam1-f1", key="cam1", finish=record))
+    await asyncio.sleep(0.05)
+    first = asyncio.create_task(pool.run(work, "cam2-f1", key="cam2", finish=record))
+    await asyncio.sleep(0.05)
+    newer = asyncio.create_task(pool.run(work, "cam2-f2", key="cam2", finish=record))
+    await asyncio.sleep(0.05)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await newer == "recorded cam2-f2"
+    assert await busy == "recorded cam1-f1"
+    assert first.cancelled()
+    logger.info(f"Test vision pool recorded: {recorded}")
+    assert recorded == ["cam1-f1", "cam2-f2"]
+
+    # A job cancelled from outside (not by its caller) surfaces as overload
+    release.clear()
+    waiting = asyncio.create_task(pool.run(work, "cam3-f1", key="cam3"))
+    await asyncio.sleep(0.05)
+    next(task for task in asyncio.all_tasks() if task.get_coro().__name__ == "_execute").cancel()
+    with pytest.raises(VisionOverloaded):
+        await waiting
+    release.set()
+    pool.shutdown()
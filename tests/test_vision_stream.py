@@ -0,0 +1,38 @@
+import asyncio
+import pytest
+from app.services.vision_agent.stream import LatestFrame
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+@pytest.mark.asyncio
+async def test_slow_detector_only_sees_latest_frame():
+    """Frames arriving while the detector is busy replace each other; it then gets the newest one."""
+    frames = LatestFrame("cam-1")
+    frames.put(b"1")
+    seq, data, _ = await frames.get()
+    assert (seq, data) == (1, b"1")
+
+    for i in range(2, 6):
+        frames.put(str(i).encode())
+    seq, data, _ = await frames.get()
+    logger.info(f"Test latest frame stats: {frames.stats()}")
+    assert (seq, data) == (5, b"5")
+    assert frames.stats() == {"camera_id": "cam-1", "received": 5, "processed": 2, "skipped": 3}
+
+@pytest.mark.asyncio
+async def test_get_waits_for_frame_and_ends_on_close():
+    """get() blocks until a frame arrives and returns None once the stream is closed and drained."""
+    frames = LatestFrame("cam-1")
+    waiter = asyncio.create_task(frames.get())
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    frames.put(b"x")
+    assert (await waiter)[1] == b"x"
+
+    frames.put(b"y")
+    frames.close()
+    assert (await frames.get())[1] == b"y"
+    assert await frames.get() is None
@@ -0,0 +1,40 @@
+from app.services.vision_agent.tracker import TableStateTracker
+import logging
+
+# Configure logging
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def test_hysteresis_and_dwell_suppress_flicker():
+    """Brightness jittering around the cutoff, or a change shorter than the dwell time, emits nothing."""
+    tracker = TableStateTracker(hysteresis=10, min_dwell=5, heartbeat=60)
+    assert tracker.observe(1, 100, 150, now=0) == "transition"
+    assert tracker.state(1) == "detected_occupied"
+
+    # Inside the band: no change, however often it crosses the cutoff
+    assert [tracker.observe(1, b, 150, now=t) for t, b in enumerate([149, 155, 145, 159], start=1)] == [None] * 4
+    # Clearly empty, but only for 3 s before dropping back
+    assert tracker.observe(1, 200, 150, now=10) is None
+    assert tracker.observe(1, 200, 150, now=13) is None
+    assert tracker.observe(1, 100, 150, now=14) is None
+    assert tracker.state(1) == "detected_occupied"
+
+    # Empty for the full dwell time: one transition
+    assert tracker.observe(1, 200, 150, now=20) is None
+    assert tracker.observe(1, 200, 150, now=25) == "transition"
+    assert tracker.state(1) == "detected_empty"
+
+    stats = tracker.stats()
+    logger.info(f"Test tracker stats: {stats}")
+    assert stats["transitions"] == 2
+    assert stats["suppressed"] == 8
+    assert stats["tables"][1]["suppressed"] == 8
+
+def test_heartbeat_after_quiet_period():
+    """A table that keeps its state gets one heartbeat per interval instead of one row per frame."""
+    tracker = TableStateTracker(hysteresis=10, min_dwell=5, heartbeat=60)
+    actions = [tracker.observe(2, 100, 150, now=t) for t in range(0, 130)]
+    logger.info(f"Test heartbeat actions: {[a for a in actions if a]}")
+    assert actions[0] == "transition"
+    assert [t for t, a in enumerate(actions) if a == "heartbeat"] == [60, 120]
+    assert tracker.stats()["suppressed"] == 127